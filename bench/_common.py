@@ -0,0 +1,99 @@
+"""Helpers of the benchmark scripts
+
+Every script measures the checkout it lives in, or the python-module directory given with --tree. To compare with an
+older commit, check it out next to this one and run the script against both:
+
+    git worktree add /tmp/baseline <commit>
+    python bench/bench_registry.py
+    python bench/bench_registry.py --tree /tmp/baseline/modules/python-module
+
+Scripts which compare against a reimplementation of the old code (noted in their docstring) only run on this tree.
+
+GTAOrange is imported against the recording __orange__ stand-in in tests/fake, so the numbers include the cost of
+recording the server function calls, but not the server itself. The MySQLdb scripts need the _mysql extension: the
+one in bin/ is built for Windows, elsewhere put one on PYTHONPATH. They connect with the MYSQL_HOST, MYSQL_PORT,
+MYSQL_USER, MYSQL_PASSWORD and MYSQL_DB environment variables.
+
+Results are printed and appended to bench_output.txt in the root of the checkout.
+"""
+import argparse
+import datetime
+import os
+import platform
+import sys
+import timeit
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+OUTPUT = os.path.join(ROOT, "bench_output.txt")
+
+_write = sys.stdout.write  # GTAOrange replaces print() with the server's
+
+
+def setup(description, tree_option=True):
+    """Parses the command line and puts the tree to measure on sys.path.
+
+    @param  description     str     description of the script for --help
+    @param  tree_option     bool    False if the script only runs on this tree #optional
+
+    @returns    argparse.Namespace  arguments (tree: path of the python-module directory)
+    """
+    parser = argparse.ArgumentParser(description=description)
+
+    if tree_option:
+        parser.add_argument("--tree", default=os.path.join(ROOT, "modules", "python-module"),
+                            help="python-module directory to measure (default: this checkout)")
+
+    args = parser.parse_args()
+
+    if not tree_option:
+        args.tree = os.path.join(ROOT, "modules", "python-module")
+
+    args.tree = os.path.abspath(args.tree)
+    sys.path[:0] = [os.path.join(ROOT, "tests", "fake"), args.tree, os.path.join(args.tree, "bin")]
+
+    report("== %s, Python %s, %s" % (os.path.basename(sys.argv[0]), platform.python_version(), args.tree))
+    report("   %s" % datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"))
+    return args
+
+
+def report(line):
+    """Prints a line and appends it to bench_output.txt.
+
+    @param  line    str     line of the results
+    """
+    _write(line + "\n")
+
+    with open(OUTPUT, "a") as file:
+        file.write(line + "\n")
+
+
+def best(f, number, repeat=5):
+    """Returns the time one call takes, the best of several runs.
+
+    @param  f       function    function to measure, called without arguments
+    @param  number  int         calls per run
+    @param  repeat  int         runs #optional
+
+    @returns    float   seconds per call
+    """
+    return min(timeit.repeat(f, number=number, repeat=repeat)) / number
+
+
+def connect():
+    """Connects to the MySQL server given by the MYSQL_* environment variables.
+
+    @returns    MySQLdb.connections.Connection  connection object
+    """
+    import MySQLdb
+
+    kwargs = {"charset": "utf8mb4"}
+
+    for key, name in (("host", "MYSQL_HOST"), ("user", "MYSQL_USER"), ("passwd", "MYSQL_PASSWORD"),
+                      ("db", "MYSQL_DB")):
+        if name in os.environ:
+            kwargs[key] = os.environ[name]
+
+    if "MYSQL_PORT" in os.environ:
+        kwargs["port"] = int(os.environ["MYSQL_PORT"])
+
+    return MySQLdb.connect(**kwargs)
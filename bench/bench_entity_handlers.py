@@ -0,0 +1,35 @@
+"""Benchmark of per-entity event handlers (user-003)
+
+Every player registers one handler for the same event, then one player triggers it. With handlers stored per player
+the cost stays the same no matter how many players there are; with one registry shared by all players it grows with
+them. Runs on any tree, compare with --tree.
+"""
+import _common
+
+_common.setup(__doc__.splitlines()[0])
+
+from GTAOrange import player as _player
+
+NUMBER = 20000
+calls = [0]
+
+
+def callback(*args):
+    calls[0] += 1
+
+
+_common.report("%8s  %12s  %16s" % ("players", "trigger", "handlers called"))
+players = []
+
+for n in (1, 10, 100, 1000):
+    while len(players) < n:
+        p = _player.getByID(len(players) + 1)
+        p.on("death", callback)
+        players.append(p)
+
+    calls[0] = 0
+    players[0].trigger("death")
+    called = calls[0]
+
+    t = _common.best(lambda: players[0].trigger("death"), NUMBER)
+    _common.report("%8d  %9.2f us  %16d" % (n, t * 1e6, called))
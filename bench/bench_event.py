@@ -0,0 +1,50 @@
+"""Benchmark of GTAOrange.event.Dispatcher (user-001)
+
+Triggers an event with 1, 3 and 10 handlers, and one without handlers, through a Dispatcher and through the
+on()/trigger() loop every library had before (reimplemented below), so this only runs on this tree.
+"""
+import _common
+
+_common.setup(__doc__.splitlines()[0], tree_option=False)
+
+from GTAOrange import event as _event
+
+NUMBER = 200000
+
+
+class OldLibrary():
+    # the on()/trigger() pair every library carried before the Dispatcher
+
+    def __init__(self):
+        self.handlers = {}
+
+    def on(self, event, cb):
+        if event in self.handlers.keys():
+            self.handlers[event].append(_event.Event(cb))
+        else:
+            self.handlers[event] = []
+            self.handlers[event].append(_event.Event(cb))
+
+    def trigger(self, event, *args):
+        if event in self.handlers.keys():
+            for handler in self.handlers[event]:
+                handler.getCallback()(*args)
+
+
+def callback(*args):
+    pass
+
+
+_common.report("%8s  %14s  %14s" % ("handlers", "old loop", "Dispatcher"))
+
+for n in (0, 1, 3, 10):
+    old = OldLibrary()
+    new = _event.Dispatcher()
+
+    for i in range(n):
+        old.on("PlayerSpawn", callback)
+        new.on("PlayerSpawn", callback)
+
+    t_old = _common.best(lambda: old.trigger("PlayerSpawn", 1, (1.0, 2.0, 3.0)), NUMBER)
+    t_new = _common.best(lambda: new.trigger("PlayerSpawn", 1, (1.0, 2.0, 3.0)), NUMBER)
+    _common.report("%8d  %11.0f ns  %11.0f ns" % (n, t_old * 1e9, t_new * 1e9))
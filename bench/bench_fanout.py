@@ -0,0 +1,56 @@
+"""Benchmark of sending to a group of players (user-024)
+
+Sends a chat message and a client event to 200 of 300 connected players, and to all of them, once with a loop over
+the players (the old way) and once with chatMsgTo() / triggerClientTo(). Reports the server function calls and the
+time per broadcast. Only runs on this tree.
+"""
+
+import _common
+
+_common.setup(__doc__.splitlines()[0], tree_option=False)
+
+import __orange__
+from GTAOrange import player as _player
+
+PLAYERS = 300
+RECIPIENTS = 200
+MESSAGE = "Round starts in 10 seconds"
+ARGS = (1, 2.0, "three", [4, 5])
+
+for i in range(PLAYERS):
+    _player._onConnect(i, "127.0.0.1")
+
+everyone = list(_player.getAll().values())
+team = everyone[:RECIPIENTS]
+
+
+def run(label, f):
+    __orange__.reset()
+    f()
+    calls = len(__orange__.calls)
+
+    def call():
+        f()
+        __orange__.reset()
+
+    t = _common.best(call, 50, repeat=7)
+    _common.report("%-40s  %4d server calls  %8.1f us" % (label, calls, t * 1e6))
+
+
+def loopChatMsg(players):
+    for p in players:
+        p.chatMsg(MESSAGE)
+
+
+def loopTriggerClient(players):
+    for p in players:
+        p.triggerClient("hud:update", *ARGS)
+
+
+run("loop p.chatMsg(), 200 of 300", lambda: loopChatMsg(team))
+run("chatMsgTo(list), 200 of 300", lambda: _player.chatMsgTo(team, MESSAGE))
+run("chatMsgTo(predicate), 200 of 300", lambda: _player.chatMsgTo(lambda p: p.id < RECIPIENTS, MESSAGE))
+run("loop p.chatMsg(), all 300", lambda: loopChatMsg(everyone))
+run("chatMsgTo(list), all 300", lambda: _player.chatMsgTo(everyone, MESSAGE))
+run("loop p.triggerClient(), 200 of 300", lambda: loopTriggerClient(team))
+run("triggerClientTo(list), 200 of 300", lambda: _player.triggerClientTo(team, "hud:update", *ARGS))
@@ -0,0 +1,51 @@
+"""Import-time benchmark of GTAOrange.hash (user-009)
+
+Every run starts a fresh interpreter, imports GTAOrange and the standard modules it needs (not counted), then
+measures importing GTAOrange.hash, the first lookup in Vehicle and loading Object plus its first lookup. The best of several runs is reported, so the
+one-off compilation of the hash database doesn't count. Runs on any tree, compare with --tree; older trees are run
+from the root of their checkout, since they opened the JSON files relative to the working directory.
+"""
+import os
+import subprocess
+import sys
+
+import _common
+
+args = _common.setup(__doc__.splitlines()[0])
+
+RUNS = 7
+
+# the standard modules are imported first, the server has loaded them anyway
+CHILD = """
+import sys, time
+import json, mmap, os, struct, threading, collections.abc
+import GTAOrange
+t = time.perf_counter()
+import colorsys
+t0 = time.perf_counter()
+from GTAOrange import hash
+t1 = time.perf_counter()
+hash.Vehicle.getHashByString("adder")
+t2 = time.perf_counter()
+hash.loadHashContainer("Object")
+hash.Object.getHashByString("prop_bench_01a")
+t3 = time.perf_counter()
+sys.stdout.write("%f %f %f %f" % (t1 - t0, t2 - t1, t3 - t2, t0 - t))
+"""
+
+env = dict(os.environ)
+# the modules are compiled once, like on a server, so compiling them isn't measured
+env.pop("PYTHONDONTWRITEBYTECODE", None)
+env["PYTHONPATH"] = os.pathsep.join([os.path.join(_common.ROOT, "tests", "fake"), args.tree] +
+                                    ([env["PYTHONPATH"]] if "PYTHONPATH" in env else []))
+cwd = os.path.dirname(os.path.dirname(args.tree))
+results = []
+
+for i in range(RUNS):
+    output = subprocess.check_output([sys.executable, "-c", CHILD], env=env, cwd=cwd)
+    results.append([float(value) for value in output.split()])
+
+# importing a small standard module shows what loading any module file costs on this machine
+for index, label in enumerate(("import GTAOrange.hash", "first Vehicle lookup", "load Object + first lookup",
+                               "reference: import colorsys")):
+    _common.report("%-28s  %8.2f ms" % (label, min(result[index] for result in results) * 1e3))
@@ -0,0 +1,44 @@
+"""Benchmark of building bulk INSERT statements in MySQLdb (user-018)
+
+executemany() of a 10k-row, 5-column INSERT, through a cursor which builds the statements like the default cursor but
+doesn't send them, so only the escaping and joining on the client is measured. Also prints a checksum of the
+statements, which has to be the same for every tree. Runs on any tree, compare with --tree. Needs the _mysql extension
+and a server given by the MYSQL_* environment variables, for the connection's character set and escaping.
+"""
+import hashlib
+
+import _common
+
+_common.setup(__doc__.splitlines()[0])
+
+from MySQLdb import cursors
+
+NUMBER = 1
+QUERY = "INSERT INTO players (id, name, money, team, score) VALUES (%s, %s, %s, %s, %s)"
+ROWS = [(i, u"player%d" % i, i * 0.25, None, i % 7) for i in range(10000)]
+
+
+class BuildOnlyCursor(cursors.Cursor):
+
+    def _query(self, q):
+        self.statements.append(bytes(q))
+        self._result = None
+        self._rows = ()
+        self.rowcount = 0
+        return 0
+
+
+conn = _common.connect()
+cursor = BuildOnlyCursor(conn)
+
+
+def executemany():
+    cursor.statements = []
+    cursor.executemany(QUERY, ROWS)
+
+
+t = _common.best(executemany, NUMBER, repeat=7)
+checksum = hashlib.md5(b";".join(cursor.statements)).hexdigest()
+_common.report("10k-row bulk INSERT  %8.1f ms  %d statements  md5 %s" % (t * 1e3, len(cursor.statements), checksum))
+
+conn.close()
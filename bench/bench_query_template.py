@@ -0,0 +1,66 @@
+"""Benchmark of the query templates of MySQLdb executemany() (user-013)
+
+executemany() of 10k rows with six arguments, as a bulk INSERT and as UPDATEs batched into multi-statement queries,
+rendering every row with a QueryTemplate (default) and with the `%` interpolation of execute() (QueryTemplate.parse
+replaced by one returning None, like for queries it can't take). The statements are built by a cursor which doesn't
+send them, so only the work on the client is measured, and a checksum shows both ways build the same bytes. Needs the
+template, so this only runs on this tree. Needs the _mysql extension and a server given by the MYSQL_* environment
+variables, for the connection's character set and escaping.
+
+Single execute() calls don't use templates: with the round trip to the server they only gained about 3%.
+"""
+import hashlib
+
+import _common
+
+_common.setup(__doc__.splitlines()[0], tree_option=False)
+
+from MySQLdb import cursors
+
+NUMBER = 1
+INSERT = "INSERT INTO players (id, name, money, x, y, z) VALUES (%s, %s, %s, %s, %s, %s)"
+UPDATE = "UPDATE players SET name = %s, money = %s, x = %s, y = %s, z = %s WHERE id = %s"
+INSERT_ROWS = [(i, u"Hexaflexagon%d" % i, i, 1.5, 2.5, None) for i in range(10000)]
+UPDATE_ROWS = [row[1:] + row[:1] for row in INSERT_ROWS]
+
+
+class BuildOnlyCursor(cursors.Cursor):
+
+    batch_statements = True
+
+    def _query(self, q):
+        self.statements.append(bytes(q))
+        self._result = None
+        self._rows = ()
+        self.rowcount = 0
+        return 0
+
+
+conn = _common.connect()
+# the statements aren't sent, so the server doesn't need to allow them
+conn._multi_statements = True
+cursor = BuildOnlyCursor(conn)
+parse = cursors.QueryTemplate.parse
+
+
+def executemany(query, rows):
+    cursor.statements = []
+    cursor.executemany(query, rows)
+
+
+_common.report("%-18s  %13s  %13s  %s" % ("10k rows", "bulk INSERT", "batched UPDATE", "md5"))
+
+for label, template in (("% interpolation", False), ("QueryTemplate", True)):
+    cursors.QueryTemplate.parse = parse if template else classmethod(lambda cls, query, encoding: None)
+    statements = []
+    times = []
+
+    for query, rows in ((INSERT, INSERT_ROWS), (UPDATE, UPDATE_ROWS)):
+        times.append(_common.best(lambda: executemany(query, rows), NUMBER, repeat=7))
+        statements.extend(cursor.statements)
+
+    checksum = hashlib.md5(b";".join(statements)).hexdigest()
+    _common.report("%-18s  %10.1f ms  %11.1f ms  %s" % (label, times[0] * 1e3, times[1] * 1e3, checksum))
+
+cursors.QueryTemplate.parse = parse
+conn.close()
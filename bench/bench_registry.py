@@ -0,0 +1,42 @@
+"""Memory benchmark of the entity libraries at 10k entities (user-021)
+
+Memory allocated (tracemalloc) by 10k bare Object, Text and Blip instances, and by 10k texts and objects created
+through the libraries, which also puts them into the pools. Also times getByID() over the 10k objects. Runs on any
+tree, compare with --tree.
+"""
+import tracemalloc
+
+import _common
+
+_common.setup(__doc__.splitlines()[0])
+
+import __orange__
+from GTAOrange import blip as _blip
+from GTAOrange import object as _object
+from GTAOrange import text as _text
+
+COUNT = 10000
+
+__orange__.record = False
+
+
+def measure(label, f):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = f()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    _common.report("%-32s  %7.0f KiB" % (label, (after - before) / 1024.0))
+    return result
+
+
+measure("Object instances", lambda: [_object.Object(i) for i in range(COUNT)])
+measure("Text instances", lambda: [_text.Text(i, "text", 1.0, 2.0, 3.0) for i in range(COUNT)])
+measure("Blip instances", lambda: [_blip.Blip(i) for i in range(COUNT)])
+measure("text.create()", lambda: [_text.create("text", 1.0, 2.0, 3.0) for i in range(COUNT)])
+objects = measure("object.create()", lambda: [_object.create(0x1234, 1.0, 2.0, 3.0) for i in range(COUNT)])
+
+ids = [obj.id for obj in objects]
+t = _common.best(lambda: [_object.getByID(id) for id in ids], 10)
+_common.report("%-32s  %7.2f ms" % ("object.getByID() on 10k ids", t * 1e3))
@@ -0,0 +1,32 @@
+"""Benchmark of the DATE/DATETIME/TIME converters of MySQLdb.times (user-017)
+
+Time per call of every converter on the formats MySQL returns. Runs on any tree, compare with --tree; converters the
+tree doesn't have are skipped. Needs the _mysql extension, but no server.
+"""
+import _common
+
+_common.setup(__doc__.splitlines()[0])
+
+from MySQLdb import times as _times
+
+NUMBER = 100000
+
+CASES = (
+    ("DateTime_or_None", "2020-01-02 10:11:12"),
+    ("DateTime_or_None", "2020-01-02 10:11:12.123456"),
+    ("Date_or_None", "2020-01-02"),
+    ("CachedDate_or_None", "2020-01-02"),
+    ("TimeDelta_or_None", "10:11:12"),
+    ("Time_or_None", "10:11:12"),
+    ("mysql_timestamp_converter", "20200102101112"),
+)
+
+for name, value in CASES:
+    converter = getattr(_times, name, None)
+
+    if converter is None:
+        _common.report("%-26s  %-28r  missing" % (name, value))
+        continue
+
+    t = _common.best(lambda: converter(value), NUMBER, repeat=7)
+    _common.report("%-26s  %-28r  %7.0f ns" % (name, value, t * 1e9))
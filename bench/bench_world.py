@@ -0,0 +1,46 @@
+"""Benchmark of the batched geometry functions of GTAOrange.world (user-006)
+
+Queries 10k positions around one point: the scalar getDistance() loop against getDistances(), getNearest(k=10) and
+getWithinRadius(), with NumPy (if it's installed) and with the pure Python fallback. Needs the batched functions, so
+this only runs on this tree.
+"""
+import random
+
+import _common
+
+_common.setup(__doc__.splitlines()[0], tree_option=False)
+
+from GTAOrange import world as _world
+
+NUMBER = 5
+X, Y, Z = 1.0, 2.0, 3.0
+
+random.seed(2)
+positions = [(random.uniform(-4000, 4000), random.uniform(-4000, 4000), random.uniform(0, 100)) for i in range(10000)]
+
+
+def measure(label, positions):
+    distances = _common.best(lambda: _world.getDistances(positions, X, Y, Z), NUMBER)
+    nearest = _common.best(lambda: _world.getNearest(positions, X, Y, Z, 10), NUMBER)
+    within = _common.best(lambda: _world.getWithinRadius(positions, X, Y, Z, 500.0), NUMBER)
+    _common.report("%-26s  %12.2f ms  %10.2f ms  %15.2f ms" % (label, distances * 1e3, nearest * 1e3, within * 1e3))
+
+
+scalar = _common.best(lambda: [_world.getDistance(p[0], p[1], p[2], X, Y, Z) for p in positions], NUMBER)
+_common.report("%-26s  %12.2f ms" % ("getDistance() loop", scalar * 1e3))
+_common.report("%-26s  %15s  %13s  %18s" % ("10k positions", "getDistances", "getNearest", "getWithinRadius"))
+
+numpy = _world._np
+
+if numpy is not None:
+    measure("NumPy, list of tuples", positions)
+    measure("NumPy, (n, 3) array", numpy.asarray(positions))
+else:
+    _common.report("NumPy isn't installed")
+
+_world._np = None
+
+try:
+    measure("pure Python", positions)
+finally:
+    _world._np = numpy
@@ -0,0 +1,157 @@
+"""Batch library of the GTA Orange Python wrapper, collecting setter calls and doing them at once
+
+Every setter like `Player.setPosition()` normally crosses into the server right away. Inside a batch the calls are
+recorded instead, and done in order when the batch ends. Repeated writes to the same field of the same entity are
+coalesced, only the last one is done (at the position of the last one), so e.g. resetting every player at round start
+doesn't send a position that is overwritten a few lines later.
+
+    from GTAOrange import batch
+
+    with batch.collect():
+        for player in players:
+            player.setPosition(x, y, z)
+            player.setHealth(200)
+
+`begin()` starts a batch without a block, which ends as soon as the server delivers its next event (end of tick).
+
+Please note that getters inside a batch still return the old values, since nothing was sent yet, and that batched
+setters return None instead of the result of the server function. Only setters and messages are batched, everything
+else (creating or deleting entities, getters, kicking, ...) is done right away.
+"""
+import itertools
+import traceback
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from GTAOrange import event as _event
+from GTAOrange import snapshot as _snapshot
+
+_current = None
+
+
+class Batch():
+    """Batch class
+
+    DO NOT GENERATE NEW OBJECTS DIRECTLY! Please use the collect() or begin() function instead.
+
+    @attr   coalesced   int     number of calls which were replaced by a later one
+    """
+    __slots__ = ('coalesced', '_calls', '_counter')
+
+    def __init__(self):
+        """Initializes a new, empty batch.
+        """
+        self.coalesced = 0
+        self._calls = OrderedDict()
+        self._counter = itertools.count()
+
+    def __len__(self):
+        return len(self._calls)
+
+    def add(self, key, native, args):
+        """Records a call.
+
+        @param  key     any         key of the written field (None if the call mustn't be coalesced)
+        @param  native  function    server function
+        @param  args    tuple       arguments
+        """
+        if key is None:
+            key = next(self._counter)
+        elif self._calls.pop(key, None) is not None:
+            self.coalesced += 1
+
+        self._calls[key] = (native, args)
+
+    def flush(self):
+        """Does all recorded calls in order, and invalidates the snapshot afterwards.
+        """
+        calls = self._calls
+
+        if not calls:
+            return
+
+        self._calls = OrderedDict()
+
+        for native, args in calls.values():
+            try:
+                native(*args)
+            except Exception:
+                print(traceback.format_exc())
+
+        _snapshot.invalidate()
+
+
+@contextmanager
+def collect():
+    """Starts a batch for the duration of a with block. Used inside another batch, the calls join the outer one.
+
+    @returns    GTAOrange.batch.Batch   batch object
+    """
+    global _current
+
+    if _current is not None:
+        yield _current
+        return
+
+    _current = Batch()
+
+    try:
+        yield _current
+    finally:
+        flush()
+
+
+def begin():
+    """Starts a batch which ends as soon as the server delivers its next event, or when `flush()` is called.
+
+    @returns    GTAOrange.batch.Batch   batch object (the running one, if there is one)
+    """
+    global _current
+
+    if _current is None:
+        _current = Batch()
+        _event.runInMain(flush)
+
+    return _current
+
+
+def flush():
+    """Ends the current batch, doing all recorded calls.
+    """
+    global _current
+
+    batch, _current = _current, None
+
+    if batch is not None:
+        batch.flush()
+
+
+def call(native, *args):
+    """Calls a server function, or records it in the current batch. Used by the other libraries.
+
+    @param  native  function    server function
+    @param  *args   *args       arguments
+
+    @returns    any     result of the server function (None if it was recorded)
+    """
+    if _current is None:
+        return native(*args)
+
+    _current.add(None, native, args)
+
+
+def write(field, native, id, *args):
+    """Calls a server function writing a field of an entity, or records it in the current batch, replacing an earlier
+    write of the same field. Used by the other libraries.
+
+    @param  field   string      name of the field, including the entity type (e.g. "player.position")
+    @param  native  function    server function
+    @param  id      int         entity id, passed as first argument
+    @param  *args   *args       further arguments
+
+    @returns    any     result of the server function (None if it was recorded)
+    """
+    if _current is None:
+        return native(id, *args)
+
+    _current.add((field, id), native, (id,) + args)
@@ -14,9 +14,10 @@ from GTAOrange import world as _world
 from GTAOrange import vehicle as _vehicle
 from GTAOrange import player as _player
 from GTAOrange import event as _event
+from GTAOrange import registry as _registry
+from GTAOrange import batch as _batch
 
-__pool = {}
-__ehandlers = {}
+__ehandlers = _event.Dispatcher()
 
 
 class Blip():
@@ -24,30 +25,23 @@ class Blip():
 
     DO NOT GENERATE NEW OBJECTS DIRECTLY! Please use the create() function instead.
 
-    @param  id          int                                                     blip id
-    @param  is_global   bool                                                    boolean which says if this blip is displayed to all players or not
-    @param  visible_to  GTAOrange.player.Player                                 player object if this is a blip only shown to one player, or `None` if it's global
-    @param  attached_to GTAOrange.player.Player OR GTAOrange.vehicle.Vehicle    player/vehicle object the blip is attached to, or `None` if it's not attached to anyone
+    @attr   id          int                                                     blip id
+    @attr   is_global   bool                                                    boolean which says if this blip is displayed to all players or not
+    @attr   visible_to  GTAOrange.player.Player                                 player object if this is a blip only shown to one player, or `None` if it's global
+    @attr   attached_to GTAOrange.player.Player OR GTAOrange.vehicle.Vehicle    player/vehicle object the blip is attached to, or `None` if it's not attached to anyone
     """
-    id = None
-    attached_to = None
-
-    is_global = False
-    visible_to = None
-
-    _ehandlers = {}
+    __slots__ = ('id', 'is_global', 'visible_to', 'attached_to')
 
     def __init__(self, id, player=None):
         """Initializes a new Blip object.
 
-        @param  id          int     blip id
-        @param  is_global   bool    boolean which says if this blip is displayed to all players or not
+        @param  id          int                         blip id
+        @param  player      GTAOrange.player.Player     player object if the blip is only shown to this player #optional
         """
         self.id = id
-
-        if player is not None:
-            self.is_global = True
-            self.player = player
+        self.is_global = player is None
+        self.visible_to = player
+        self.attached_to = None
 
     def attachTo(self, dest):
         """Attaches the blip to the vehicle represented by the given vehicle object, or to the player represented by the given player object.
@@ -85,7 +79,7 @@ class Blip():
             x1, y1, z1 = self.getPosition()
             return _world.getDistance(x1, y1, z1, x, y, z)
         else:
-            x1, y1 = self.getPosition()
+            x1, y1, z1 = self.getPosition()
             return _world.getDistance(x1, y1, x, y)
 
     def getID(self):
@@ -107,35 +101,35 @@ class Blip():
 
         @returns    color   GTAOrange.blip.Color    blip color
         """
-        __orange__.SetBlipColor(self.id, color)
+        _batch.write("blip.color", __orange__.SetBlipColor, self.id, color)
 
     def setRoute(self, route):
         """Enables/disables routing to blip.
 
         @param  route   bool    True for routing, False for not
         """
-        __orange__.SetBlipRoute(self.id, route)
+        _batch.write("blip.route", __orange__.SetBlipRoute, self.id, route)
 
     def setScale(self, scale):
         """Sets scale of blip.
 
         @param  scale   float   blip scale
         """
-        __orange__.SetBlipScale(self.id, scale)
+        _batch.write("blip.scale", __orange__.SetBlipScale, self.id, scale)
 
     def setSprite(self, sprite):
         """Sets sprite (texture, icon) of blip.
 
         @param  sprite  GTAOrange.blip.Sprite   blip sprite
         """
-        __orange__.SetBlipSprite(self.id, sprite)
+        _batch.write("blip.sprite", __orange__.SetBlipSprite, self.id, sprite)
 
     def setShortRange(self, toggle):
         """Sets that blip can be seen only on the short distance.
 
         @param  toggle  bool    True for yes, False for no
         """
-        __orange__.SetBlipShortRange(self.id, toggle)
+        _batch.write("blip.shortrange", __orange__.SetBlipShortRange, self.id, toggle)
 
 
 def create(name, x=0.0, y=0.0, z=0.0, scale=1.0, color=None, sprite=None):
@@ -172,11 +166,8 @@ def createBlipForAll(name, x=0.0, y=0.0, z=0.0, scale=1.0, color=None, sprite=No
 
     @returns    GTAOrange.blip.Blip     blip object
     """
-    global __pool
-
-    blip = Blip(__orange__.CreateBlipForAll(name, x, y, z, scale,
-                                            color if color is not None else Color.ORANGE, sprite if sprite is not None else Sprite.STANDARD))
-    __pool[blip.id] = blip
+    blip = _pool.add(Blip(__orange__.CreateBlipForAll(name, x, y, z, scale,
+                                                      color if color is not None else Color.ORANGE, sprite if sprite is not None else Sprite.STANDARD)))
     return blip
 
 
@@ -196,11 +187,8 @@ def createBlipForPlayerOnly(name, player, x=0.0, y=0.0, z=0.0, scale=1.0, color=
 
     @returns    GTAOrange.blip.Blip     blip object
     """
-    global __pool
-
-    blip = Blip(__orange__.CreateBlipForPlayer(player.id, name, x, y, z, scale,
-                                               color if color is not None else Color.ORANGE, sprite if sprite is not None else Sprite.STANDARD), player)
-    __pool[blip.id] = blip
+    blip = _pool.add(Blip(__orange__.CreateBlipForPlayer(player.id, name, x, y, z, scale,
+                                                         color if color is not None else Color.ORANGE, sprite if sprite is not None else Sprite.STANDARD), player))
 
     trigger("creation", blip)
     return blip
@@ -215,15 +203,12 @@ def deleteByID(id):
 
     @raises TypeError   raises if blip id is not int
     """
-    global __pool
+    blip = _pool.getChecked(id)
 
-    if isinstance(id, int):
-        if id in __pool.keys():
-            trigger("deletion", __pool[id])
-            del __pool[id]
-        return __orange__.DeleteBlip(id)
-    else:
-        raise TypeError('Blip ID must be an integer')
+    if blip is not None:
+        trigger("deletion", blip)
+        _pool.remove(id)
+    return __orange__.DeleteBlip(id)
 
 
 def getByID(id):
@@ -235,28 +220,32 @@ def getByID(id):
 
     @raises TypeError   raises if blip id is not int
     """
-    global __pool
-
-    if isinstance(id, int):
-        if _exists(id):
-            if id not in __pool.keys():
-                __pool[id] = Blip(id)
-                trigger("creation", __pool[id])
-            return __pool[id]
-        else:
-            return False
-    else:
-        raise TypeError('Blip ID must be an integer')
+    blip = _pool.get(id)
+
+    if blip is None:
+        blip = _pool.create(id)
+        trigger("creation", blip)
+    return blip
+
+
+def getByOwner(player):
+    """Returns all blips which are only shown to the given player.
+
+    @param  player  GTAOrange.player.Player     player object
+
+    @returns    list    list with blip objects
+    """
+    return _pool.find("owner", player.id)
 
 
 def getAll():
-    """Returns dictionary with all blip objects.
+    """Returns a read-only view of all blip objects.
 
-    WARNING! Can cause heavy load on some servers. If you can avoid using it, don't use it!
+    It stays up to date, copy it (e.g. with `list(getAll().values())`) if you create or delete blips while iterating.
 
-    @returns    dict    blip dictionary
+    @returns    mappingproxy    blip objects by id
     """
-    return __pool
+    return _pool.getAll()
 
 
 def on(event, cb):
@@ -264,12 +253,10 @@ def on(event, cb):
 
     @param  event   string      event name
     @param  cb      function    callback function
+
+    @returns    GTAOrange.event.Event   event object, call its `cancel()` method to unsubscribe
     """
-    if event in __ehandlers.keys():
-        __ehandlers[event].append(_event.Event(cb))
-    else:
-        __ehandlers[event] = []
-        __ehandlers[event].append(_event.Event(cb))
+    return __ehandlers.on(event, cb)
 
 
 def trigger(event, *args):
@@ -278,13 +265,10 @@ def trigger(event, *args):
     @param  event   string  event name
     @param  *args   *args   arguments
     """
-    if event in __ehandlers.keys():
-        for handler in __ehandlers[event]:
-            handler.getCallback()(*args)
+    __ehandlers.trigger(event, *args)
 
 
-def _exists(id):
-    return True
+_pool = _registry.EntityRegistry("Blip", Blip, {"owner": lambda blip: None if blip.visible_to is None else blip.visible_to.id})
 
 
 class Color():
@@ -1,9 +1,25 @@
 """Core class of GTA Orange Python wrapper
+
+Callback functions can also be coroutine functions (`async def`). Those are scheduled on an asyncio event loop
+running in a background thread, so slow I/O (e.g. a database lookup on `connect`) doesn't block the server.
+Coroutines mustn't call the GTA Orange functions directly, use `runInMain()` to hand work back to the main thread.
+Everything handed back is done as soon as the server delivers its next event, or whenever `drain()` is called.
 """
+import asyncio
+import queue
+import threading
+import traceback
+from functools import partial
 
 __pool = {}
 _current = 0
 
+_NO_HANDLERS = ()
+
+_loop = None
+_loop_lock = threading.Lock()
+_main_queue = queue.Queue()
+
 
 class Event():
     """Event class
@@ -13,15 +29,22 @@ class Event():
     id = None
 
     _cb = None
+    _dispatcher = None
+    _event = None
 
-    def __init__(self, cb):
+    def __init__(self, cb, dispatcher=None, event=None):
         """Initializes a new event object.
 
-        @param  cb      function    callback function
+        @param  cb          function                    callback function
+        @param  dispatcher  GTAOrange.event.Dispatcher  dispatcher the callback is subscribed to #optional
+        @param  event       string                      event name #optional
         """
         global _current
 
         self._cb = cb
+        self._call = partial(_schedule, cb) if asyncio.iscoroutinefunction(cb) else cb
+        self._dispatcher = dispatcher
+        self._event = event
         self.id = _current
 
         _current += 1
@@ -34,8 +57,198 @@ class Event():
         return self._cb
 
     def cancel(self):
-        """Cancels an event.
+        """Cancels an event, so the callback function won't be called anymore.
 
-        @todo   UNIMPLEMENTED!
+        Cancelling an already cancelled event does nothing.
+
+        @returns    bool    True if the event was subscribed, False if not
         """
-        pass
+        if self._dispatcher is None:
+            return False
+
+        return self._dispatcher.off(self)
+
+
+class Dispatcher():
+    """Dispatcher class, used by every library to manage its event handlers
+
+    The handlers of every event are stored by their id, so cancelling one doesn't need to search for it.
+    Next to that they're precompiled into a flat tuple of callback functions, which only gets rebuilt when someone
+    subscribes or unsubscribes. Triggering an event is therefore a single dictionary lookup plus the calls.
+
+    Every player, vehicle and marker owns a dispatcher of its own, that's why it's kept as small as possible.
+    """
+    __slots__ = ('_handlers', '_compiled')
+
+    def __init__(self):
+        """Initializes a new, empty dispatcher.
+        """
+        self._handlers = {}
+        self._compiled = {}
+
+    def on(self, event, cb):
+        """Subscribes for an event.
+
+        @param  event   string      event name
+        @param  cb      function    callback function (coroutine functions are run on the background event loop)
+
+        @returns    GTAOrange.event.Event   event object, call its `cancel()` method to unsubscribe
+        """
+        handler = Event(cb, self, event)
+
+        if event in self._handlers:
+            self._handlers[event][handler.id] = handler
+        else:
+            self._handlers[event] = {handler.id: handler}
+
+        self._compile(event)
+        return handler
+
+    def off(self, handler):
+        """Unsubscribes the given event object.
+
+        @param  handler     GTAOrange.event.Event   event object returned by `on()`
+
+        @returns    bool    True if the event was subscribed, False if not
+        """
+        handlers = self._handlers.get(handler._event)
+
+        if handlers is None or handlers.pop(handler.id, None) is None:
+            return False
+
+        if not handlers:
+            del self._handlers[handler._event]
+
+        handler._dispatcher = None
+        self._compile(handler._event)
+        return True
+
+    def clear(self):
+        """Unsubscribes every event object at once.
+
+        Called by the libraries as soon as an entity gets removed from its pool.
+        """
+        for handlers in self._handlers.values():
+            for handler in handlers.values():
+                handler._dispatcher = None
+
+        self._handlers.clear()
+        self._compiled.clear()
+
+    def trigger(self, event, *args):
+        """Calls every callback function subscribing for the event.
+
+        @param  event   string  event name
+        @param  *args   *args   arguments
+        """
+        for cb in self._compiled.get(event, _NO_HANDLERS):
+            cb(*args)
+
+    def _compile(self, event):
+        handlers = self._handlers.get(event)
+
+        if handlers:
+            self._compiled[event] = tuple(handler._call for handler in handlers.values())
+        else:
+            self._compiled.pop(event, None)
+
+
+def drain():
+    """Does everything that was handed back to the main thread by coroutines, see `runInMain()`.
+
+    Gets called automatically before every server event, so you usually don't have to call it on your own.
+    """
+    while True:
+        try:
+            cb, args = _main_queue.get_nowait()
+        except queue.Empty:
+            return
+
+        try:
+            cb(*args)
+        except Exception:
+            print(traceback.format_exc())
+
+
+def native(cb):
+    """Wraps a function which gets registered as server event, so the main thread queue is drained before it runs.
+
+    @param  cb      function    callback function
+
+    @returns    function    wrapped callback function
+    """
+    def wrapper(*args):
+        drain()
+        return cb(*args)
+
+    return wrapper
+
+
+def runInMain(cb, *args):
+    """Hands a function call over to the main thread. Thread-safe, so it can be used in coroutines and threads.
+
+    @param  cb      function    callback function
+    @param  *args   *args       arguments
+    """
+    _main_queue.put((cb, args))
+
+
+def schedule(coro):
+    """Schedules a coroutine on the background event loop, starting the loop if it isn't running yet.
+
+    Exceptions raised by the coroutine are printed on the main thread.
+
+    @param  coro    coroutine   coroutine object
+
+    @returns    concurrent.futures.Future   future of the coroutine
+    """
+    future = asyncio.run_coroutine_threadsafe(coro, _getLoop())
+    future.add_done_callback(_onCoroutineDone)
+    return future
+
+
+def shutdown():
+    """Stops the background event loop, if it is running.
+    """
+    global _loop
+
+    with _loop_lock:
+        if _loop is not None:
+            _loop.call_soon_threadsafe(_loop.stop)
+            _loop = None
+
+
+def _getLoop():
+    global _loop
+
+    with _loop_lock:
+        if _loop is None:
+            _loop = asyncio.new_event_loop()
+
+            thread = threading.Thread(target=_runLoop, args=(_loop,), name="GTAOrange-asyncio")
+            thread.daemon = True
+            thread.start()
+
+        return _loop
+
+
+def _runLoop(loop):
+    asyncio.set_event_loop(loop)
+
+    try:
+        loop.run_forever()
+    finally:
+        loop.close()
+
+
+def _schedule(cb, *args):
+    schedule(cb(*args))
+
+
+def _onCoroutineDone(future):
+    if not future.cancelled() and future.exception() is not None:
+        runInMain(_reportException, future.exception())
+
+
+def _reportException(exc):
+    print("".join(traceback.format_exception(type(exc), exc, exc.__traceback__)))
@@ -1,17 +1,59 @@
 """Hash-to-string & string-to-hash conversion classes. Very useful to not get confused with all the ingame items!
+
+The hash databases are loaded lazily, on first use of a container (e.g. `Vehicle.ADDER` or
+`Weapon.getStringByHash(...)`), so importing this library doesn't cost anything. The files are looked up next to
+this library, no matter what the current working directory is, and every file is parsed only once.
 """
-class HashContainer():
+import json
+import os
+import struct
+import threading
+
+try:
+    from collections.abc import Mapping
+except ImportError:
+    from collections import Mapping
+
+from GTAOrange import hashdb as _hashdb
+
+_PATH = os.path.dirname(os.path.abspath(__file__))
+_documents = {}
+_lock = threading.RLock()
+
+
+class _HashContainerType(type):
+    """Metaclass of `HashContainer`, loading the hash database of a container as soon as one of its attributes is used
+    """
+
+    def __getattr__(cls, name):
+        # only called if the attribute doesn't exist (yet)
+        if not name.startswith("__") and cls._ensureLoaded():
+            try:
+                return cls.__dict__[name]
+            except KeyError:
+                pass
+
+        raise AttributeError("type object '%s' has no attribute '%s'" % (cls.__name__, name))
+
+
+class HashContainer(metaclass=_HashContainerType):
     """Skeleton class for hash-string conversion of ingame GTA5 objects
+
+    Hashes are compared as unsigned 32-bit integers, so it doesn't matter if the server hands you
+    a signed or an unsigned representation of the same hash.
     """
     loaded = False
-    objects = {}
+
+    # file name (relative to this library) and dictionary key of the hash database, see _ensureLoaded()
+    _source = None
+    _as_attr = True
+    # True if the database should be read from its compiled version, see GTAOrange.hashdb
+    _binary = False
 
     @classmethod
     def load(cls, file_name, dict_key=None, as_attr=True):
-        with open(file_name) as file:
-            import json
-
-            cls.objects = json.load(file)
+        with _lock:
+            cls.objects = _loadDocument(file_name)
 
             if dict_key is not None:
                 cls.objects = cls.objects[dict_key]
@@ -20,30 +62,184 @@ class HashContainer():
                 for key, obj in cls.objects.items():
                     setattr(cls, key, obj)
 
+            cls._buildReverseIndex()
             cls.loaded = True
 
     @classmethod
-    def getHashByString(cls, string):
+    def _ensureLoaded(cls):
         if cls.loaded:
-            string = string.upper()
+            return True
+
+        if cls._source is None:
+            return False
+
+        with _lock:
+            if not cls.loaded:
+                file_name, dict_key = cls._source
+                file_name = os.path.join(_PATH, file_name)
+
+                if cls._binary:
+                    try:
+                        cls._loadBinary(file_name, dict_key)
+                    except (OSError, ValueError, struct.error):
+                        # e.g. read-only installation or a truncated file, so go on with the JSON file
+                        cls.load(file_name, dict_key, cls._as_attr)
+                else:
+                    cls.load(file_name, dict_key, cls._as_attr)
+
+        return True
+
+    @classmethod
+    def _loadBinary(cls, file_name, dict_key=None):
+        db = _hashdb.openDatabase(file_name, dict_key)
+
+        cls.objects = _NameMapping(db)
+        cls.hashes = _HashMapping(db)
+        cls.collisions = _CollisionMapping(db)
+        cls.loaded = True
 
-            if string in cls.objects.keys():
-                return cls.objects[string]
+    @classmethod
+    def _buildReverseIndex(cls):
+        cls.hashes = {}
+        cls.collisions = {}
+
+        for key, obj in cls.objects.items():
+            hash_ = _normalizeHash(obj)
+
+            if hash_ not in cls.hashes:
+                cls.hashes[hash_] = key
+            elif hash_ in cls.collisions:
+                cls.collisions[hash_].append(key)
             else:
-                return None
+                cls.collisions[hash_] = [cls.hashes[hash_], key]
+
+    @classmethod
+    def getHashByString(cls, string):
+        if cls._ensureLoaded():
+            return cls.objects.get(string.upper())
         else:
             return False
 
     @classmethod
     def getStringByHash(cls, hash_):
-        if cls.loaded:
-            for key, obj in cls.objects:
-                if hash_ == obj:
-                    return key
-            return None
+        if cls._ensureLoaded():
+            return cls.hashes.get(_normalizeHash(hash_))
+        else:
+            return False
+
+    @classmethod
+    def getStringsByHash(cls, hash_):
+        """Returns all strings sharing the given hash (usually only one).
+
+        @param  hash_   int     hash
+
+        @returns    list    list of strings (False if the container isn't loaded)
+        """
+        if cls._ensureLoaded():
+            hash_ = _normalizeHash(hash_)
+
+            if hash_ in cls.collisions:
+                return list(cls.collisions[hash_])
+            elif hash_ in cls.hashes:
+                return [cls.hashes[hash_]]
+            else:
+                return []
         else:
             return False
 
+    @classmethod
+    def getStringsByHashes(cls, hashes):
+        """Converts many hashes at once, e.g. for kill feeds or inventories.
+
+        @param  hashes  iterable    hashes
+
+        @returns    list    list of strings, None for every unknown hash (False if the container isn't loaded)
+        """
+        if cls._ensureLoaded():
+            get = cls.hashes.get
+            return [get(_normalizeHash(hash_)) for hash_ in hashes]
+        else:
+            return False
+
+    @classmethod
+    def getHashesByStrings(cls, strings):
+        """Converts many strings at once.
+
+        @param  strings     iterable    strings
+
+        @returns    list    list of hashes, None for every unknown string (False if the container isn't loaded)
+        """
+        if cls._ensureLoaded():
+            get = cls.objects.get
+            return [get(string.upper()) for string in strings]
+        else:
+            return False
+
+
+class _NameMapping(Mapping):
+    """Read-only dictionary of names and hashes, backed by a compiled hash database
+    """
+
+    def __init__(self, db):
+        self._db = db
+
+    def __getitem__(self, name):
+        value = self._db.getValue(name)
+
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def __iter__(self):
+        return (name for name, value in self._db.items())
+
+    def __len__(self):
+        return len(self._db)
+
+    def items(self):
+        return self._db.items()
+
+
+class _HashMapping(_NameMapping):
+    """Read-only dictionary of unsigned hashes and names, backed by a compiled hash database
+    """
+
+    def __getitem__(self, hash_):
+        name = self._db.getName(hash_) if isinstance(hash_, int) else None
+
+        if name is None:
+            raise KeyError(hash_)
+        return name
+
+    def __iter__(self):
+        last = None
+
+        for hash_, name in self._db.hashItems():
+            if hash_ != last:
+                yield hash_
+                last = hash_
+
+    def __len__(self):
+        return sum(1 for hash_ in self)
+
+    def items(self):
+        return ((hash_, self[hash_]) for hash_ in self)
+
+
+class _CollisionMapping(_HashMapping):
+    """Read-only dictionary of unsigned hashes shared by several names, backed by a compiled hash database
+    """
+
+    def __getitem__(self, hash_):
+        names = self._db.getNames(hash_) if isinstance(hash_, int) else []
+
+        if len(names) < 2:
+            raise KeyError(hash_)
+        return names
+
+    def __iter__(self):
+        return (hash_ for hash_ in _HashMapping.__iter__(self) if hash_ in self)
+
 
 class Key():
     """Enum-like class with attributes representing all buttons/keys which on which GTA Orange reacts
@@ -145,21 +341,21 @@ class Vehicle(HashContainer):
     You can use the methods of the `HashContainer` class on this one as well.
     See the docs for more info.
     """
-    pass
+    _source = ("vehicles.json", "vehicles")
 
 class VehicleColor(HashContainer):
     """Enum-like class with attributes representing all available vehicle colors.
     You can use the methods of the `HashContainer` class on this one as well.
     See the docs for more info.
     """
-    pass
+    _source = ("colors.json", "vehicle_colors")
 
 class Weapon(HashContainer):
     """Enum-like class with attributes representing all ingame weapons.
     You can use the methods of the `HashContainer` class on this one as well.
     See the docs for more info.
     """
-    pass
+    _source = ("weapons.json", "weapons")
 
 
 class Gadget(HashContainer):
@@ -167,7 +363,7 @@ class Gadget(HashContainer):
     You can use the methods of the `HashContainer` class on this one as well.
     See the docs for more info.
     """
-    pass
+    _source = ("weapons.json", "gadgets")
 
 
 class VehicleWeapon(HashContainer):
@@ -175,7 +371,7 @@ class VehicleWeapon(HashContainer):
     You can use the methods of the `HashContainer` class on this one as well.
     See the docs for more info.
     """
-    pass
+    _source = ("weapons.json", "vehicle_weapons")
 
 
 class Explosive(HashContainer):
@@ -183,7 +379,7 @@ class Explosive(HashContainer):
     You can use the methods of the `HashContainer` class on this one as well.
     See the docs for more info.
     """
-    pass
+    _source = ("weapons.json", "explosives")
 
 
 class Object(HashContainer):
@@ -191,23 +387,55 @@ class Object(HashContainer):
     You can use the methods of the `HashContainer` class on this one as well.
     See the docs for more info.
 
-    Please note that you've to call `loadHashContainer("Object")` before you can use it properly.
+    Its database is quite big, so it's read from a compiled version (see `GTAOrange.hashdb`) on first use.
+    """
+    _source = ("objects.json", None)
+    _as_attr = False
+    _binary = True
+
+
+def getWeaponStringByHash(hash_):
+    """Converts a hash of a weapon, gadget, vehicle weapon or explosive to its string, e.g. the weapon of a death event.
+
+    If a hash is used in more than one of these groups, the weapons take precedence over the gadgets, vehicle weapons
+    and explosives (in this order).
+
+    @param  hash_   int     hash
+
+    @returns    str     string (None if it's unknown)
     """
-    pass
+    for container in (Weapon, Gadget, VehicleWeapon, Explosive):
+        string = container.getStringByHash(hash_)
+
+        if string:
+            return string
+
+    return None
 
 
 def loadHashContainer(container):
+    """Returns a hash container by its name. The database is loaded on first use, so this doesn't block.
+
+    Kept for backwards compatibility, since the containers are loaded lazily anyway.
+
+    @param  container   str     container name (e.g. "Object")
+
+    @returns    GTAOrange.hash.HashContainer    container class (None if there is no container with this name)
+    """
     if container == "Object":
-        Object.load(
-            "./modules/python-module/GTAOrange/objects.json", as_attr=False)
         return Object
 
 
-# autoloaded hash databases
-Vehicle.load("./modules/python-module/GTAOrange/vehicles.json", "vehicles")
-VehicleColor.load("./modules/python-module/GTAOrange/colors.json", "vehicle_colors")
-Weapon.load("./modules/python-module/GTAOrange/weapons.json", "weapons")
-Gadget.load("./modules/python-module/GTAOrange/weapons.json", "gadgets")
-VehicleWeapon.load(
-    "./modules/python-module/GTAOrange/weapons.json", "vehicle_weapons")
-Explosive.load("./modules/python-module/GTAOrange/weapons.json", "explosives")
+def _loadDocument(file_name):
+    with _lock:
+        if file_name not in _documents:
+            with open(file_name) as file:
+                _documents[file_name] = json.load(file)
+
+        return _documents[file_name]
+
+
+def _normalizeHash(hash_):
+    if isinstance(hash_, int):
+        return hash_ & 0xFFFFFFFF
+    return hash_
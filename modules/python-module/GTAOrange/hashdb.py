@@ -0,0 +1,277 @@
+"""Compiled binary format for the hash databases of the GTA Orange Python wrapper
+
+Big databases like objects.json are compiled into a compact binary file, which is read through `mmap` and searched
+with binary search. So there is neither JSON to parse at startup nor a Python object per entry in memory.
+
+Layout (little-endian):
+
+    header      8s magic, uint32 version, uint32 entry count
+    name table  per entry: uint32 name offset, uint32 name length, int64 value     (sorted by name)
+    hash table  per entry: uint32 unsigned hash, uint32 index into the name table   (sorted by hash)
+    names       all names, concatenated (UTF-8)
+
+Names sharing a hash keep the order they have in the JSON file, so lookups return the same as the JSON file would.
+
+The files are compiled automatically on first use (see `openDatabase()`), but you can also compile them in advance:
+
+    python hashdb.py objects.json
+"""
+import json
+import mmap
+import os
+import struct
+import sys
+
+MAGIC = b"GOHASHDB"
+VERSION = 2
+EXTENSION = ".hashdb"
+
+_HEADER = struct.Struct("<8sII")
+_NAME = struct.Struct("<IIq")
+_HASH = struct.Struct("<II")
+
+
+class Database():
+    """Database class, a read-only view on a compiled hash database
+
+    DO NOT GENERATE NEW OBJECTS DIRECTLY! Please use the openDatabase() function instead.
+
+    @attr   count   int     number of entries
+    """
+    __slots__ = ('count', '_mm', '_names_offset', '_hashes_offset', '_blob_offset')
+
+    def __init__(self, file_name):
+        """Maps a compiled hash database into memory.
+
+        @param  file_name   str     path of the compiled file
+
+        @raises     ValueError      raises if the file isn't a compiled hash database of this version, or is truncated
+        @raises     struct.error    raises if the file is too short for the header
+        """
+        with open(file_name, "rb") as file:
+            self._mm = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        try:
+            magic, version, self.count = _HEADER.unpack_from(self._mm, 0)
+        except struct.error:
+            self._mm.close()
+            raise
+
+        if magic != MAGIC or version != VERSION:
+            self._mm.close()
+            raise ValueError("%s is no compiled hash database of version %d" % (file_name, VERSION))
+
+        self._names_offset = _HEADER.size
+        self._hashes_offset = self._names_offset + self.count * _NAME.size
+        self._blob_offset = self._hashes_offset + self.count * _HASH.size
+
+        if len(self._mm) < self._blob_offset:
+            self._mm.close()
+            raise ValueError("%s is truncated" % file_name)
+
+    def __len__(self):
+        return self.count
+
+    def close(self):
+        """Unmaps the file.
+        """
+        self._mm.close()
+
+    def getValue(self, name):
+        """Returns the value (hash) of a name.
+
+        @param  name    str     name (case-sensitive)
+
+        @returns    int     value (None if the name is unknown)
+        """
+        name = name.encode("utf-8")
+        lo, hi = 0, self.count
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+            current = self._getName(mid)
+
+            if current < name:
+                lo = mid + 1
+            elif current > name:
+                hi = mid
+            else:
+                return _NAME.unpack_from(self._mm, self._names_offset + mid * _NAME.size)[2]
+
+        return None
+
+    def getNames(self, hash_):
+        """Returns all names sharing an unsigned 32-bit hash (usually only one), in the order of the JSON file.
+
+        @param  hash_   int     unsigned 32-bit hash
+
+        @returns    list    list of names
+        """
+        index = self._findHash(hash_)
+        names = []
+
+        while index < self.count:
+            current, name_index = _HASH.unpack_from(self._mm, self._hashes_offset + index * _HASH.size)
+
+            if current != hash_:
+                break
+
+            names.append(self._getName(name_index).decode("utf-8"))
+            index += 1
+
+        return names
+
+    def getName(self, hash_):
+        """Returns the first name of an unsigned 32-bit hash in the JSON file.
+
+        @param  hash_   int     unsigned 32-bit hash
+
+        @returns    str     name (None if the hash is unknown)
+        """
+        index = self._findHash(hash_)
+
+        if index < self.count:
+            current, name_index = _HASH.unpack_from(self._mm, self._hashes_offset + index * _HASH.size)
+
+            if current == hash_:
+                return self._getName(name_index).decode("utf-8")
+
+        return None
+
+    def items(self):
+        """Iterates over all names and values, sorted by name.
+
+        @returns    generator   tuples with name and value
+        """
+        for index in range(self.count):
+            offset, length, value = _NAME.unpack_from(self._mm, self._names_offset + index * _NAME.size)
+            start = self._blob_offset + offset
+            yield self._mm[start:start + length].decode("utf-8"), value
+
+    def hashItems(self):
+        """Iterates over all unsigned 32-bit hashes and names, sorted by hash.
+
+        @returns    generator   tuples with hash and name
+        """
+        for index in range(self.count):
+            hash_, name_index = _HASH.unpack_from(self._mm, self._hashes_offset + index * _HASH.size)
+            yield hash_, self._getName(name_index).decode("utf-8")
+
+    def _findHash(self, hash_):
+        # lower bound, so the first of several colliding entries is found
+        lo, hi = 0, self.count
+
+        while lo < hi:
+            mid = (lo + hi) // 2
+
+            if _HASH.unpack_from(self._mm, self._hashes_offset + mid * _HASH.size)[0] < hash_:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        return lo
+
+    def _getName(self, index):
+        offset, length = _NAME.unpack_from(self._mm, self._names_offset + index * _NAME.size)[:2]
+        start = self._blob_offset + offset
+        return self._mm[start:start + length]
+
+
+def compileDatabase(source, target=None, dict_key=None):
+    """Compiles a JSON hash database into the binary format.
+
+    @param  source      str     path of the JSON file
+    @param  target      str     path of the compiled file (source path with .hashdb extension if not given) #optional
+    @param  dict_key    str     key of the dictionary inside the JSON file which should be compiled #optional
+
+    @returns    str     path of the compiled file
+    """
+    if target is None:
+        target = getTarget(source, dict_key)
+
+    with open(source) as file:
+        objects = json.load(file)
+
+    if dict_key is not None:
+        objects = objects[dict_key]
+
+    entries = sorted((name.encode("utf-8"), value, position)
+                     for position, (name, value) in enumerate(objects.items()))
+
+    names = bytearray()
+    name_table = bytearray()
+
+    for name, value, position in entries:
+        name_table += _NAME.pack(len(names), len(name), value)
+        names += name
+
+    # names sharing a hash are sorted by their position in the JSON file
+    hashes = sorted((value & 0xFFFFFFFF, position, index) for index, (name, value, position) in enumerate(entries))
+    hash_table = bytearray()
+
+    for hash_, position, index in hashes:
+        hash_table += _HASH.pack(hash_, index)
+
+    # write to a temporary file first, so a running server never maps a half-written file
+    temp = "%s.%d.tmp" % (target, os.getpid())
+
+    try:
+        with open(temp, "wb") as file:
+            file.write(_HEADER.pack(MAGIC, VERSION, len(entries)))
+            file.write(name_table)
+            file.write(hash_table)
+            file.write(names)
+
+        os.replace(temp, target)
+    except BaseException:
+        try:
+            os.remove(temp)
+        except OSError:
+            pass
+        raise
+
+    return target
+
+
+def getTarget(source, dict_key=None):
+    """Returns the path of the compiled file belonging to a JSON hash database.
+
+    @param  source      str     path of the JSON file
+    @param  dict_key    str     key of the dictionary inside the JSON file #optional
+
+    @returns    str     path of the compiled file
+    """
+    base = os.path.splitext(source)[0]
+
+    if dict_key is not None:
+        base += "." + dict_key
+
+    return base + EXTENSION
+
+
+def openDatabase(source, dict_key=None):
+    """Opens the compiled version of a JSON hash database, (re)compiling it first if it is missing or outdated.
+
+    @param  source      str     path of the JSON file
+    @param  dict_key    str     key of the dictionary inside the JSON file #optional
+
+    @returns    GTAOrange.hashdb.Database   database object
+
+    @raises     OSError     raises if the compiled file can't be written or read
+    """
+    target = getTarget(source, dict_key)
+
+    if not os.path.exists(target) or os.path.getmtime(target) < os.path.getmtime(source):
+        compileDatabase(source, target, dict_key)
+
+    try:
+        return Database(target)
+    except (ValueError, struct.error):
+        # compiled by another version, or truncated
+        compileDatabase(source, target, dict_key)
+        return Database(target)
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:] or [os.path.join(os.path.dirname(os.path.abspath(__file__)), "objects.json")]:
+        sys.stdout.write("%s -> %s\n" % (path, compileDatabase(path)))
@@ -22,9 +22,10 @@ from GTAOrange import world as _world
 from GTAOrange import event as _event
 from GTAOrange import vehicle as _vehicle
 from GTAOrange import player as _player
+from GTAOrange import registry as _registry
 
-__pool = {}
-__ehandlers = {}
+__ehandlers = _event.Dispatcher()
+__grid = _world.Grid(50.0)
 
 
 class Marker():
@@ -46,8 +47,7 @@ class Marker():
     h = None
     r = None
 
-    _ehandlers = {}
-    _players = {}
+    __slots__ = ('_ehandlers', '_players', '__dict__')
 
     def __init__(self, id, x, y, z, h, r):
         """Initializes a new Marker object.
@@ -65,6 +65,22 @@ class Marker():
         self.z = z
         self.h = h
         self.r = r
+        self._ehandlers = _event.Dispatcher()
+        self._players = {}
+
+    def contains(self, x, y, z):
+        """Checks if the given coordinates are inside the marker (a cylinder around its position).
+
+        @param  x       float   x-coord
+        @param  y       float   y-coord
+        @param  z       float   z-coord
+
+        @returns    bool    True for yes, False for no
+        """
+        dx = x - self.x
+        dy = y - self.y
+
+        return dx * dx + dy * dy <= self.r * self.r and abs(z - self.z) <= self.h
 
     def delete(self):
         """Deletes the marker.
@@ -84,7 +100,7 @@ class Marker():
             x1, y1, z1 = self.getPosition()
             return _world.getDistance(x1, y1, z1, x, y, z)
         else:
-            x1, y1 = self.getPosition()
+            x1, y1, z1 = self.getPosition()
             return _world.getDistance(x1, y1, x, y)
 
     def getID(self):
@@ -94,6 +110,13 @@ class Marker():
         """
         return self.id
 
+    def getPlayers(self):
+        """Returns the players which are currently inside the marker.
+
+        @returns    list    list with player objects
+        """
+        return list(self._players.values())
+
     def getPosition(self):
         """Returns current marker position.
 
@@ -106,12 +129,10 @@ class Marker():
 
         @param  event   string      event name
         @param  cb      function    callback function
+
+        @returns    GTAOrange.event.Event   event object, call its `cancel()` method to unsubscribe
         """
-        if event in self._ehandlers.keys():
-            self._ehandlers[event].append(_event.Event(cb))
-        else:
-            self._ehandlers[event] = []
-            self._ehandlers[event].append(_event.Event(cb))
+        return self._ehandlers.on(event, cb)
 
     def trigger(self, event, *args):
         """Triggers an event for the event handlers subscribing to this specific marker.
@@ -119,9 +140,7 @@ class Marker():
         @param  event   string      event name
         @param  *args   *args       arguments
         """
-        if event in self._ehandlers.keys():
-            for handler in self._ehandlers[event]:
-                handler.getCallback()(self, *args)
+        self._ehandlers.trigger(event, self, *args)
 
 
 def create(x, y, z, h=1, r=1, blip=False):
@@ -139,11 +158,10 @@ def create(x, y, z, h=1, r=1, blip=False):
     @returns    GTAOrange.marker.Marker     marker object
     """
     from GTAOrange import blip as _blip
-    global __pool
 
-    marker = Marker(__orange__.CreateMarkerForAll(
-        x, y, z, h, r), x, y, z, h, r)
-    __pool[marker.id] = marker
+    marker = _pool.add(Marker(__orange__.CreateMarkerForAll(
+        x, y, z, h, r), x, y, z, h, r))
+    __grid.insert(marker.id, x, y, r)
 
     if blip is not False:
         marker.blip = _blip.create("Marker", x, y, z)
@@ -161,15 +179,14 @@ def deleteByID(id):
 
     @raises     TypeError   raises if marker id is not int
     """
-    global __pool
+    marker = _pool.getChecked(id)
 
-    if isinstance(id, int):
-        if id in __pool.keys():
-            trigger("deletion", __pool[id])
-            del __pool[id]
-        return __orange__.DeleteMarker(id)
-    else:
-        raise TypeError('Marker ID must be an integer')
+    if marker is not None:
+        trigger("deletion", marker)
+        marker._ehandlers.clear()
+        __grid.remove(id)
+        _pool.remove(id)
+    return __orange__.DeleteMarker(id)
 
 
 def getByID(id):
@@ -177,32 +194,116 @@ def getByID(id):
 
     @param  id      int     marker id
 
-    @returns    GTAOrange.marker.Marker     marker object (False on failure)
-
-    @raises     TypeError   raises if marker id is not int
+    @returns    GTAOrange.marker.Marker     marker object (False if it wasn't created in Python)
     """
-    global __pool
-
-    if isinstance(id, int):
-        if _exists(id):
-            if id not in __pool.keys():
-                __pool[id] = Marker(id)
-                trigger("creation", __pool[id])
-            return __pool[id]
-        else:
-            return False
-    else:
-        raise TypeError('Marker ID must be an integer')
+    marker = _pool.get(id)
+
+    if marker is None:
+        return False
+    return marker
 
 
 def getAll():
-    """Returns dictionary with all marker objects.
+    """Returns a read-only view of all marker objects.
+
+    It stays up to date, copy it (e.g. with `list(getAll().values())`) if you create or delete markers while iterating.
+
+    @returns    mappingproxy    marker objects by id
+    """
+    return _pool.getAll()
+
+
+def markersNear(x, y, z, radius=0.0):
+    """Returns all markers which are near the given coordinates, using the spatial grid of all markers.
+
+    With the default radius this are the markers containing the coordinates.
 
-    WARNING! Can cause heavy load on some servers. If you can avoid using it, don't use it!
+    @param  x       float   x-coord
+    @param  y       float   y-coord
+    @param  z       float   z-coord
+    @param  radius  float   additional distance a marker may be away from the coordinates #optional
 
-    @returns    dict    marker dictionary
+    @returns    list    list with marker objects
     """
-    return __pool
+    markers = []
+
+    for id in (__grid.getAt(x, y) if radius <= 0 else __grid.getNear(x, y, radius)):
+        marker = _pool.get(id)
+        dx = x - marker.x
+        dy = y - marker.y
+        r = marker.r + radius
+
+        if dx * dx + dy * dy <= r * r and abs(z - marker.z) <= marker.h + radius:
+            markers.append(marker)
+
+    return markers
+
+
+def getPlayersInMarkers(players=None):
+    """Checks in one pass which players are inside which markers.
+
+    Every player position is fetched only once and only compared to the markers sharing its grid cell,
+    so this scales with the number of players instead of players times markers.
+
+    @param  players     iterable    player objects to check (all players if not given) #optional
+
+    @returns    dict    dictionary with marker objects as keys and lists of player objects as values
+    """
+    if players is None:
+        players = _player.getAll().values()
+
+    result = {}
+
+    for player in players:
+        x, y, z = player.getPosition()
+
+        for id in __grid.getAt(x, y):
+            marker = _pool.get(id)
+
+            if marker.contains(x, y, z):
+                if marker in result:
+                    result[marker].append(player)
+                else:
+                    result[marker] = [player]
+
+    return result
+
+
+def updatePlayers(players=None):
+    """Detects which players entered or left markers since the last check and triggers the matching events.
+
+    Useful for markers which only exist on the Python side, or if the server doesn't report marker events fast
+    enough. Players already reported by the server aren't triggered again.
+
+    @param  players     iterable    player objects to check (all players if not given) #optional
+    """
+    pool = _player.getAll()
+
+    if players is None:
+        players = list(pool.values())
+
+    checked = set(player.id for player in players)
+    inside = getPlayersInMarkers(players)
+
+    for marker in list(_pool.values()):
+        current = inside.get(marker, ())
+
+        for player in current:
+            if player.id not in marker._players:
+                _onPlayerEnteredMarker(player.id, marker.id)
+
+        if marker._players:
+            current_ids = set(player.id for player in current)
+
+            for player_id in list(marker._players.keys()):
+                if player_id in current_ids:
+                    continue
+
+                if player_id not in pool:
+                    # player is gone already
+                    del marker._players[player_id]
+                elif player_id in checked:
+                    _onPlayerLeftMarker(player_id, marker.id)
 
 
 def on(event, cb):
@@ -210,12 +311,10 @@ def on(event, cb):
 
     @param  event   string      event name
     @param  cb      function    callback function
+
+    @returns    GTAOrange.event.Event   event object, call its `cancel()` method to unsubscribe
     """
-    if event in __ehandlers.keys():
-        __ehandlers[event].append(_event.Event(cb))
-    else:
-        __ehandlers[event] = []
-        __ehandlers[event].append(_event.Event(cb))
+    return __ehandlers.on(event, cb)
 
 
 def trigger(event, *args):
@@ -224,18 +323,17 @@ def trigger(event, *args):
     @param  event   string  event name
     @param  *args   *args   arguments
     """
-    if event in __ehandlers.keys():
-        for handler in __ehandlers[event]:
-            handler.getCallback()(*args)
+    __ehandlers.trigger(event, *args)
 
 
-def _exists(id):
-    return True
+# markers created outside of Python can't be wrapped, their position and size are unknown
+_pool = _registry.EntityRegistry("Marker")
 
 
 def _onPlayerEnteredMarker(player_id, marker_id):
     player = _player.getByID(player_id)
     marker = getByID(marker_id)
+    marker._players[player.id] = player
 
     trigger("playerentered", marker, player)
     marker.trigger("playerentered", player)
@@ -246,6 +344,7 @@ def _onPlayerEnteredMarker(player_id, marker_id):
 def _onPlayerLeftMarker(player_id, marker_id):
     player = _player.getByID(player_id)
     marker = getByID(marker_id)
+    marker._players.pop(player.id, None)
 
     trigger("playerleft", marker, player)
     marker.trigger("playerleft", player)
@@ -273,7 +372,7 @@ def _onVehicleLeftMarker(vehicle_id, marker_id):
     vehicle.trigger("leftmarker", marker)
 
 
-__orange__.AddServerEvent(_onPlayerEnteredMarker, "EnterMarker")
-__orange__.AddServerEvent(_onPlayerLeftMarker, "LeftMarker")
-__orange__.AddServerEvent(_onVehicleEnteredMarker, "VehEnterMarker")
-__orange__.AddServerEvent(_onVehicleLeftMarker, "VehLeftMarker")
+__orange__.AddServerEvent(_event.native(_onPlayerEnteredMarker), "EnterMarker")
+__orange__.AddServerEvent(_event.native(_onPlayerLeftMarker), "LeftMarker")
+__orange__.AddServerEvent(_event.native(_onVehicleEnteredMarker), "VehEnterMarker")
+__orange__.AddServerEvent(_event.native(_onVehicleLeftMarker), "VehLeftMarker")
@@ -11,9 +11,9 @@ Subscribable built-in events:
 """
 import __orange__
 from GTAOrange import event as _event
+from GTAOrange import registry as _registry
 
-__pool = {}
-__ehandlers = {}
+__ehandlers = _event.Dispatcher()
 
 
 class Object():
@@ -21,18 +21,19 @@ class Object():
 
     DO NOT GENERATE NEW OBJECTS DIRECTLY! Please use the create() function instead.
 
-    @param  id      int     object id
+    @attr   id      int         object id
+    @attr   model   str OR int  model name OR hash (None, when the object wasn't created in Python)
     """
-    id = None
-
-    _ehandlers = {}
+    __slots__ = ('id', 'model')
 
-    def __init__(self, id):
+    def __init__(self, id, model=None):
         """Initializes a new Object object.
 
-        @param  id      int     object id
+        @param  id      int         object id
+        @param  model   str OR int  model name OR hash #optional
         """
         self.id = id
+        self.model = model
 
     def delete(self):
         """Deletes the object.
@@ -46,6 +47,13 @@ class Object():
         """
         return self.id
 
+    def getModel(self):
+        """Returns model name or hash.
+
+        @returns    str OR int  model name OR hash (returns None, when the object wasn't created in Python!)
+        """
+        return self.model
+
     def equals(self, obj):
         """Checks if given object IS this object.
 
@@ -74,10 +82,7 @@ def create(model, x, y, z, pitch=0.0, yaw=0.0, roll=0.0):
 
     @returns    GTAOrange.object.Object     object object
     """
-    global __pool
-
-    object_ = Object(__orange__.CreateObject(model, x, y, z, pitch, yaw, roll))
-    __pool[object_.id] = object_
+    object_ = _pool.add(Object(__orange__.CreateObject(model, x, y, z, pitch, yaw, roll), model))
 
     trigger("creation", object_)
     return object_
@@ -92,17 +97,14 @@ def deleteByID(id):
 
     @raises     TypeError   raises if object id is not int
     """
-    global __pool
+    object_ = _pool.getChecked(id)
 
-    if isinstance(id, int):
-        if id in __pool.keys():
-            trigger("deletion", __pool[id])
-            del __pool[id]
-            return __orange__.DeleteObject(id)
-        else:
-            return False
-    else:
-        raise TypeError('Object ID must be an integer')
+    if object_ is None:
+        return False
+
+    trigger("deletion", object_)
+    _pool.remove(id)
+    return __orange__.DeleteObject(id)
 
 
 def getByID(id):
@@ -114,28 +116,32 @@ def getByID(id):
 
     @raises     TypeError   raises if object id is not int
     """
-    global __pool
-
-    if isinstance(id, int):
-        if _exists(id):
-            if id not in __pool.keys():
-                __pool[id] = Object(id)
-                trigger("creation", __pool[id])
-            return __pool[id]
-        else:
-            return False
-    else:
-        raise TypeError('Object ID must be an integer')
+    object_ = _pool.get(id)
+
+    if object_ is None:
+        object_ = _pool.create(id)
+        trigger("creation", object_)
+    return object_
+
+
+def getByModel(model):
+    """Returns all object objects created with the given model.
+
+    @param  model   str OR int  model name OR hash, as passed to create()
+
+    @returns    list    list with object objects
+    """
+    return _pool.find("type", model)
 
 
 def getAll():
-    """Returns dictionary with all object objects.
+    """Returns a read-only view of all object objects.
 
-    WARNING! Can cause heavy load on some servers. If you can avoid using it, don't use it!
+    It stays up to date, copy it (e.g. with `list(getAll().values())`) if you create or delete objects while iterating.
 
-    @returns    dict    object dictionary
+    @returns    mappingproxy    object objects by id
     """
-    return __pool
+    return _pool.getAll()
 
 
 def on(event, cb):
@@ -143,12 +149,10 @@ def on(event, cb):
 
     @param  event   string      event name
     @param  cb      function    callback function
+
+    @returns    GTAOrange.event.Event   event object, call its `cancel()` method to unsubscribe
     """
-    if event in __ehandlers.keys():
-        __ehandlers[event].append(_event.Event(cb))
-    else:
-        __ehandlers[event] = []
-        __ehandlers[event].append(_event.Event(cb))
+    return __ehandlers.on(event, cb)
 
 
 def trigger(event, *args):
@@ -157,10 +161,7 @@ def trigger(event, *args):
     @param  event   string  event name
     @param  *args   *args   arguments
     """
-    if event in __ehandlers.keys():
-        for handler in __ehandlers[event]:
-            handler.getCallback()(*args)
+    __ehandlers.trigger(event, *args)
 
 
-def _exists(id):
-    return True
+_pool = _registry.EntityRegistry("Object", Object, {"type": lambda object_: object_.model})
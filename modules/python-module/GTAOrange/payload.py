@@ -0,0 +1,491 @@
+"""Payload library of the GTA Orange Python wrapper, sending large client event arguments in a compact form
+
+`Player.triggerClient()` hands its arguments to the server as they are, so a scoreboard or an inventory is sent in
+full every time it's updated. `triggerClient()` of this library packs the arguments into a single string instead:
+
+    from GTAOrange import payload
+
+    payload.triggerClient(player, "ui:scoreboard", rows)
+
+- the values are encoded in a compact binary format (see below),
+- the encoding gets compressed with zlib if it's larger than `compress_threshold` bytes,
+- if the player got the same event before, only the changes to the last arguments are sent (a patch), and nothing at
+  all if they didn't change.
+
+The client has to unpack the string with a matching decoder, that's why this is opt-in per event. `decode()` is the
+reference implementation in Python. Packed events are triggered with a single argument, the frame:
+
+    frame   base64 of: flags (1 byte: 1 = zlib compressed, 2 = patch) + encoded value
+
+    value   tag (1 byte) + data, all numbers little-endian
+            0 None, 1 True, 2 False
+            3 int8, 4 int16, 5 int32, 6 int64, 7 float64
+            8 str (varint length + UTF-8), 9 bytes (varint length + data)
+            10 list (varint count + values), 11 dict (varint count + key/value pairs)
+
+    patch   12 dict patch: varint count + key/value pairs to set (values may be patches themselves),
+                           varint count + keys to delete
+            13 list patch: varint new length, varint count + varint index/value pairs to set (values may be
+                           patches themselves), indices beyond the old length are appended
+
+The last arguments are remembered per player and event until the player disconnects. Call `reset()` if a client
+lost track, e.g. after it reloaded its UI, so the next event is sent in full.
+"""
+import base64
+import struct
+import zlib
+
+import __orange__
+from GTAOrange import batch as _batch
+from GTAOrange import player as _player
+
+# encodings larger than this (in bytes) get compressed
+compress_threshold = 512
+
+_NONE, _TRUE, _FALSE, _INT8, _INT16, _INT32, _INT64, _FLOAT, _STR, _BYTES, _LIST, _DICT, _DICT_PATCH, _LIST_PATCH = \
+    range(14)
+
+_COMPRESSED = 1
+_PATCH = 2
+
+_INT8_STRUCT = struct.Struct("<b")
+_INT16_STRUCT = struct.Struct("<h")
+_INT32_STRUCT = struct.Struct("<i")
+_INT64_STRUCT = struct.Struct("<q")
+_FLOAT_STRUCT = struct.Struct("<d")
+
+_UNCHANGED = object()
+_SCALARS = frozenset((type(None), bool, int, float, str, bytes))
+
+_sent = {}  # (player id, event name) -> copy of the last arguments
+
+
+def encode(value):
+    """Encodes a value in the binary format described above.
+
+    @param  value   any     None, bool, int (64 bit), float, str, bytes, list, tuple or dict with these values
+
+    @returns    bytes   encoded value
+
+    @raises     TypeError   raises if the value (or a part of it) can't be encoded
+    """
+    out = bytearray()
+    _encode(value, out)
+    return bytes(out)
+
+
+def decode(frame, previous=None):
+    """Decodes a frame, the reference implementation of the client side.
+
+    @param  frame       str     frame as sent by `triggerClient()`
+    @param  previous    list    arguments decoded from the previous frame of the same event, needed for patches #optional
+
+    @returns    list    arguments
+
+    @raises     ValueError  raises if the frame is corrupt, or if it's a patch and previous is missing
+    """
+    data = base64.b64decode(frame)
+
+    if not data:
+        raise ValueError("empty frame")
+
+    flags = data[0]
+    body = data[1:]
+
+    if flags & _COMPRESSED:
+        try:
+            body = zlib.decompress(body)
+        except zlib.error as e:
+            raise ValueError("corrupt compressed frame: %s" % e)
+
+    try:
+        value, offset = _decode(body, 0)
+    except (IndexError, struct.error):
+        # a length, number or string running past the end
+        raise ValueError("truncated frame")
+    except TypeError:
+        # a list or dict as dict key
+        raise ValueError("unhashable dict key in frame")
+
+    if offset != len(body):
+        raise ValueError("trailing data in frame")
+
+    if flags & _PATCH:
+        if previous is None:
+            raise ValueError("patch frame without previous arguments")
+
+        try:
+            return _apply(_copy(previous), value)
+        except (KeyError, IndexError, TypeError):
+            raise ValueError("patch frame doesn't match the previous arguments")
+
+    return value
+
+
+def pack(args, previous=None):
+    """Packs arguments into a frame.
+
+    @param  args        list    arguments
+    @param  previous    list    arguments sent before, if given only the changes are packed #optional
+
+    @returns    str     frame (None if args equal previous)
+    """
+    flags = 0
+
+    if previous is None:
+        body = encode(args)
+    else:
+        patch = _diff(previous, args)
+
+        if patch is _UNCHANGED:
+            return None
+
+        body = encode(patch)
+        flags |= _PATCH
+
+    if len(body) > compress_threshold:
+        compressed = zlib.compress(body)
+
+        if len(compressed) < len(body):
+            body = compressed
+            flags |= _COMPRESSED
+
+    return base64.b64encode(bytes((flags,)) + body).decode("ascii")
+
+
+def reset(player=None, event=None):
+    """Forgets the last arguments sent, so the next events are sent in full.
+
+    @param  player  GTAOrange.player.Player     only forget the events of this player #optional
+    @param  event   string                      only forget this event #optional
+    """
+    for key in list(_sent.keys()):
+        if (player is None or key[0] == player.id) and (event is None or key[1] == event):
+            del _sent[key]
+
+
+def triggerClient(player, event, *args):
+    """Triggers a client event for the player, with the arguments packed into a frame.
+
+    @param  player  GTAOrange.player.Player     player object
+    @param  event   string                      event name
+    @param  *args   *args                       arguments
+
+    @returns    bool    True if the event was triggered, False if the arguments didn't change since the last time
+    """
+    # copied before packing, so tuples compare equal to the stored lists
+    args = _copy(args)
+    key = (player.id, event)
+    frame = pack(args, _sent.get(key))
+
+    if frame is None:
+        return False
+
+    _sent[key] = args
+    _batch.call(__orange__.TriggerClientEvent, player.id, event, [frame])
+    return True
+
+
+def triggerClientAll(event, *args):
+    """Triggers a client event for all players, with the arguments packed into a frame once. Always sent in full.
+
+    @param  event   string  event name
+    @param  *args   *args   arguments
+    """
+    args = _copy(args)
+    frame = pack(args)
+
+    for key in [key for key in _sent if key[1] == event]:
+        _sent[key] = args
+
+    _batch.call(__orange__.TriggerClientEvent, -1, event, [frame])
+
+
+def _encode(value, out):
+    # bool before int, it's a subclass
+    if value is None:
+        out.append(_NONE)
+    elif value is True:
+        out.append(_TRUE)
+    elif value is False:
+        out.append(_FALSE)
+    elif isinstance(value, int):
+        if -0x80 <= value < 0x80:
+            out.append(_INT8)
+            out += _INT8_STRUCT.pack(value)
+        elif -0x8000 <= value < 0x8000:
+            out.append(_INT16)
+            out += _INT16_STRUCT.pack(value)
+        elif -0x80000000 <= value < 0x80000000:
+            out.append(_INT32)
+            out += _INT32_STRUCT.pack(value)
+        else:
+            try:
+                packed = _INT64_STRUCT.pack(value)
+            except struct.error:
+                raise TypeError("int out of 64 bit range: %r" % value)
+            out.append(_INT64)
+            out += packed
+    elif isinstance(value, float):
+        out.append(_FLOAT)
+        out += _FLOAT_STRUCT.pack(value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        out.append(_STR)
+        _encodeLength(len(data), out)
+        out += data
+    elif isinstance(value, (bytes, bytearray)):
+        out.append(_BYTES)
+        _encodeLength(len(value), out)
+        out += value
+    elif isinstance(value, (list, tuple)):
+        out.append(_LIST)
+        _encodeLength(len(value), out)
+
+        for item in value:
+            _encode(item, out)
+    elif isinstance(value, dict):
+        out.append(_DICT)
+        _encodeLength(len(value), out)
+
+        for key, item in value.items():
+            _encode(key, out)
+            _encode(item, out)
+    elif isinstance(value, _DictPatch):
+        out.append(_DICT_PATCH)
+        _encodeLength(len(value.set), out)
+
+        for key, item in value.set.items():
+            _encode(key, out)
+            _encode(item, out)
+
+        _encodeLength(len(value.deleted), out)
+
+        for key in value.deleted:
+            _encode(key, out)
+    elif isinstance(value, _ListPatch):
+        out.append(_LIST_PATCH)
+        _encodeLength(value.length, out)
+        _encodeLength(len(value.set), out)
+
+        for index, item in value.set:
+            _encodeLength(index, out)
+            _encode(item, out)
+    else:
+        raise TypeError("can't encode %s objects" % type(value).__name__)
+
+
+def _encodeLength(n, out):
+    # unsigned LEB128
+    while n >= 0x80:
+        out.append((n & 0x7F) | 0x80)
+        n >>= 7
+
+    out.append(n)
+
+
+def _decode(data, offset):
+    tag = data[offset]
+    offset += 1
+
+    if tag == _NONE:
+        return None, offset
+    if tag == _TRUE:
+        return True, offset
+    if tag == _FALSE:
+        return False, offset
+    if tag == _INT8:
+        return _INT8_STRUCT.unpack_from(data, offset)[0], offset + 1
+    if tag == _INT16:
+        return _INT16_STRUCT.unpack_from(data, offset)[0], offset + 2
+    if tag == _INT32:
+        return _INT32_STRUCT.unpack_from(data, offset)[0], offset + 4
+    if tag == _INT64:
+        return _INT64_STRUCT.unpack_from(data, offset)[0], offset + 8
+    if tag == _FLOAT:
+        return _FLOAT_STRUCT.unpack_from(data, offset)[0], offset + 8
+    if tag == _STR or tag == _BYTES:
+        n, offset = _decodeLength(data, offset)
+        chunk = bytes(data[offset:offset + n])
+
+        if len(chunk) != n:
+            raise ValueError("truncated frame")
+        return (chunk.decode("utf-8") if tag == _STR else chunk), offset + n
+    if tag == _LIST:
+        n, offset = _decodeLength(data, offset)
+        items = []
+
+        for i in range(n):
+            item, offset = _decode(data, offset)
+            items.append(item)
+        return items, offset
+    if tag == _DICT or tag == _DICT_PATCH:
+        n, offset = _decodeLength(data, offset)
+        items = {}
+
+        for i in range(n):
+            key, offset = _decode(data, offset)
+            items[key], offset = _decode(data, offset)
+
+        if tag == _DICT:
+            return items, offset
+
+        n, offset = _decodeLength(data, offset)
+        deleted = []
+
+        for i in range(n):
+            key, offset = _decode(data, offset)
+            deleted.append(key)
+        return _DictPatch(items, deleted), offset
+    if tag == _LIST_PATCH:
+        length, offset = _decodeLength(data, offset)
+        n, offset = _decodeLength(data, offset)
+        items = []
+
+        for i in range(n):
+            index, offset = _decodeLength(data, offset)
+            item, offset = _decode(data, offset)
+            items.append((index, item))
+        return _ListPatch(length, items), offset
+
+    raise ValueError("unknown tag %d" % tag)
+
+
+def _decodeLength(data, offset):
+    n = 0
+    shift = 0
+
+    while True:
+        byte = data[offset]
+        offset += 1
+        n |= (byte & 0x7F) << shift
+
+        if byte < 0x80:
+            return n, offset
+
+        shift += 7
+
+
+class _DictPatch():
+    __slots__ = ('set', 'deleted')
+
+    def __init__(self, set, deleted):
+        self.set = set
+        self.deleted = deleted
+
+
+class _ListPatch():
+    __slots__ = ('length', 'set')
+
+    def __init__(self, length, set):
+        self.length = length
+        self.set = set
+
+
+def _diff(old, new):
+    # returns _UNCHANGED, a patch, or new itself if it has to be replaced
+    cls = type(new)
+
+    if type(old) is not cls:
+        return new
+
+    if cls is dict:
+        changes = {}
+
+        for key, item in new.items():
+            if key not in old:
+                changes[key] = item
+                continue
+
+            previous = old[key]
+
+            if type(item) in _SCALARS:
+                if type(previous) is not type(item) or previous != item:
+                    changes[key] = item
+            else:
+                change = _diff(previous, item)
+
+                if change is not _UNCHANGED:
+                    changes[key] = change
+
+        deleted = [key for key in old if key not in new] if len(old) + len(changes) > len(new) else []
+
+        if not changes and not deleted:
+            return _UNCHANGED
+        return _DictPatch(changes, deleted)
+
+    if cls is list:
+        changes = []
+        n = len(old)
+
+        for index, item in enumerate(new):
+            if index >= n:
+                changes.append((index, item))
+                continue
+
+            previous = old[index]
+
+            if type(item) in _SCALARS:
+                if type(previous) is not type(item) or previous != item:
+                    changes.append((index, item))
+            else:
+                change = _diff(previous, item)
+
+                if change is not _UNCHANGED:
+                    changes.append((index, change))
+
+        if not changes and n == len(new):
+            return _UNCHANGED
+        if new and len(changes) == len(new) and all(change is new[index] for index, change in changes):
+            # every item is replaced, nothing left in common
+            return new
+        return _ListPatch(len(new), changes)
+
+    if old == new:
+        return _UNCHANGED
+    return new
+
+
+def _apply(old, patch):
+    if isinstance(patch, _DictPatch):
+        for key, item in patch.set.items():
+            old[key] = _apply(old[key], item) if key in old else item
+
+        for key in patch.deleted:
+            del old[key]
+        return old
+
+    if isinstance(patch, _ListPatch):
+        del old[patch.length:]
+
+        for index, item in patch.set:
+            if index < len(old):
+                old[index] = _apply(old[index], item)
+            else:
+                old.append(item)
+        return old
+
+    return patch
+
+
+def _copy(value):
+    # deep copy of the containers, so changes made by the caller after sending are detected; tuples become lists,
+    # like they're decoded
+    cls = type(value)
+
+    if cls is dict:
+        return dict((key, item if type(item) in _SCALARS else _copy(item)) for key, item in value.items())
+    if cls is list or cls is tuple:
+        return [item if type(item) in _SCALARS else _copy(item) for item in value]
+    if isinstance(value, dict):
+        return _copy(dict(value))
+    if isinstance(value, (list, tuple)):
+        return _copy(list(value))
+    return value
+
+
+def _onDisconnect(player, reason):
+    reset(player)
+
+
+_player.on("disconnect", _onDisconnect)
@@ -19,6 +19,10 @@ Subscribable built-in events:
 | clientevent | event_name (string), *args (*args) | player (Player), event_name (string), *args (*args) |
 +-------------+------------------------------------+-----------------------------------------------------+
 
+Players can be looked up by name without asking the server: `getByName()`, `findByPrefix()` and `findByName()` use
+an index of the names, which is kept up to date on connect, disconnect and `Player.setName()`. Names changed by other
+resources aren't noticed, call `verifyNames()` or set `verify_names` to True if that can happen on your server.
+
 Subscribable events from other core libraries:
 +================+========================+====================================+
 |      name      | player-local arguments |          global arguments          |
@@ -32,12 +36,21 @@ Subscribable events from other core libraries:
 | leftmarker     | marker (Marker)        | player (Player), marker (Marker)   |
 +----------------+------------------------+------------------------------------+
 """
+import bisect
+import difflib
+
 import __orange__
 from GTAOrange import world as _world
 from GTAOrange import event as _event
+from GTAOrange import snapshot as _snapshot
+from GTAOrange import registry as _registry
+from GTAOrange import batch as _batch
 
-__pool = {}
-__ehandlers = {}
+__ehandlers = _event.Dispatcher()
+__names = []    # sorted (lowercase name, player id) pairs, for prefix lookups
+
+# if set, the names found by the lookup functions are checked against the server, see verifyNames()
+verify_names = False
 
 
 class Player():
@@ -51,7 +64,9 @@ class Player():
     id = None
     meta = {}
 
-    _ehandlers = {}
+    # handlers and the indexed name live in slots of every single player, custom attributes are still possible due to
+    # __dict__
+    __slots__ = ('_ehandlers', '_name', '__dict__')
 
     def __init__(self, id):
         """Initializes a new Player object.
@@ -59,6 +74,8 @@ class Player():
         @param  id      int     player id
         """
         self.id = id
+        self._ehandlers = _event.Dispatcher()
+        self._name = None
 
     def attachBlip(self, blip):
         """Attaches the given blip to the player.
@@ -75,7 +92,7 @@ class Player():
         @param  msg     string  message string
         """
         # outdated
-        __orange__.SendClientMessage(self.id, "{FFFFFF}" + msg, 255)
+        _batch.call(__orange__.SendClientMessage, self.id, "{FFFFFF}" + msg, 255)
         # workaround for outsourced chat as resource
         self.triggerClient("chat:msg", False, msg)
 
@@ -92,7 +109,7 @@ class Player():
             x1, y1, z1 = self.getPosition()
             return _world.getDistance(x1, y1, z1, x, y, z)
         else:
-            x1, y1 = self.getPosition()
+            x1, y1, z1 = self.getPosition()
             return _world.getDistance(x1, y1, x, y)
 
     def getHeading(self):
@@ -100,6 +117,12 @@ class Player():
 
         @returns    float   player heading
         """
+        if _snapshot.enabled:
+            state = _states.get(self.id, 3, 4)
+
+            if state is not None:
+                return state[0]
+
         return __orange__.GetPlayerHeading(self.id)
 
     def getID(self):
@@ -128,6 +151,12 @@ class Player():
 
         @returns    tuple   position tuple with 3 values
         """
+        if _snapshot.enabled:
+            position = _states.get(self.id, 0, 3)
+
+            if position is not None:
+                return position
+
         return __orange__.GetPlayerPosition(self.id)
 
     def getMoney(self):
@@ -142,6 +171,12 @@ class Player():
 
         @returns    float   current health
         """
+        if _snapshot.enabled:
+            state = _states.get(self.id, 4, 5)
+
+            if state is not None:
+                return state[0]
+
         return __orange__.GetPlayerHealth(self.id)
 
     def giveWeapon(self, weapon, ammo=None):
@@ -151,9 +186,9 @@ class Player():
         @param  ammo    int     ammo amount #optional
         """
         if ammo is None:
-            __orange__.GivePlayerWeapon(self.id, weapon, 100)
+            _batch.call(__orange__.GivePlayerWeapon, self.id, weapon, 100)
         else:
-            __orange__.GivePlayerWeapon(self.id, weapon, ammo)
+            _batch.call(__orange__.GivePlayerWeapon, self.id, weapon, ammo)
 
     def isInMarker(self, marker):
         """Checks if a player is in a marker.
@@ -162,10 +197,9 @@ class Player():
 
         @returns    bool    True for yes, False for no
         """
-        x1, y1, z1 = self.getPosition()
-        x2, y2, z2 = marker.getPosition()
+        x, y, z = self.getPosition()
 
-        return _world.getDistance(x1, y1, x2, y2) < 0.5 and (z1 - z2) * (z1 - z2) < (0.5 * 0.5)
+        return marker.contains(x, y, z)
 
     def kick(self, reason=None):
         """Kicks the player from the server, with or without a reason.
@@ -180,54 +214,55 @@ class Player():
     def removeWeapons(self):
         """Removes all weapons from a player.
         """
-        __orange__.RemovePlayerWeapons(self.id)
+        _batch.call(__orange__.RemovePlayerWeapons, self.id)
 
     def on(self, event, cb):
         """Subscribes for an event only for this player.
 
         @param  event   string      event name
         @param  cb      function    callback function
+
+        @returns    GTAOrange.event.Event   event object, call its `cancel()` method to unsubscribe
         """
-        if event in self._ehandlers.keys():
-            self._ehandlers[event].append(_event.Event(cb))
-        else:
-            self._ehandlers[event] = []
-            self._ehandlers[event].append(_event.Event(cb))
+        return self._ehandlers.on(event, cb)
 
     def sendNotification(self, msg):
         """Sends a notification to the player.
 
         @param  msg     string  message string
         """
-        __orange__.SendPlayerNotification(self.id, msg)
+        _batch.call(__orange__.SendPlayerNotification, self.id, msg)
 
     def setArmour(self, armour):
         """Sets armour.
 
         @param  armour  float   armour value
         """
-        __orange__.SetPlayerArmour(self.id, armour)
+        _batch.write("player.armour", __orange__.SetPlayerArmour, self.id, armour)
 
     def setHeading(self, heading):
         """Sets heading (direction where the player is looking)
 
         @param  heading float   heading
         """
-        __orange__.SetPlayerHeading(self.id, heading)
+        _batch.write("player.heading", __orange__.SetPlayerHeading, self.id, heading)
+        _states.invalidate(self.id)
 
     def setHealth(self, health):
         """Sets health.
 
         @param  health  float   health value
         """
-        __orange__.SetPlayerHealth(self.id, health)
+        _batch.write("player.health", __orange__.SetPlayerHealth, self.id, health)
+        _states.invalidate(self.id)
 
     def setName(self, name):
         """Sets current name.
 
         @param  name    string  name string
         """
-        __orange__.SetPlayerName(self.id, name)
+        _batch.write("player.name", __orange__.SetPlayerName, self.id, name)
+        _setName(self, name)
 
     def setInfoMsg(self, msg=None):
         """Sets info message for player.
@@ -235,9 +270,9 @@ class Player():
         @param  msg     string  message string #optional
         """
         if msg is None:
-            __orange__.UnsetInfoMsg(self.id)
+            _batch.write("player.infomsg", __orange__.UnsetInfoMsg, self.id)
         else:
-            __orange__.SetInfoMsg(self.id, msg)
+            _batch.write("player.infomsg", __orange__.SetInfoMsg, self.id, msg)
 
     def setIntoVeh(self, veh, seat=None):
         """Sets player into given vehicle.
@@ -246,16 +281,18 @@ class Player():
         @param  seat    int                         seat number #optional
         """
         if seat is None:
-            __orange__.SetPlayerIntoVehicle(self.id, veh.id, -1)
+            _batch.write("player.vehicle", __orange__.SetPlayerIntoVehicle, self.id, veh.id, -1)
         else:
-            __orange__.SetPlayerIntoVehicle(self.id, veh.id, seat)
+            _batch.write("player.vehicle", __orange__.SetPlayerIntoVehicle, self.id, veh.id, seat)
+
+        _states.invalidate(self.id)
 
     def setModel(self, model):
         """Sets current model.
 
         @param  model   int     model hash
         """
-        __orange__.SetPlayerModel(self.id, model)
+        _batch.write("player.model", __orange__.SetPlayerModel, self.id, model)
 
     def setPosition(self, x, y, z):
         """Sets position.
@@ -264,26 +301,27 @@ class Player():
         @param  y   float   y-coord
         @param  z   float   z-coord
         """
-        __orange__.SetPlayerPosition(self.id, x, y, z)
+        _batch.write("player.position", __orange__.SetPlayerPosition, self.id, x, y, z)
+        _states.invalidate(self.id)
 
     def setMoney(self, money):
         """Sets current money the player is having.
 
         @param  money   int     money value
         """
-        __orange__.SetPlayerMoney(self.id, money)
+        _batch.write("player.money", __orange__.SetPlayerMoney, self.id, money)
 
     def resetMoney(self):
         """Resets money to zero.
         """
-        __orange__.ResetPlayerMoney(self.id)
+        _batch.write("player.money", __orange__.ResetPlayerMoney, self.id)
 
     def giveMoney(self, money):
         """Gives specific amount of money (addition).
 
         @param  money   int     money value
         """
-        __orange__.GivePlayerMoney(self.id, money)
+        _batch.call(__orange__.GivePlayerMoney, self.id, money)
 
     def giveAmmo(self, weapon, ammo):
         """Gives ammo to player.
@@ -291,7 +329,7 @@ class Player():
         @param  weapon  int     weapon hash
         @param  ammo    int     ammo amount
         """
-        __orange__.GivePlayerAmmo(self.id, weapon, ammo)
+        _batch.call(__orange__.GivePlayerAmmo, self.id, weapon, ammo)
 
     def broadcast(self, msg, color):
         """Broadcasts a message to the player.
@@ -304,12 +342,12 @@ class Player():
     def disableHUD(self):
         """Disables the HUD of the player.
         """
-        __orange__.DisablePlayerHud(self.id, True)
+        _batch.write("player.hud", __orange__.DisablePlayerHud, self.id, True)
 
     def enableHUD(self):
         """Enables the HUD of the player.
         """
-        __orange__.DisablePlayerHud(self.id, False)
+        _batch.write("player.hud", __orange__.DisablePlayerHud, self.id, False)
 
     def trigger(self, event, *args):
         """Triggers an event for the event handlers subscribing to this specific player.
@@ -317,9 +355,7 @@ class Player():
         @param  event   string  event name
         @param  *args   *args   arguments
         """
-        if event in self._ehandlers.keys():
-            for handler in self._ehandlers[event]:
-                handler.getCallback()(self, *args)
+        self._ehandlers.trigger(event, self, *args)
 
     def triggerClient(self, event, *args):
         """Triggers a client event for the player.
@@ -327,7 +363,7 @@ class Player():
         @param  event   string  event name
         @param  *args   *args   arguments
         """
-        __orange__.TriggerClientEvent(self.id, event, list(args))
+        _batch.call(__orange__.TriggerClientEvent, self.id, event, list(args))
 
 
 def broadcast(msg, color):
@@ -336,7 +372,56 @@ def broadcast(msg, color):
     @param  msg     string                  message string
     @param  color   GTAOrange.color.Color   message color
     """
-    __orange__.BroadcastClientMessage(msg, color)
+    _batch.call(__orange__.BroadcastClientMessage, msg, color)
+
+
+def chatMsg(msg):
+    """Sends a chat message to all players, with one server call for the chat resource instead of one per player.
+
+    @param  msg     string  message string
+    """
+    # outdated
+    _batch.call(__orange__.BroadcastClientMessage, "{FFFFFF}" + msg, 255)
+    # workaround for outsourced chat as resource
+    _batch.call(__orange__.TriggerClientEvent, -1, "chat:msg", [False, msg])
+
+
+def chatMsgTo(players, msg):
+    """Sends a chat message to a group of players.
+
+    The message is prepared once for the whole group, and if the group turns out to be everyone, it's sent like
+    `chatMsg()` does.
+
+    @param  players     iterable OR function    player objects, or a function which gets a player object and returns
+                                                True if the player should get the message
+    @param  msg         string                  message string
+    """
+    players = _select(players)
+
+    if _isEveryone(players):
+        chatMsg(msg)
+        return
+
+    text = "{FFFFFF}" + msg
+    args = [False, msg]
+
+    for player in players:
+        # outdated
+        _batch.call(__orange__.SendClientMessage, player.id, text, 255)
+        # workaround for outsourced chat as resource
+        _batch.call(__orange__.TriggerClientEvent, player.id, "chat:msg", args)
+
+
+def chatMsgNear(x, y, z, radius, msg):
+    """Sends a chat message to all players within the radius around the given coordinates, see `getInRadius()`.
+
+    @param  x       float   x-coord
+    @param  y       float   y-coord
+    @param  z       float   z-coord
+    @param  radius  float   radius
+    @param  msg     string  message string
+    """
+    chatMsgTo(getInRadius(x, y, z, radius), msg)
 
 
 def getByID(id):
@@ -348,40 +433,144 @@ def getByID(id):
 
     @raises     TypeError   raises if player id is not int
     """
-    global __pool
-
-    if isinstance(id, int):
-        if _exists(id):
-            if id not in __pool.keys():
-                __pool[id] = Player(id)
-            return __pool[id]
-        else:
-            return False
-    else:
-        raise TypeError('Player ID must be an integer')
+    return _pool.getOrCreate(id)
 
 
 def getByName(name):
-    """Returns player object by its name.
+    """Returns player object by its name, ignoring the case.
+
+    If several players have the same name apart from the case, the one matching the case is preferred.
 
     @param      name    string  player name
 
     @returns    GTAOrange.player.Player     player object (False on failure)
     """
-    for player in __pool.values():
-        if player.getName() == name:
+    key = name.lower()
+    players = _pool.find("name", key)
+
+    if verify_names:
+        players = _verify(players, lambda found: found == key)
+
+        if not players and verifyNames():
+            players = _pool.find("name", key)
+
+    if not players:
+        return False
+
+    for player in players:
+        if player._name == name:
             return player
-    return False
+    return players[0]
+
+
+def findByPrefix(prefix, limit=None):
+    """Returns all players whose name starts with the given prefix, ignoring the case. Useful for chat commands.
+
+    @param  prefix  string  beginning of the name
+    @param  limit   int     maximum number of players #optional
+
+    @returns    list    player objects, sorted by name
+    """
+    key = prefix.lower()
+    players = []
+
+    for index in range(bisect.bisect_left(__names, (key,)), len(__names)):
+        found, id = __names[index]
+
+        if not found.startswith(key) or len(players) == limit:
+            break
+
+        players.append(_pool.get(id))
+
+    if verify_names:
+        players = _verify(players, lambda found: found.startswith(key))
+
+    return players
+
+
+def findByName(name, limit=3, cutoff=0.6):
+    """Returns the players whose name is most similar to the given one, ignoring the case. Useful for chat commands
+    with typos in them.
+
+    @param  name    string  player name
+    @param  limit   int     maximum number of different names #optional
+    @param  cutoff  float   similarity (0.0 to 1.0) a name at least needs, see `difflib.get_close_matches()` #optional
+
+    @returns    list    player objects, the best match first
+    """
+    key = name.lower()
+    names = [found for index, (found, id) in enumerate(__names) if index == 0 or __names[index - 1][0] != found]
+    matches = difflib.get_close_matches(key, names, limit, cutoff)
+    players = [player for match in matches for player in _pool.find("name", match)]
+
+    if verify_names:
+        players = _verify(players, lambda found: found in matches)
+
+    return players
+
+
+def verifyNames():
+    """Compares the name index with the names the server reports for every player, and repairs it.
+
+    Costs one server call per player, so use it sparingly, e.g. on a timer.
+
+    @returns    list    player objects whose names had changed without the index noticing
+    """
+    drifted = []
+
+    for player in list(_pool.values()):
+        name = __orange__.GetPlayerName(player.id)
+
+        if name != player._name:
+            _setName(player, name)
+            drifted.append(player)
+
+    return drifted
 
 
 def getAll():
-    """Returns dictionary with all player objects.
+    """Returns a read-only view of all player objects.
 
-    WARNING! Can cause heavy load on some servers. If you can avoid using it, don't use it!
+    It stays up to date, copy it (e.g. with `list(getAll().values())`) if players may connect or disconnect while
+    iterating.
 
-    @returns    dict    player dictionary
+    @returns    mappingproxy    player objects by id
     """
-    return __pool
+    return _pool.getAll()
+
+
+def getInRadius(x, y, z, radius):
+    """Returns all players within the radius around the given coordinates.
+
+    The positions are taken from the snapshot if it's enabled (see GTAOrange.snapshot), otherwise every player's
+    position is read from the server.
+
+    @param  x       float   x-coord
+    @param  y       float   y-coord
+    @param  z       float   z-coord
+    @param  radius  float   radius
+
+    @returns    list    player objects
+    """
+    if _snapshot.enabled:
+        ids, rows = _states.getRows()
+        positions = [row[:3] for row in rows]
+    else:
+        ids = []
+        positions = []
+
+        for player in list(_pool.values()):
+            position = player.getPosition()
+
+            if position is not None:
+                ids.append(player.id)
+                positions.append(position)
+
+    if not ids:
+        return []
+
+    mask = _world.getWithinRadius(positions, x, y, z, radius)
+    return [_pool.get(id) for id, inside in zip(ids, mask) if inside]
 
 
 def on(event, cb):
@@ -389,12 +578,10 @@ def on(event, cb):
 
     @param  event   string      event name
     @param  cb      function    callback function
+
+    @returns    GTAOrange.event.Event   event object, call its `cancel()` method to unsubscribe
     """
-    if event in __ehandlers.keys():
-        __ehandlers[event].append(_event.Event(cb))
-    else:
-        __ehandlers[event] = []
-        __ehandlers[event].append(_event.Event(cb))
+    return __ehandlers.on(event, cb)
 
 
 def trigger(event, *args):
@@ -403,9 +590,7 @@ def trigger(event, *args):
     @param  event   string  event name
     @param  *args   *args   arguments
     """
-    if event in __ehandlers.keys():
-        for handler in __ehandlers[event]:
-            handler.getCallback()(*args)
+    __ehandlers.trigger(event, *args)
 
 
 def triggerClient(event, *args):
@@ -414,12 +599,103 @@ def triggerClient(event, *args):
     @param  event   string  event name
     @param  *args   *args   arguments
     """
-    __orange__.TriggerClientEvent(-1, event, list(args))
+    _batch.call(__orange__.TriggerClientEvent, -1, event, list(args))
+
+
+def triggerClientTo(players, event, *args):
+    """Triggers a client event for a group of players.
+
+    The arguments are prepared once for the whole group, and if the group turns out to be everyone, the event is
+    triggered with a single server call like `triggerClient()` does.
+
+    @param  players     iterable OR function    player objects, or a function which gets a player object and returns
+                                                True if the event should be triggered for the player
+    @param  event       string                  event name
+    @param  *args       *args                   arguments
+    """
+    players = _select(players)
+    args = list(args)
 
+    if _isEveryone(players):
+        _batch.call(__orange__.TriggerClientEvent, -1, event, args)
+        return
 
-def _exists(id):
-    # return __orange__.PlayerExists(id)
-    return True
+    for player in players:
+        _batch.call(__orange__.TriggerClientEvent, player.id, event, args)
+
+
+def triggerClientNear(x, y, z, radius, event, *args):
+    """Triggers a client event for all players within the radius around the given coordinates, see `getInRadius()`.
+
+    @param  x       float   x-coord
+    @param  y       float   y-coord
+    @param  z       float   z-coord
+    @param  radius  float   radius
+    @param  event   string  event name
+    @param  *args   *args   arguments
+    """
+    triggerClientTo(getInRadius(x, y, z, radius), event, *args)
+
+
+def _createPlayer(player_id):
+    player = Player(player_id)
+    _setName(player, __orange__.GetPlayerName(player_id))
+    return player
+
+
+def _setName(player, name):
+    if player._name is not None:
+        pair = (player._name.lower(), player.id)
+        index = bisect.bisect_left(__names, pair)
+
+        if index < len(__names) and __names[index] == pair:
+            del __names[index]
+
+    player._name = name
+    _pool.reindex(player)
+
+    if name is not None:
+        bisect.insort(__names, (name.lower(), player.id))
+
+
+def _verify(players, matches):
+    # checks the names of the found players against the server, keeps the ones still matching
+    verified = []
+
+    for player in players:
+        name = __orange__.GetPlayerName(player.id)
+
+        if name != player._name:
+            _setName(player, name)
+
+        if name is not None and matches(name.lower()):
+            verified.append(player)
+
+    return verified
+
+
+def _select(players):
+    if callable(players):
+        return [player for player in list(_pool.values()) if players(player)]
+
+    return list(players)
+
+
+def _isEveryone(players):
+    if not players or len(players) < len(_pool):
+        return False
+
+    ids = set(player.id for player in players)
+    return len(ids) == len(_pool) and all(id in _pool for id in ids)
+
+
+def _readState(player_id):
+    position = __orange__.GetPlayerPosition(player_id)
+
+    if position is None:
+        return None
+
+    return tuple(position) + (__orange__.GetPlayerHeading(player_id), __orange__.GetPlayerHealth(player_id))
 
 
 def _onConnect(player_id, ip):
@@ -430,13 +706,14 @@ def _onConnect(player_id, ip):
 
 
 def _onDisconnect(player_id, reason):
-    global __pool
     player = getByID(player_id)
 
     trigger("disconnect", player, reason)
     player.trigger("disconnect", reason)
 
-    del __pool[player_id]
+    player._ehandlers.clear()
+    _pool.remove(player_id)
+    _setName(player, None)
 
 
 def _onPlayerCommand(*args):
@@ -489,12 +766,18 @@ def _onChatMessage(player, message):
         player.trigger("command", message)
 
 
+_pool = _registry.EntityRegistry("Player", _createPlayer,
+                                 {"name": lambda player: None if player._name is None else player._name.lower()})
+
+# cached states, see GTAOrange.snapshot
+_states = _snapshot.register(("x", "y", "z", "heading", "health"), _readState, _pool.ids)
+
 # built-in server events
-__orange__.AddServerEvent(_onConnect, "PlayerConnect")
-__orange__.AddServerEvent(_onDisconnect, "PlayerDisconnect")
+__orange__.AddServerEvent(_event.native(_onConnect), "PlayerConnect")
+__orange__.AddServerEvent(_event.native(_onDisconnect), "PlayerDisconnect")
 # outdated
-__orange__.AddServerEvent(_onPlayerCommand, "PlayerCommand")
-__orange__.AddServerEvent(_onDeath, "PlayerDead")
-__orange__.AddServerEvent(_onSpawn, "PlayerSpawn")
-__orange__.AddServerEvent(_onKeyPress, "keyPress")
-__orange__.AddServerEvent(_onClientEvent, "serverEvent")
+__orange__.AddServerEvent(_event.native(_onPlayerCommand), "PlayerCommand")
+__orange__.AddServerEvent(_event.native(_onDeath), "PlayerDead")
+__orange__.AddServerEvent(_event.native(_onSpawn), "PlayerSpawn")
+__orange__.AddServerEvent(_event.native(_onKeyPress), "keyPress")
+__orange__.AddServerEvent(_event.native(_onClientEvent), "serverEvent")
@@ -0,0 +1,204 @@
+"""Registry library of the GTA Orange Python wrapper, keeping track of the entity objects of one kind
+
+Every library (players, vehicles, markers, blips, objects and texts) stores its entity objects in a registry of its
+own. Lookups by id are a single dictionary access, and entities can additionally be indexed by whatever their library
+considers useful, e.g. vehicles by model or blips by the player they are shown to.
+
+The libraries hand out read-only views of their registries, so scripts can't corrupt them by accident.
+"""
+from types import MappingProxyType
+
+
+class EntityRegistry():
+    """EntityRegistry class
+
+    @attr   name    str         entity name, used in error messages
+    @attr   get     function    returns the entity object with the given id (None if there is none), the `get` of the
+                                underlying dictionary
+    """
+    __slots__ = ('name', 'get', '_entities', '_view', '_factory', '_keys', '_indexes')
+
+    def __init__(self, name, factory=None, indexes=None):
+        """Initializes a new, empty registry.
+
+        Indexes are built on their first use by find(), pools which are never searched don't pay for them.
+
+        @param  name        str         entity name, used in error messages
+        @param  factory     function    function creating the object of an entity created outside of Python by its id (None if that's impossible) #optional
+        @param  indexes     dict        index names mapped to functions returning the index key of an entity (None for not indexed) #optional
+        """
+        self.name = name
+        self._entities = {}
+        self.get = self._entities.get
+        self._view = MappingProxyType(self._entities)
+        self._factory = factory
+        # index name -> key function
+        self._keys = dict(indexes or {})
+        # index name -> [key function, key -> {id: entity}, id -> key], only the built ones
+        self._indexes = {}
+
+    def __contains__(self, id):
+        return id in self._entities
+
+    def __len__(self):
+        return len(self._entities)
+
+    def add(self, entity):
+        """Adds an entity object, replacing the one with the same id.
+
+        @param  entity  object  entity object (needs an `id` attribute)
+
+        @returns    object  the entity object
+        """
+        if entity.id in self._entities:
+            self.remove(entity.id)
+
+        self._entities[entity.id] = entity
+
+        for index in self._indexes.values():
+            self._insert(index, entity)
+
+        return entity
+
+    def getChecked(self, id):
+        """Returns the entity object with the given id, like `get`, but raises for ids which aren't int.
+
+        @param  id      int     entity id
+
+        @returns    object  entity object (None if there is none)
+
+        @raises     TypeError   raises if the id is not int
+        """
+        if not isinstance(id, int):
+            raise TypeError('%s ID must be an integer' % self.name)
+
+        return self._entities.get(id)
+
+    def getOrCreate(self, id):
+        """Returns the entity object with the given id, creating it with the factory if it's unknown.
+
+        @param  id      int     entity id
+
+        @returns    object  entity object (None if it can't be created)
+
+        @raises     TypeError   raises if the entity is created and the id is not int
+        """
+        entity = self._entities.get(id)
+
+        if entity is None:
+            return self.create(id)
+        return entity
+
+    def create(self, id):
+        """Creates the object of an entity created outside of Python with the factory and adds it.
+
+        @param  id      int     entity id
+
+        @returns    object  entity object (None if there is no factory)
+
+        @raises     TypeError   raises if the id is not int
+        """
+        if not isinstance(id, int):
+            raise TypeError('%s ID must be an integer' % self.name)
+
+        if self._factory is None:
+            return None
+        return self.add(self._factory(id))
+
+    def remove(self, id):
+        """Removes an entity object.
+
+        @param  id      int     entity id
+
+        @returns    object  the removed entity object (None if there was none)
+
+        @raises     TypeError   raises if the id is not int
+        """
+        if not isinstance(id, int):
+            raise TypeError('%s ID must be an integer' % self.name)
+
+        entity = self._entities.pop(id, None)
+
+        if entity is not None:
+            for index in self._indexes.values():
+                self._discard(index, id)
+
+        return entity
+
+    def reindex(self, entity):
+        """Updates the index keys of an entity object after its indexed attributes changed.
+
+        @param  entity  object  entity object
+        """
+        if self._entities.get(entity.id) is not entity:
+            return
+
+        for index in self._indexes.values():
+            self._discard(index, entity.id)
+            self._insert(index, entity)
+
+    def find(self, index, key):
+        """Returns all entity objects with the given index key.
+
+        @param  index   str     index name
+        @param  key     any     index key
+
+        @returns    list    entity objects in the order they were added
+        """
+        built = self._indexes.get(index)
+
+        if built is None:
+            built = self._indexes[index] = [self._keys[index], {}, {}]
+
+            for entity in self._entities.values():
+                self._insert(built, entity)
+
+        entities = built[1].get(key)
+
+        return list(entities.values()) if entities else []
+
+    def getAll(self):
+        """Returns a read-only view of all entity objects, which stays up to date.
+
+        @returns    mappingproxy    entity objects by id
+        """
+        return self._view
+
+    def ids(self):
+        """Returns a view of all entity ids.
+
+        @returns    dict_keys   entity ids
+        """
+        return self._entities.keys()
+
+    def values(self):
+        """Returns a view of all entity objects.
+
+        @returns    dict_values     entity objects
+        """
+        return self._entities.values()
+
+    def _insert(self, index, entity):
+        key = index[0](entity)
+
+        if key is None:
+            return
+
+        if key in index[1]:
+            index[1][key][entity.id] = entity
+        else:
+            index[1][key] = {entity.id: entity}
+
+        index[2][entity.id] = key
+
+    def _discard(self, index, id):
+        key = index[2].pop(id, None)
+
+        if key is None:
+            return
+
+        entities = index[1][key]
+        del entities[id]
+
+        if not entities:
+            del index[1][key]
@@ -10,7 +10,7 @@ Subscribable built-in events:
 import __orange__
 from GTAOrange import event as _event
 
-__ehandlers = {}
+__ehandlers = _event.Dispatcher()
 __forbidden_event_names = ['serverunload']
 
 
@@ -19,12 +19,10 @@ def on(event, cb):
 
     @param  event   string      event name
     @param  cb      function    callback function
+
+    @returns    GTAOrange.event.Event   event object, call its `cancel()` method to unsubscribe
     """
-    if event in __ehandlers.keys():
-        __ehandlers[event].append(_event.Event(cb))
-    else:
-        __ehandlers[event] = []
-        __ehandlers[event].append(_event.Event(cb))
+    return __ehandlers.on(event, cb)
 
 
 def trigger(event, *args):
@@ -33,13 +31,12 @@ def trigger(event, *args):
     @param  event   string  event name
     @param  *args   *args   arguments
     """
-    if event in __ehandlers.keys():
-        for handler in __ehandlers[event]:
-            handler.getCallback()(*args)
+    __ehandlers.trigger(event, *args)
 
 
 def _onServerUnload(p0):
     trigger("unload", p0)
+    _event.shutdown()
 
 
-__orange__.AddServerEvent(_onServerUnload, "ServerUnload")
+__orange__.AddServerEvent(_event.native(_onServerUnload), "ServerUnload")
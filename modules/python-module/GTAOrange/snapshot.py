@@ -0,0 +1,185 @@
+"""Snapshot library of the GTA Orange Python wrapper, caching player and vehicle states per tick
+
+Every getter like `Player.getPosition()` normally crosses into the server. Once the snapshot is enabled, the first
+getter call in a tick reads the states of all players (or vehicles) in one go, and every following call is served
+from a compact array until the snapshot is older than the staleness budget. Setters like `Player.setPosition()`
+invalidate the cached state of their entity, so you'll never read back an outdated value you've just overwritten.
+
+Since a refresh reads every entity, it only pays off if your scripts query many entities (or one entity many
+times) per tick, e.g. distance checks against all players.
+
+    from GTAOrange import snapshot
+    snapshot.enable(max_age=0.05)
+"""
+import time
+from array import array
+
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+
+enabled = False
+max_age = 0.05
+
+_stores = []
+
+
+class Store():
+    """Store class, holding one row of float values per entity
+
+    DO NOT GENERATE NEW OBJECTS DIRECTLY! Please use the register() function instead.
+
+    @attr   fields  tuple   names of the values in a row
+    @attr   time    float   time of the last refresh (time.monotonic())
+    """
+    __slots__ = ('fields', 'time', '_stride', '_read', '_source', '_slots', '_ids', '_data', '_valid')
+
+    def __init__(self, fields, read, source):
+        """Initializes a new, empty Store object.
+
+        @param  fields  tuple       names of the values in a row
+        @param  read    function    function reading the values of an entity id (returns a sequence, or None)
+        @param  source  function    function returning the entity ids which should be read
+        """
+        self.fields = tuple(fields)
+        self.time = None
+        self._stride = len(self.fields)
+        self._read = read
+        self._source = source
+        self._slots = {}
+        self._ids = []
+        self._data = array('d')
+        self._valid = bytearray()
+
+    def get(self, id, start=0, stop=None):
+        """Returns the cached values of an entity, refreshing the whole store first if it is outdated.
+
+        @param  id      int     entity id
+        @param  start   int     index of the first field #optional
+        @param  stop    int     index after the last field #optional
+
+        @returns    tuple   values (None if the entity isn't cached)
+        """
+        if self.time is None or time.monotonic() - self.time > max_age:
+            self.refresh()
+
+        index = self._slots.get(id)
+
+        if index is None or not self._valid[index]:
+            return None
+
+        offset = index * self._stride
+        return tuple(self._data[offset + start:offset + (self._stride if stop is None else stop)])
+
+    def getRows(self):
+        """Returns the ids and cached values of all entities, refreshing the store first if it is outdated.
+
+        The values are returned as a numpy.ndarray (one row per entity) if NumPy is installed, so they can be
+        passed to the batched functions of the world library directly. Otherwise they are a list of tuples.
+
+        @returns    tuple   list of ids and values
+        """
+        if self.time is None or time.monotonic() - self.time > max_age:
+            self.refresh()
+
+        rows = [index for index, valid in enumerate(self._valid) if valid]
+        ids = [self._ids[index] for index in rows]
+
+        if _np is not None:
+            data = _np.frombuffer(self._data, dtype=float).reshape(-1, self._stride)
+            return ids, data[rows]
+
+        stride = self._stride
+        return ids, [tuple(self._data[index * stride:(index + 1) * stride]) for index in rows]
+
+    def invalidate(self, id=None):
+        """Invalidates the cached values of an entity, or of all entities.
+
+        @param  id      int     entity id #optional
+        """
+        if id is None:
+            self.time = None
+            return
+
+        index = self._slots.get(id)
+
+        if index is not None:
+            self._valid[index] = 0
+
+    def refresh(self):
+        """Reads the values of all entities.
+        """
+        ids = list(self._source())
+        data = array('d')
+        valid = bytearray(len(ids))
+        empty = (0.0,) * self._stride
+
+        for index, id in enumerate(ids):
+            values = self._read(id)
+
+            if values is None:
+                data.extend(empty)
+            else:
+                data.extend(values)
+                valid[index] = 1
+
+        self._slots = dict((id, index) for index, id in enumerate(ids))
+        self._ids = ids
+        self._data = data
+        self._valid = valid
+        self.time = time.monotonic()
+
+
+def disable():
+    """Disables the snapshot, so every getter crosses into the server again.
+    """
+    global enabled
+
+    enabled = False
+    invalidate()
+
+
+def enable(max_age=None):
+    """Enables the snapshot.
+
+    @param  max_age     float   staleness budget in seconds, cached values older than this are read again #optional
+    """
+    global enabled
+
+    if max_age is not None:
+        setMaxAge(max_age)
+
+    invalidate()
+    enabled = True
+
+
+def invalidate():
+    """Invalidates all cached values, so the next getter call reads them again.
+    """
+    for store in _stores:
+        store.invalidate()
+
+
+def register(fields, read, source):
+    """Creates a new store which is managed by this library. Used by the player and vehicle libraries.
+
+    @param  fields  tuple       names of the values in a row
+    @param  read    function    function reading the values of an entity id (returns a sequence, or None)
+    @param  source  function    function returning the entity ids which should be read
+
+    @returns    GTAOrange.snapshot.Store    store object
+    """
+    store = Store(fields, read, source)
+    _stores.append(store)
+    return store
+
+
+def setMaxAge(seconds):
+    """Sets the staleness budget.
+
+    @param  seconds     float   cached values older than this are read again
+    """
+    global max_age
+
+    max_age = float(seconds)
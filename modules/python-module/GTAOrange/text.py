@@ -11,9 +11,9 @@ Subscribable built-in events:
 """
 import __orange__
 from GTAOrange import event as _event
+from GTAOrange import registry as _registry
 
-__pool = {}
-__ehandlers = {}
+__ehandlers = _event.Dispatcher()
 
 
 class Text():
@@ -28,16 +28,9 @@ class Text():
     @attr   x       float                   x-coord
     @attr   y       float                   y-coord
     @attr   z       float                   z-coord
+    @attr   text    str                     message string
     """
-    id = None
-    x = None
-    y = None
-    z = None
-    tcolor = None
-    ocolor = None
-    size = None
-
-    _ehandlers = {}
+    __slots__ = ('id', 'x', 'y', 'z', 'tcolor', 'ocolor', 'size', 'text')
 
     def __init__(self, id, text, x, y, z, tcolor=0xFFFFFFFF, ocolor=0xFFFFFFFF, size=20):
         """Initializes a new Text object.
@@ -116,11 +109,8 @@ def create(text, x, y, z, tcolor=0xFFFFFFFF, ocolor=0xFFFFFFFF, size=20):
 
     @returns    GTAOrange.text.Text     text object
     """
-    global __pool
-
-    text = Text(__orange__.Create3DTextForAll(text, x, y, z, tcolor,
-                                              ocolor, size), text, x, y, z, tcolor, ocolor, size)
-    __pool[text.id] = text
+    text = _pool.add(Text(__orange__.Create3DTextForAll(text, x, y, z, tcolor,
+                                                        ocolor, size), text, x, y, z, tcolor, ocolor, size))
 
     trigger("creation", text)
     return text
@@ -135,15 +125,12 @@ def deleteByID(id):
 
     @raises     TypeError   raises if text id is not int
     """
-    global __pool
+    text = _pool.getChecked(id)
 
-    if isinstance(id, int):
-        if id in __pool.keys():
-            trigger("deletion", __pool[id])
-            del __pool[id]
-        return __orange__.Delete3DText(id)
-    else:
-        raise TypeError('3DText ID must be an integer')
+    if text is not None:
+        trigger("deletion", text)
+        _pool.remove(id)
+    return __orange__.Delete3DText(id)
 
 
 def getByID(id):
@@ -151,32 +138,23 @@ def getByID(id):
 
     @param  id      int     text id
 
-    @returns    GTAOrange.text.Text     text object (False on failure)
-
-    @raises     TypeError   raises if text id is not int
+    @returns    GTAOrange.text.Text     text object (False if it wasn't created in Python)
     """
-    global __pool
+    text = _pool.get(id)
 
-    if isinstance(id, int):
-        if _exists(id):
-            if id not in __pool.keys():
-                __pool[id] = Text(id)
-                trigger("creation", __pool[id])
-            return __pool[id]
-        else:
-            return False
-    else:
-        raise TypeError('Text ID must be an integer')
+    if text is None:
+        return False
+    return text
 
 
 def getAll():
-    """Returns dictionary with all text objects.
+    """Returns a read-only view of all text objects.
 
-    WARNING! Can cause heavy load on some servers. If you can avoid using it, don't use it!
+    It stays up to date, copy it (e.g. with `list(getAll().values())`) if you create or delete texts while iterating.
 
-    @returns    dict    text dictionary
+    @returns    mappingproxy    text objects by id
     """
-    return __pool
+    return _pool.getAll()
 
 
 def on(event, cb):
@@ -184,12 +162,10 @@ def on(event, cb):
 
     @param  event   string      event name
     @param  cb      function    callback function
+
+    @returns    GTAOrange.event.Event   event object, call its `cancel()` method to unsubscribe
     """
-    if event in __ehandlers.keys():
-        __ehandlers[event].append(_event.Event(cb))
-    else:
-        __ehandlers[event] = []
-        __ehandlers[event].append(_event.Event(cb))
+    return __ehandlers.on(event, cb)
 
 
 def trigger(event, *args):
@@ -198,10 +174,8 @@ def trigger(event, *args):
     @param  event   string  event name
     @param  *args   *args   arguments
     """
-    if event in __ehandlers.keys():
-        for handler in __ehandlers[event]:
-            handler.getCallback()(*args)
+    __ehandlers.trigger(event, *args)
 
 
-def _exists(id):
-    return True
+# texts created outside of Python can't be wrapped, their properties are unknown
+_pool = _registry.EntityRegistry("Text")
@@ -27,9 +27,11 @@ from GTAOrange import world as _world
 from GTAOrange import text as _text
 from GTAOrange import player as _player
 from GTAOrange import event as _event
+from GTAOrange import snapshot as _snapshot
+from GTAOrange import registry as _registry
+from GTAOrange import batch as _batch
 
-__pool = {}
-__ehandlers = {}
+__ehandlers = _event.Dispatcher()
 
 # attachOwnText
 # attachOwnBlip
@@ -49,7 +51,7 @@ class Vehicle():
     meta = {}
     texts = {}
 
-    _ehandlers = {}
+    __slots__ = ('_ehandlers', '__dict__')
 
     def __init__(self, id, model=None):
         """Initializes a new Vehicle object.
@@ -58,6 +60,7 @@ class Vehicle():
         """
         self.id = id
         self.model = model
+        self._ehandlers = _event.Dispatcher()
 
     def attachBlip(self, name="Vehicle", scale=0.6, color=None, sprite=None):
         """Creates and attaches a blip to the vehicle.
@@ -113,7 +116,7 @@ class Vehicle():
             x1, y1, z1 = self.getPosition()
             return _world.getDistance(x1, y1, z1, x, y, z)
         else:
-            x1, y1 = self.getPosition()
+            x1, y1, z1 = self.getPosition()
             return _world.getDistance(x1, y1, x, y)
 
     def equals(self, veh):
@@ -206,6 +209,12 @@ class Vehicle():
 
         @returns    tuple   position tuple with 3 float values
         """
+        if _snapshot.enabled:
+            position = _states.get(self.id, 0, 3)
+
+            if position is not None:
+                return position
+
         return __orange__.GetVehiclePosition(self.id)
 
     def getRotation(self):
@@ -213,6 +222,12 @@ class Vehicle():
 
         @returns    tuple   rotation tuple with 3 float values
         """
+        if _snapshot.enabled:
+            rotation = _states.get(self.id, 3, 6)
+
+            if rotation is not None:
+                return rotation
+
         return __orange__.GetVehicleRotation(self.id)
 
     def getSirenState(self):
@@ -234,12 +249,10 @@ class Vehicle():
 
         @param  event   string      event name
         @param  cb      function    callback function
+
+        @returns    GTAOrange.event.Event   event object, call its `cancel()` method to unsubscribe
         """
-        if event in self._ehandlers.keys():
-            self._ehandlers[event].append(_event.Event(cb))
-        else:
-            self._ehandlers[event] = []
-            self._ehandlers[event].append(_event.Event(cb))
+        return self._ehandlers.on(event, cb)
 
     def setColors(self, color1, color2):
         """Sets vehicle colors.
@@ -247,7 +260,7 @@ class Vehicle():
         @param  color1  GTAOrange.hash.VehicleColor     first color
         @param  color2  GTAOrange.hash.VehicleColor     second color
         """
-        return __orange__.SetVehicleColours(self.id, color1, color2)
+        return _batch.write("vehicle.colors", __orange__.SetVehicleColours, self.id, color1, color2)
 
     def setEngineState(self, state, locked=True):
         """Toggles the vehicle engine on/off.
@@ -256,7 +269,7 @@ class Vehicle():
         @param  locked  bool    True if the player shouldn't be able to turn it on again, False if not
         """
         # locked not implemented yet
-        return __orange__.SetVehicleEngineStatus(self.id, state)
+        return _batch.write("vehicle.engine", __orange__.SetVehicleEngineStatus, self.id, state)
 
     def setPosition(self, x, y, z):
         """Sets position.
@@ -265,7 +278,8 @@ class Vehicle():
         @param  y   float   y-coord
         @param  z   float   z-coord
         """
-        return __orange__.SetVehiclePosition(self.id, x, y, z)
+        _states.invalidate(self.id)
+        return _batch.write("vehicle.position", __orange__.SetVehiclePosition, self.id, x, y, z)
 
     def setRotation(self, rx, ry, rz):
         """Sets rotation.
@@ -274,21 +288,22 @@ class Vehicle():
         @param  ry  float   rotation in y direction
         @param  rz  float   rotation in z direction
         """
-        return __orange__.SetVehicleRotation(self.id, rx, ry, rz)
+        _states.invalidate(self.id)
+        return _batch.write("vehicle.rotation", __orange__.SetVehicleRotation, self.id, rx, ry, rz)
 
     def setSirenState(self, state):
         """Toggles the vehicle siren on/off. No problem if the vehicle hasn't got a siren, then nothing happens.
 
         @param  state   bool    True for on, False for off
         """
-        return __orange__.SetVehicleSirenState(self.id, state)
+        return _batch.write("vehicle.siren", __orange__.SetVehicleSirenState, self.id, state)
 
     def setTyreBulletproofness(self, state):
         """Toggles tyre bulletproof protection on/off.
 
         @param  state   bool    True for on, False for off
         """
-        return __orange__.SetVehicleTyresBulletproof(self.id, state)
+        return _batch.write("vehicle.tyres", __orange__.SetVehicleTyresBulletproof, self.id, state)
 
     def trigger(self, event, *args):
         """Triggers an event for the event handlers subscribing to this specific vehicle.
@@ -296,9 +311,7 @@ class Vehicle():
         @param  event   string  event name
         @param  *args   *args   arguments
         """
-        if event in self._ehandlers.keys():
-            for handler in self._ehandlers[event]:
-                handler.getCallback()(self, *args)
+        self._ehandlers.trigger(event, self, *args)
 
 
 def create(model, x, y, z, h):
@@ -314,8 +327,7 @@ def create(model, x, y, z, h):
 
     @returns    GTAOrange.vehicle.Vehicle   vehicle object
     """
-    veh = Vehicle(__orange__.CreateVehicle(model, x, y, z, h), model)
-    __pool[veh.id] = veh
+    veh = _pool.add(Vehicle(__orange__.CreateVehicle(model, x, y, z, h), model))
 
     trigger("creation", veh)
     return veh
@@ -330,18 +342,14 @@ def deleteByID(id):
 
     @raises     TypeError   raises if vehicle id is not int
     """
-    global __pool
+    veh = _pool.getChecked(id)
 
-    if isinstance(id, int):
-        if _exists(id):
-            if id in __pool.keys():
-                trigger("deletion", __pool[id])
-                del __pool[id]
+    if veh is not None:
+        trigger("deletion", veh)
+        veh._ehandlers.clear()
+        _pool.remove(id)
 
-            return __orange__.DeleteVehicle(id)
-        return False
-    else:
-        raise TypeError('Vehicle ID must be an integer')
+    return __orange__.DeleteVehicle(id)
 
 
 def getByID(id):
@@ -353,29 +361,33 @@ def getByID(id):
 
     @raises     TypeError   raises if vehicle id is not int
     """
-    global __pool
+    veh = _pool.get(id)
+
+    if veh is None:
+        veh = _pool.create(id)
+        # TODO: this is a dirty workaround
+        trigger("creation", veh)
+    return veh
 
-    if isinstance(id, int):
-        if _exists(id):
-            if id not in __pool.keys():
-                __pool[id] = Vehicle(id)
 
-                # TODO: this is a dirty workaround
-                trigger("creation", __pool[id])
-            return __pool[id]
-        return False
-    else:
-        raise TypeError('Vehicle ID must be an integer')
+def getByModel(model):
+    """Returns all vehicle objects created with the given model.
+
+    @param  model   str OR int  model name OR hash, as passed to create()
+
+    @returns    list    list with vehicle objects
+    """
+    return _pool.find("type", model)
 
 
 def getAll():
-    """Returns dictionary with all vehicle objects.
+    """Returns a read-only view of all vehicle objects.
 
-    WARNING! Can cause heavy load on some servers. If you can avoid using it, don't use it!
+    It stays up to date, copy it (e.g. with `list(getAll().values())`) if you create or delete vehicles while iterating.
 
-    @returns    dict    vehicle dictionary
+    @returns    mappingproxy    vehicle objects by id
     """
-    return __pool
+    return _pool.getAll()
 
 
 def on(event, cb):
@@ -383,12 +395,10 @@ def on(event, cb):
 
     @param  event   string      event name
     @param  cb      function    callback function
+
+    @returns    GTAOrange.event.Event   event object, call its `cancel()` method to unsubscribe
     """
-    if event in __ehandlers.keys():
-        __ehandlers[event].append(_event.Event(cb))
-    else:
-        __ehandlers[event] = []
-        __ehandlers[event].append(_event.Event(cb))
+    return __ehandlers.on(event, cb)
 
 
 def trigger(event, *args):
@@ -397,14 +407,18 @@ def trigger(event, *args):
     @param  event   string  event name
     @param  *args   *args   arguments
     """
-    if event in __ehandlers.keys():
-        for handler in __ehandlers[event]:
-            handler.getCallback()(*args)
+    __ehandlers.trigger(event, *args)
+
 
+def _readState(vehicle_id):
+    position = __orange__.GetVehiclePosition(vehicle_id)
+    rotation = __orange__.GetVehicleRotation(vehicle_id)
+
+    if position is None or rotation is None:
+        return None
+
+    return tuple(position) + tuple(rotation)
 
-def _exists(id):
-    # return __orange__.VehicleExists(id)
-    return True
 
 def _onPlayerEntered(player_id, vehicle_id):
     player = _player.getByID(player_id)
@@ -426,5 +440,10 @@ def _onPlayerLeft(player_id, vehicle_id):
     player.trigger("leftvehicle", vehicle)
 
 
-__orange__.AddServerEvent(_onPlayerEntered, "EnterVehicle")
-__orange__.AddServerEvent(_onPlayerLeft, "LeftVehicle")
+_pool = _registry.EntityRegistry("Vehicle", Vehicle, {"type": lambda veh: veh.model})
+
+# cached states, see GTAOrange.snapshot
+_states = _snapshot.register(("x", "y", "z", "rx", "ry", "rz"), _readState, _pool.ids)
+
+__orange__.AddServerEvent(_event.native(_onPlayerEntered), "EnterVehicle")
+__orange__.AddServerEvent(_event.native(_onPlayerLeft), "LeftVehicle")
@@ -1,7 +1,20 @@
 """World library with useful calculations for the GTA Orange Python wrapper
+
+Next to the single point functions there are batched ones taking a list of positions (tuples with 2 or 3 coords),
+e.g. the positions of all players. They use NumPy if it is installed and fall back to pure Python otherwise,
+so please note that they return `numpy.ndarray` objects in the first case and lists in the second one.
+With NumPy, passing the positions as an array of shape (n, 2) or (n, 3) saves converting them on every call.
 """
+import heapq
 import math
 
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+
+_EMPTY_CELL = frozenset()
+
 
 def getDistance(x1, y1, z1, x2, y2=None, z2=None):
     """Returns the distance between two points, either 3-dimensional ones or 2-dimensional ones.
@@ -27,6 +40,268 @@ def getDistance(x1, y1, z1, x2, y2=None, z2=None):
     @returns    float   distance between given points
     """
     if y2 is None:
-        return math.sqrt(math.pow(z1 - x1, 2) + math.pow(x2 - y1, 2))
+        # 2d points, so the parameters are actually x1, y1, x2, y2
+        dx = z1 - x1
+        dy = x2 - y1
+        return math.sqrt(dx * dx + dy * dy)
+    else:
+        dx = x2 - x1
+        dy = y2 - y1
+        dz = z2 - z1
+        return math.sqrt(dx * dx + dy * dy + dz * dz)
+
+
+def getHeading(x1, y1, x2, y2):
+    """Returns the heading from the first to the second point, as used by GTA (0 = north, counter-clockwise).
+
+    @param  x1      float   x-coord of first point
+    @param  y1      float   y-coord of first point
+    @param  x2      float   x-coord of second point
+    @param  y2      float   y-coord of second point
+
+    @returns    float   heading in degrees (0 <= heading < 360)
+    """
+    return math.degrees(math.atan2(x1 - x2, y2 - y1)) % 360.0
+
+
+def getDistances(positions, x, y, z=None):
+    """Returns the distances of many positions to the given coordinates.
+
+    @param  positions   list    positions (tuples with 2 or 3 coords)
+    @param  x           float   x-coord
+    @param  y           float   y-coord
+    @param  z           float   z-coord, positions are treated as 2d ones if not given #optional
+
+    @returns    list OR numpy.ndarray   distances, same order as positions
+    """
+    if _np is not None:
+        return _np.sqrt(_getSquaredDistancesNumPy(positions, x, y, z))
+
+    sqrt = math.sqrt
+    return [sqrt(d) for d in _getSquaredDistances(positions, x, y, z)]
+
+
+def getPairwiseDistances(positions1, positions2, dimensions=3):
+    """Returns the distances between every position of the first and every position of the second list.
+
+    @param  positions1  list    positions (tuples with 2 or 3 coords)
+    @param  positions2  list    positions (tuples with 2 or 3 coords)
+    @param  dimensions  int     2 for 2d distances, 3 for 3d distances #optional
+
+    @returns    list OR numpy.ndarray   matrix (list of lists), matrix[i][j] is the distance between positions1[i]
+                                        and positions2[j]
+    """
+    if _np is not None:
+        a = _asArray(positions1, dimensions)
+        b = _asArray(positions2, dimensions)
+        diff = a[:, None, :] - b[None, :, :]
+        return _np.sqrt(_np.einsum("ijk,ijk->ij", diff, diff))
+
+    sqrt = math.sqrt
+
+    if dimensions == 2:
+        return [[sqrt((x2 - x1) * (x2 - x1) + (y2 - y1) * (y2 - y1)) for x2, y2 in _as2d(positions2)]
+                for x1, y1 in _as2d(positions1)]
+
+    return [[sqrt((x2 - x1) * (x2 - x1) + (y2 - y1) * (y2 - y1) + (z2 - z1) * (z2 - z1))
+             for x2, y2, z2 in positions2] for x1, y1, z1 in positions1]
+
+
+def getNearest(positions, x, y, z=None, k=1):
+    """Returns the indices of the k positions nearest to the given coordinates.
+
+    @param  positions   list    positions (tuples with 2 or 3 coords)
+    @param  x           float   x-coord
+    @param  y           float   y-coord
+    @param  z           float   z-coord, positions are treated as 2d ones if not given #optional
+    @param  k           int     number of indices #optional
+
+    @returns    list    indices of the nearest positions, nearest first
+    """
+    if k <= 0 or len(positions) == 0:
+        return []
+
+    if _np is not None:
+        distances = _getSquaredDistancesNumPy(positions, x, y, z)
+
+        if k < len(distances):
+            indices = _np.argpartition(distances, k - 1)[:k]
+        else:
+            indices = _np.arange(len(distances))
+
+        return indices[_np.argsort(distances[indices], kind="stable")].tolist()
+
+    distances = _getSquaredDistances(positions, x, y, z)
+    return heapq.nsmallest(k, range(len(distances)), key=distances.__getitem__)
+
+
+def getWithinRadius(positions, x, y, z=None, radius=1.0):
+    """Checks for many positions if they are within the radius around the given coordinates.
+
+    @param  positions   list    positions (tuples with 2 or 3 coords)
+    @param  x           float   x-coord
+    @param  y           float   y-coord
+    @param  z           float   z-coord, positions are treated as 2d ones if not given #optional
+    @param  radius      float   radius #optional
+
+    @returns    list OR numpy.ndarray   booleans (a mask), same order as positions
+    """
+    squared_radius = radius * radius
+
+    if _np is not None:
+        return _getSquaredDistancesNumPy(positions, x, y, z) <= squared_radius
+
+    return [d <= squared_radius for d in _getSquaredDistances(positions, x, y, z)]
+
+
+def getHeadings(positions, x, y):
+    """Returns the headings from many positions to the given coordinates, see `getHeading()`.
+
+    @param  positions   list    positions (tuples with 2 or 3 coords)
+    @param  x           float   x-coord of the target
+    @param  y           float   y-coord of the target
+
+    @returns    list OR numpy.ndarray   headings in degrees, same order as positions
+    """
+    if _np is not None:
+        a = _asArray(positions, 2)
+        return _np.degrees(_np.arctan2(a[:, 0] - x, y - a[:, 1])) % 360.0
+
+    atan2 = math.atan2
+    degrees = math.degrees
+    return [degrees(atan2(x1 - x, y - y1)) % 360.0 for x1, y1 in _as2d(positions)]
+
+
+def _as2d(positions):
+    return [(pos[0], pos[1]) for pos in positions]
+
+
+def _asArray(positions, dimensions):
+    a = _np.asarray(positions, dtype=float)
+
+    if a.size == 0:
+        return a.reshape(0, dimensions)
+
+    return a[:, :dimensions]
+
+
+def _getSquaredDistances(positions, x, y, z):
+    if z is None:
+        return [(pos[0] - x) * (pos[0] - x) + (pos[1] - y) * (pos[1] - y) for pos in positions]
+
+    return [(x1 - x) * (x1 - x) + (y1 - y) * (y1 - y) + (z1 - z) * (z1 - z) for x1, y1, z1 in positions]
+
+
+def _getSquaredDistancesNumPy(positions, x, y, z):
+    if z is None:
+        diff = _asArray(positions, 2) - (x, y)
     else:
-        return math.sqrt(math.pow(x1 - x1, 2) + math.pow(y2 - y1, 2) + math.pow(z2 - z1, 2))
+        diff = _asArray(positions, 3) - (x, y, z)
+
+    return _np.einsum("ij,ij->i", diff, diff)
+
+
+class Grid():
+    """Uniform 2d grid which keeps track of circular areas, for fast lookups of everything around a position.
+
+    Every area gets stored in each cell it overlaps, so a lookup only has to check the few areas sharing a cell
+    with the given position instead of all of them.
+
+    @attr   size    float   edge length of the grid cells
+    """
+    __slots__ = ('size', '_cells', '_keys')
+
+    def __init__(self, size=50.0):
+        """Initializes a new, empty grid.
+
+        @param  size    float   edge length of the grid cells #optional
+        """
+        self.size = float(size)
+        self._cells = {}
+        self._keys = {}
+
+    def __contains__(self, key):
+        return key in self._keys
+
+    def __len__(self):
+        return len(self._keys)
+
+    def insert(self, key, x, y, r=0.0):
+        """Inserts (or moves) a circular area.
+
+        @param  key     any     key of the area, e.g. an id
+        @param  x       float   x-coord of the center
+        @param  y       float   y-coord of the center
+        @param  r       float   radius #optional
+        """
+        if key in self._keys:
+            self.remove(key)
+
+        cells = self._getCells(x, y, r)
+
+        for cell in cells:
+            if cell in self._cells:
+                self._cells[cell].add(key)
+            else:
+                self._cells[cell] = {key}
+
+        self._keys[key] = cells
+
+    def remove(self, key):
+        """Removes an area.
+
+        @param  key     any     key of the area
+
+        @returns    bool    True if the area was inserted before, False if not
+        """
+        cells = self._keys.pop(key, None)
+
+        if cells is None:
+            return False
+
+        for cell in cells:
+            keys = self._cells[cell]
+            keys.discard(key)
+
+            if not keys:
+                del self._cells[cell]
+
+        return True
+
+    def getAt(self, x, y):
+        """Returns the keys of all areas sharing a cell with the given position.
+
+        Please note that these are candidates only, they don't necessarily contain the position.
+
+        @param  x       float   x-coord
+        @param  y       float   y-coord
+
+        @returns    set     keys (don't modify it!)
+        """
+        return self._cells.get((int(x // self.size), int(y // self.size)), _EMPTY_CELL)
+
+    def getNear(self, x, y, r=0.0):
+        """Returns the keys of all areas sharing a cell with the given circle.
+
+        Please note that these are candidates only, they don't necessarily overlap the circle.
+
+        @param  x       float   x-coord
+        @param  y       float   y-coord
+        @param  r       float   radius #optional
+
+        @returns    set     keys
+        """
+        keys = set()
+
+        for cell in self._getCells(x, y, r):
+            keys.update(self._cells.get(cell, _EMPTY_CELL))
+
+        return keys
+
+    def _getCells(self, x, y, r):
+        size = self.size
+        x1, x2 = int((x - r) // size), int((x + r) // size)
+        y1, y2 = int((y - r) // size), int((y + r) // size)
+
+        return [(cx, cy) for cx in range(x1, x2 + 1) for cy in range(y1, y2 + 1)]
+
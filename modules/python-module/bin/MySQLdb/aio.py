@@ -0,0 +1,303 @@
+"""MySQLdb asyncio support
+
+This module implements an asyncio interface on top of the non-blocking
+path of Connection.query(): the query is sent with send_query(), the
+event loop waits until the server's answer arrives on the socket, and
+only then read_query_result() is called. While one coroutine waits for
+its query, the loop is free to run others::
+
+    from MySQLdb import aio
+
+    async def load(name):
+        conn = await aio.connect(host="localhost", user="orange",
+                                 passwd="...", db="orange")
+        async with conn.cursor() as cur:
+            await cur.execute("SELECT * FROM players WHERE name = %s", (name,))
+            return await cur.fetchone()
+
+A connection runs one query at a time; concurrent execute() calls on
+the same connection are queued by a lock. Open several connections to
+run several queries at once. Connecting itself blocks in the C library,
+so connect() does it in the loop's default executor. So does reading a
+result set, which may still be arriving when its first bytes wake up
+the loop; results without rows (UPDATE, INSERT, ...) are read directly.
+The further result sets of a multi-statement query are read by
+nextset() without the executor, so keep big SELECTs out of those.
+
+This module needs Python 3.5 or newer. Event loops without add_reader()
+(e.g. the ProactorEventLoop on Windows) are supported too, queries are
+run in the default executor there.
+"""
+import asyncio
+import sys
+from functools import partial
+
+from MySQLdb import connections
+from MySQLdb.cursors import CursorStoreResultMixIn, CursorTupleRowsMixIn, \
+    CursorDictRowsMixIn, BaseCursor, RE_BATCHABLE
+
+try:
+    _get_running_loop = asyncio.get_running_loop
+except AttributeError:
+    # Python < 3.7, where the current loop is the running one inside
+    # coroutines
+    _get_running_loop = asyncio.get_event_loop
+
+
+class AsyncConnection(object):
+    """Wrapper around a Connection whose queries can be awaited.
+
+    Everything which doesn't talk to the server (literal(), escape(),
+    character_set_name(), ...) is forwarded to the wrapped connection.
+    """
+
+    def __init__(self, connection, loop=None):
+        """
+        Wrap a connection.
+
+        :param connection: connected MySQLdb.connections.Connection
+        :param loop: event loop the connection is used on (defaults to
+            the running event loop)
+        """
+        self.connection = connection
+        self.cursorclass = AsyncCursor
+        self._loop = loop or _get_running_loop()
+        self._lock = asyncio.Lock()
+        self._selectable = True
+
+    def __getattr__(self, name):
+        return getattr(self.connection, name)
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc, value, tb):
+        self.close()
+
+    def cursor(self, cursorclass=None):
+        """
+        Create a cursor whose execute() and fetch methods are
+        coroutines. Defaults to AsyncCursor.
+        """
+        return (cursorclass or self.cursorclass)(self)
+
+    async def query(self, query):
+        """
+        Send a query and wait for the server to answer it, without
+        blocking the event loop. The result has to be read with
+        store_result() or use_result() afterwards, so this should be
+        called with the lock held. Use a cursor instead.
+
+        If the waiting coroutine is cancelled, the connection is closed,
+        since the answer of the server would be out of sync with the
+        next query.
+        """
+        conn = self.connection
+        if isinstance(query, bytearray):
+            query = bytes(query)
+
+        if not self._selectable:
+            await self._loop.run_in_executor(None, conn.query, query)
+            return
+
+        fd = conn.fileno()
+        ready = self._loop.create_future()
+        try:
+            self._loop.add_reader(fd, _set_ready, ready)
+        except NotImplementedError:
+            self._selectable = False
+            await self._loop.run_in_executor(None, conn.query, query)
+            return
+
+        try:
+            conn.send_query(query)
+            await ready
+        except asyncio.CancelledError:
+            self._loop.remove_reader(fd)
+            conn.close()
+            raise
+        except BaseException:
+            self._loop.remove_reader(fd)
+            raise
+        self._loop.remove_reader(fd)
+        conn.read_query_result()
+
+    async def commit(self):
+        """Commit the current transaction."""
+        await self._simple_query(b"COMMIT")
+
+    async def rollback(self):
+        """Roll back the current transaction."""
+        await self._simple_query(b"ROLLBACK")
+
+    async def autocommit(self, on):
+        """Enable or disable autocommit."""
+        on = bool(on)
+        if self.connection.get_autocommit() != on:
+            await self._simple_query(b"SET autocommit=1" if on else b"SET autocommit=0")
+
+    async def ping(self):
+        """Check that the server is still alive."""
+        await self._simple_query(b"DO 1")
+
+    def close(self):
+        """Close the connection."""
+        self.connection.close()
+
+    async def _simple_query(self, query):
+        async with self._lock:
+            await self.query(query)
+
+
+class AsyncCursorMixIn(object):
+    """This is a MixIn class which makes execute(), executemany() and
+    the fetch methods coroutines. Rows are stored on the client side
+    (read in the loop's default executor), so fetching never waits for
+    the server, but the methods are coroutines anyway to keep the
+    interface the same if that changes."""
+
+    def __init__(self, connection):
+        """
+        Create a cursor for an AsyncConnection.
+        """
+        super(AsyncCursorMixIn, self).__init__(connection.connection)
+        self._async_connection = connection
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        del exc_info
+        self.close()
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        row = CursorStoreResultMixIn.fetchone(self)
+        if row is None:
+            raise StopAsyncIteration
+        return row
+
+    async def execute(self, query, args=None):
+        """Execute a query, see BaseCursor.execute()."""
+        async with self._async_connection._lock:
+            return await self._execute(query, args)
+
+    async def executemany(self, query, args):
+        """Execute a multi-row query, see BaseCursor.executemany().
+
+        The connection stays locked until all rows are done."""
+        del self.messages[:]
+
+        if not args:
+            return
+
+        rows = 0
+        async with self._async_connection._lock:
+            statements = self._get_bulk_statements(query, args)
+            if statements is not None:
+                for sql in statements:
+                    rows += await self._execute(sql)
+            elif self.batch_statements and RE_BATCHABLE.match(query) and \
+                    self._get_db()._multi_statements:
+                for sql in self._iter_multi_statements(query, args,
+                                                       self.max_stmt_length):
+                    rows += await self._execute(sql)
+                    while self.nextset():
+                        rows += self.rowcount
+            else:
+                for arg in args:
+                    rows += await self._execute(query, arg)
+        self.rowcount = rows
+        return rows
+
+    async def _execute(self, query, args=None):
+        # called with the lock held, since skipping the remaining result
+        # sets and escaping the args use the connection too
+        while self.nextset():
+            pass
+        query = self._mogrify(query, args)
+
+        res = None
+        try:
+            self._last_executed = query
+            await self._async_connection.query(query)
+            if self._get_db().field_count():
+                # store_result() reads every row from the socket
+                await self._async_connection._loop.run_in_executor(
+                    None, self._store_result)
+            else:
+                self._store_result()
+            res = self.rowcount
+        except Exception:
+            exc, value = sys.exc_info()[:2]
+            self.errorhandler(self, exc, value)
+        self._executed = query
+        if not self._defer_warnings:
+            self._warning_check()
+        return res
+
+    def _store_result(self):
+        self._do_get_result()
+        self._post_get_result()
+
+    async def fetchone(self):
+        """Fetches a single row from the cursor. None indicates that
+        no more rows are available."""
+        return CursorStoreResultMixIn.fetchone(self)
+
+    async def fetchmany(self, size=None):
+        """Fetch up to size rows from the cursor."""
+        return CursorStoreResultMixIn.fetchmany(self, size)
+
+    async def fetchall(self):
+        """Fetchs all available rows from the cursor."""
+        return CursorStoreResultMixIn.fetchall(self)
+
+    def nextset(self):
+        """Advance to the next result set, see BaseCursor.nextset().
+
+        The next result set has already arrived together with the first
+        one, so this doesn't have to wait for the server."""
+        if self._executed:
+            CursorStoreResultMixIn.fetchall(self)
+        del self.messages[:]
+
+        db = self._get_db()
+        nr = db.next_result()
+        if nr == -1:
+            return None
+        self._do_get_result()
+        self._post_get_result()
+        self._warning_check()
+        return 1
+
+
+class AsyncCursor(AsyncCursorMixIn, CursorStoreResultMixIn,
+                  CursorTupleRowsMixIn, BaseCursor):
+    """This is a Cursor class for AsyncConnection that returns rows as
+    tuples and stores the result set in the client."""
+
+
+class AsyncDictCursor(AsyncCursorMixIn, CursorStoreResultMixIn,
+                      CursorDictRowsMixIn, BaseCursor):
+    """This is a Cursor class for AsyncConnection that returns rows as
+    dictionaries and stores the result set in the client."""
+
+
+async def connect(loop=None, **kwargs):
+    """
+    Create a connection in the default executor of the loop and wrap it
+    in an AsyncConnection. The keyword arguments are the same as for
+    MySQLdb.connect().
+    """
+    loop = loop or _get_running_loop()
+    conn = await loop.run_in_executor(
+        None, partial(connections.Connection, **kwargs))
+    return AsyncConnection(conn, loop)
+
+
+def _set_ready(future):
+    if not future.done():
+        future.set_result(None)
@@ -0,0 +1,295 @@
+"""MySQLdb Query Cache
+
+This module implements CachingCursor, a cursor which keeps the results
+of SELECT queries in a QueryCache, so identical reads (e.g. the vehicle
+catalogue or shop prices on every player join) don't reach the server
+again::
+
+    from MySQLdb.cache import CachingCursor
+
+    cur = conn.cursor(CachingCursor)
+    cur.execute("SELECT model, price FROM shop WHERE category = %s", (cat,))
+
+Results are keyed by the query with its escaped arguments. They expire
+after ttl seconds, and the least recently used ones are evicted once
+the cache holds max_entries results. SELECTs whose result changes
+without a write (NOW(), RAND(), UUID(), user variables, FOR UPDATE,
+...) aren't cached.
+
+Every INSERT, REPLACE, UPDATE and DELETE executed through a
+CachingCursor drops the cached results read from the tables it writes
+to; any other statement which isn't known to be read-only drops the
+whole cache. Writes which don't go through a CachingCursor (other
+cursors, other processes, rolled back transactions) aren't noticed, so
+pick the ttl accordingly or call QueryCache.invalidate() yourself.
+
+By default all CachingCursors share default_cache. If you connect to
+several databases, give each a cache of its own by subclassing
+CachingCursor and setting its cache attribute.
+
+Cached rows are shared by every cursor which gets them, which is why
+there is only a tuple variant: rows as dictionaries could be modified.
+"""
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from MySQLdb.cursors import CursorStoreResultMixIn, CursorTupleRowsMixIn, \
+    BaseCursor
+
+try:
+    _monotonic = time.monotonic
+except AttributeError:
+    _monotonic = time.time
+
+
+#: Regular expressions for :class:`CursorCachingMixIn`.
+RE_SELECT = re.compile(br"\s*\(?\s*SELECT\s", re.IGNORECASE)
+RE_UNCACHEABLE = re.compile(
+    br"\b(?:FOR\s+UPDATE|LOCK\s+IN\s+SHARE\s+MODE|SQL_NO_CACHE|INTO)\b|"
+    # results which change without a write: time, randomness, session
+    # state (including @variables) and locks
+    br"\b(?:CURRENT_TIMESTAMP|CURRENT_DATE|CURRENT_TIME|CURRENT_USER|"
+    br"LOCALTIME|LOCALTIMESTAMP|UTC_TIMESTAMP|UTC_DATE|UTC_TIME)\b|"
+    br"\b(?:NOW|SYSDATE|CURDATE|CURTIME|UNIX_TIMESTAMP|RAND|UUID|UUID_SHORT|"
+    br"CONNECTION_ID|LAST_INSERT_ID|FOUND_ROWS|ROW_COUNT|USER|SESSION_USER|"
+    br"SYSTEM_USER|DATABASE|SCHEMA|SLEEP|GET_LOCK|IS_FREE_LOCK|IS_USED_LOCK|"
+    br"RELEASE_LOCK|BENCHMARK)\s*\(|@",
+    re.IGNORECASE)
+RE_READ_ONLY = re.compile(
+    br"\s*(?:SELECT|SHOW|SET|DO|DESCRIBE|DESC|EXPLAIN|USE|BEGIN|START|"
+    br"COMMIT|SAVEPOINT|RELEASE|HELP)\b", re.IGNORECASE)
+RE_WRITE = re.compile(br"\s*(?:INSERT|REPLACE|UPDATE|DELETE)\b",
+                      re.IGNORECASE)
+RE_READ_TABLES = re.compile(
+    br"\b(?:FROM|JOIN)\s+(?=(.*?)(?:\b(?:WHERE|GROUP|ORDER|LIMIT|HAVING|"
+    br"UNION|JOIN|INNER|LEFT|RIGHT|CROSS|STRAIGHT_JOIN|NATURAL|ON|USING|"
+    br"FOR|LOCK|WINDOW|PARTITION)\b|[;()]|\Z))",
+    re.IGNORECASE | re.DOTALL)
+RE_WRITE_TABLES = re.compile(
+    br"\b(?:(?:INSERT|REPLACE)(?:\s+(?:LOW_PRIORITY|DELAYED|HIGH_PRIORITY|IGNORE))*"
+    br"(?:\s+INTO)?|UPDATE(?:\s+(?:LOW_PRIORITY|IGNORE))*|"
+    br"DELETE(?:\s+(?:LOW_PRIORITY|QUICK|IGNORE))*\s+FROM)"
+    br"\s+([`\w$.]+)(\s*(?:,|\bJOIN\b)?)",
+    re.IGNORECASE)
+
+
+class QueryCache(object):
+    """Thread-safe LRU cache of query results with a time to live.
+
+    The statistics hits, misses, evictions (entries dropped because the
+    cache was full or they expired) and invalidations (entries dropped
+    because of a write) are counted since the cache was created, see
+    stats().
+    """
+
+    def __init__(self, max_entries=1024, ttl=60.0):
+        """
+        :param int max_entries: maximum number of cached results
+        :param float ttl:       seconds a result stays valid (None keeps
+            it until it is evicted or invalidated)
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (expires, result, tables)
+        self._tables = {}               # table -> set of keys
+        self._generation = 0            # invalidations of the whole cache
+        self._generations = {}          # table -> invalidations of it
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Returns the cached result of key, or None."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry[0] is not None and entry[0] < _monotonic():
+                self._remove(key)
+                self.evictions += 1
+                self.misses += 1
+                return None
+            # re-insert, so the least recently used entry comes first
+            del self._entries[key]
+            self._entries[key] = entry
+            self.hits += 1
+            return entry[1]
+
+    def generation(self, tables):
+        """Returns a token which changes whenever one of the tables is
+        invalidated. Take it before running the query and pass it to
+        put()."""
+        with self._lock:
+            return self._get_generation(tables)
+
+    def put(self, key, result, tables, generation=None):
+        """Cache a result.
+
+        :param key:     cache key (the query with its escaped arguments)
+        :param result:  anything, CachingCursor stores a tuple of rows,
+            description and description_flags
+        :param tables:  names of the tables the result was read from
+        :param generation: token returned by generation() before the
+            query ran; if one of the tables was invalidated since, the
+            result may be stale and isn't cached
+        """
+        if not self.max_entries:
+            return
+        expires = None if self.ttl is None else _monotonic() + self.ttl
+        with self._lock:
+            if generation is not None and \
+                    generation != self._get_generation(tables):
+                return
+            if key in self._entries:
+                self._remove(key)
+            while len(self._entries) >= self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+            self._entries[key] = (expires, result, tables)
+            for table in tables:
+                self._tables.setdefault(table, set()).add(key)
+
+    def invalidate(self, tables=None):
+        """Drop the cached results read from any of the tables, or all
+        results if tables is None."""
+        with self._lock:
+            if tables is None:
+                self.invalidations += len(self._entries)
+                self._entries.clear()
+                self._tables.clear()
+                self._generation += 1
+                return
+            for table in tables:
+                self._generations[table] = self._generations.get(table, 0) + 1
+                for key in list(self._tables.get(table, ())):
+                    self._remove(key)
+                    self.invalidations += 1
+
+    def clear(self):
+        """Drop all cached results and reset the statistics."""
+        with self._lock:
+            self._entries.clear()
+            self._tables.clear()
+            self._generation += 1
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def stats(self):
+        """Returns the statistics as a dictionary, including the number
+        of cached results (size) and the hit ratio."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': float(self.hits) / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+    def _get_generation(self, tables):
+        # called with the lock held
+        return (self._generation,
+                tuple(self._generations.get(table, 0) for table in tables))
+
+    def _remove(self, key):
+        # called with the lock held
+        entry = self._entries.pop(key)
+        for table in entry[2]:
+            keys = self._tables.get(table)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tables[table]
+
+
+#: Cache shared by every CachingCursor which doesn't set its own.
+default_cache = QueryCache()
+
+
+class CursorCachingMixIn(object):
+    """This is a MixIn class which serves SELECT results from a
+    QueryCache and invalidates it on writes. It has to come before
+    CursorStoreResultMixIn."""
+
+    #: QueryCache used by this cursor class.
+    cache = default_cache
+
+    def _query(self, q):
+        if isinstance(q, bytearray):
+            q = bytes(q)
+        key = q.strip().rstrip(b';').rstrip()
+
+        if RE_SELECT.match(key) and not RE_UNCACHEABLE.search(key):
+            result = self.cache.get(key)
+            if result is not None:
+                self._rows, self.description, self.description_flags = result
+                self._result = None
+                self._warnings = 0
+                self.rowcount = len(self._rows)
+                self.rownumber = 0
+                self.lastrowid = None
+                self._last_executed = q
+                return self.rowcount
+
+            # a write which invalidates the tables while the query runs
+            # changes the generation, so the result isn't cached
+            tables = _get_read_tables(key)
+            generation = self.cache.generation(tables)
+            rowcount = super(CursorCachingMixIn, self)._query(q)
+            self.cache.put(key, (self._rows, self.description,
+                                 self.description_flags),
+                           tables, generation)
+            return rowcount
+
+        if RE_READ_ONLY.match(key):
+            return super(CursorCachingMixIn, self)._query(q)
+
+        try:
+            return super(CursorCachingMixIn, self)._query(q)
+        finally:
+            # also if the query failed, part of it may have been done
+            self.cache.invalidate(_get_written_tables(key))
+
+
+class CachingCursor(CursorCachingMixIn, CursorStoreResultMixIn,
+                    CursorTupleRowsMixIn, BaseCursor):
+    """This is a Cursor class that returns rows as tuples, stores the
+    result set in the client and caches the results of SELECTs."""
+
+
+def _get_table(name):
+    return name.replace(b'`', b'').rsplit(b'.', 1)[-1].lower().decode('latin1')
+
+
+def _get_read_tables(query):
+    """Returns the names of the tables a SELECT reads from."""
+    tables = set()
+    for m in RE_READ_TABLES.finditer(query):
+        for item in m.group(1).split(b','):
+            words = item.split()
+            if words:
+                tables.add(_get_table(words[0]))
+    return frozenset(tables)
+
+
+def _get_written_tables(query):
+    """Returns the names of the tables a statement writes to, or None if
+    they can't be told, so the whole cache has to be invalidated."""
+    if not RE_WRITE.match(query):
+        return None
+    tables = set()
+    for m in RE_WRITE_TABLES.finditer(query):
+        if m.group(2).strip():
+            # multiple-table UPDATE or DELETE
+            return None
+        tables.add(_get_table(m.group(1)))
+    return tables or None
@@ -0,0 +1,194 @@
+"""MySQLdb Columnar Cursor
+
+This module implements ColumnarCursor, which stores a result set as
+one typed column per field instead of one tuple per row. Analytics
+queries over millions of rows spend most of their time allocating a
+Python object per cell; a column of integers is a single array here::
+
+    from MySQLdb.columnar import ColumnarCursor
+
+    cur = conn.cursor(ColumnarCursor)
+    cur.execute("SELECT killer, victim, weapon, time FROM kills")
+    columns = cur.fetchcolumns()
+    columns['weapon']     # array('q', [...]) or numpy.ndarray
+
+The rows are fetched without the conversions table of the connection,
+so _mysql returns the raw text of every field, and every column is
+decoded at once by its FIELD_TYPE:
+
+    integer types   array.array('q') ('Q' if UNSIGNED), int64/uint64
+                    ndarray if NumPy is installed
+    FLOAT, DOUBLE   array.array('d'), float64 ndarray
+    DATE            datetime64[D] ndarray (NumPy only)
+    DATETIME,
+    TIMESTAMP       datetime64[us] ndarray (NumPy only)
+
+Everything else, and every column containing NULL or values NumPy
+can't parse (e.g. zero dates), is a list converted cell by cell through
+the conversions table, like the other cursors do.
+
+fetchone(), fetchmany() and fetchall() still work and build the row
+tuples on demand. Their values are the Python objects the other cursors
+return (int, float, datetime.date, datetime.datetime), not NumPy
+scalars.
+"""
+from array import array
+from collections import OrderedDict
+
+from MySQLdb.constants import FIELD_TYPE, FLAG
+from MySQLdb.cursors import CursorStoreResultMixIn, CursorTupleRowsMixIn, \
+    BaseCursor
+
+try:
+    import numpy as _np
+except ImportError:
+    _np = None
+
+
+_INTEGER_TYPES = frozenset([FIELD_TYPE.TINY, FIELD_TYPE.SHORT, FIELD_TYPE.LONG,
+                            FIELD_TYPE.INT24, FIELD_TYPE.LONGLONG,
+                            FIELD_TYPE.YEAR])
+_FLOAT_TYPES = frozenset([FIELD_TYPE.FLOAT, FIELD_TYPE.DOUBLE])
+_DATE_TYPES = {
+    FIELD_TYPE.DATE: 'datetime64[D]',
+    FIELD_TYPE.NEWDATE: 'datetime64[D]',
+    FIELD_TYPE.DATETIME: 'datetime64[us]',
+    FIELD_TYPE.TIMESTAMP: 'datetime64[us]',
+}
+
+#: Number of rows :class:`ColumnRows` converts at once when iterated.
+_ITER_ROWS = 1024
+
+
+class ColumnRows(object):
+    """Read-only sequence of row tuples, built on demand from the
+    columns of a ColumnarCursor. The values of ndarray columns are
+    converted from NumPy scalars to Python objects."""
+
+    def __init__(self, columns, count):
+        self._columns = columns
+        self._count = count
+        self._getters = [column.item if _is_ndarray(column)
+                         else column.__getitem__ for column in columns]
+
+    def __len__(self):
+        return self._count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return list(zip(*[_to_python(column[index])
+                              for column in self._columns]))
+        if index < 0:
+            index += self._count
+        if not 0 <= index < self._count:
+            raise IndexError("row index out of range")
+        return tuple(get(index) for get in self._getters)
+
+    def __iter__(self):
+        for start in range(0, self._count, _ITER_ROWS):
+            for row in self[start:start + _ITER_ROWS]:
+                yield row
+
+
+class CursorColumnarMixIn(object):
+    """This is a MixIn class which causes the result set to be stored as
+    typed columns, see fetchcolumns()."""
+
+    _columns = None
+
+    def _get_result(self):
+        # without conversions, fetch_row() returns the raw values
+        db = self._get_db()
+        converter = db.converter
+        db.converter = {}
+        try:
+            return db.store_result()
+        finally:
+            db.converter = converter
+
+    def _post_get_result(self):
+        if not self._result:
+            self._columns = OrderedDict()
+            self._rows = ()
+            return
+
+        raw = self._result.fetch_row(0)
+        self._result = None
+        count = len(raw)
+        raw = list(zip(*raw)) if count else [()] * len(self.description)
+
+        conv = self._get_db().converter
+        self._columns = OrderedDict()
+        decoded = []
+        for field, flags, values in zip(self.description, self.description_flags, raw):
+            column = _decode_column(list(values), field[1], flags, conv)
+            decoded.append(column)
+            name = field[0]
+            if name in self._columns:
+                name = "%s_%d" % (name, len(self._columns))
+            self._columns[name] = column
+        self._rows = ColumnRows(decoded, count)
+
+    def fetchcolumns(self):
+        """Returns the whole result set as an OrderedDict mapping the
+        column names to their columns. Duplicate names get the index of
+        the column appended. Doesn't move the row position."""
+        self._check_executed()
+        return self._columns
+
+
+class ColumnarCursor(CursorColumnarMixIn, CursorStoreResultMixIn,
+                     CursorTupleRowsMixIn, BaseCursor):
+    """This is a Cursor class that stores the result set in the client
+    as typed columns."""
+
+
+def _decode_column(values, field_type, flags, conv):
+    if None not in values:
+        try:
+            if field_type in _INTEGER_TYPES:
+                return _decode_integers(values, flags & FLAG.UNSIGNED)
+            if field_type in _FLOAT_TYPES:
+                column = array('d', map(float, values))
+                if _np is not None:
+                    return _np.frombuffer(column, dtype=_np.float64)
+                return column
+            if field_type in _DATE_TYPES and _np is not None:
+                return _np.array(values).astype(_DATE_TYPES[field_type])
+        except (ValueError, OverflowError):
+            pass
+
+    convert = _get_converter(conv, field_type, flags)
+    if convert is None:
+        return values
+    return [None if value is None else convert(value) for value in values]
+
+
+def _decode_integers(values, unsigned):
+    if _np is not None:
+        # parses str and bytes, raises ValueError or OverflowError
+        return _np.array(values, dtype=_np.uint64 if unsigned else _np.int64)
+    return array('Q' if unsigned else 'q', map(int, values))
+
+
+def _is_ndarray(column):
+    return _np is not None and isinstance(column, _np.ndarray)
+
+
+def _to_python(column):
+    # tolist() turns datetime64 into datetime.date and datetime.datetime
+    if _is_ndarray(column):
+        return column.tolist()
+    return column
+
+
+def _get_converter(conv, field_type, flags):
+    # same lookup as _mysql: either a function, or a list of
+    # (flag mask, function) pairs where the first matching one is used
+    convert = conv.get(field_type)
+    if not isinstance(convert, list):
+        return convert
+    for mask, function in convert:
+        if mask is None or flags & mask:
+            return function
+    return None
@@ -8,7 +8,8 @@ import re
 import sys
 
 from MySQLdb import cursors
-from MySQLdb.compat import unicode, PY2
+from MySQLdb.compat import unicode, long, PY2
+from MySQLdb.converters import Thing2Str, Float2Str, None2NULL
 from _mysql_exceptions import (
     Warning, Error, InterfaceError, DataError,
     DatabaseError, OperationalError, IntegrityError, InternalError,
@@ -29,6 +30,29 @@ if not PY2:
             return s.decode('ascii', 'surrogateescape')
 
 
+# Functions used by Connection.literal_many() for the default encoders of
+# the most common types. They return the same literal as the encoder, but
+# as bytes and without going through escape().
+
+def _int_literal(db, o):
+    return str(o).encode('ascii')
+
+def _float_literal(db, o):
+    return ('%.15g' % o).encode('ascii')
+
+def _null_literal(db, o):
+    return b'NULL'
+
+def _unicode_literal(db, o):
+    return db.string_literal(o.encode(db.encoding))
+
+def _literal(db, o):
+    s = db.escape(o, db.encoders)
+    if isinstance(s, unicode):
+        s = s.encode(db.encoding, 'surrogateescape')
+    return s
+
+
 def defaulterrorhandler(connection, cursor, errorclass, errorvalue):
     """
     If cursor is not None, (errorclass, errorvalue) is appended to
@@ -196,6 +220,7 @@ class Connection(_mysql.connection):
             client_flag |= CLIENT.MULTI_RESULTS
 
         kwargs2['client_flag'] = client_flag
+        self._multi_statements = bool(client_flag & CLIENT.MULTI_STATEMENTS)
 
         # PEP-249 requires autocommit to be initially off
         autocommit = kwargs2.pop('autocommit', False)
@@ -323,6 +348,40 @@ class Connection(_mysql.connection):
             return _fast_surrogateescape(s)
         return s
 
+    def literal_many(self, seq):
+        """Returns the SQL literals of all objects in seq as a list of
+        bytes, ready to be joined into a query. The encoder of every
+        type is looked up once per call, and the default encoders of
+        int, float, None and unicode are replaced by functions writing
+        bytes directly, so there's no str/bytes round-trip like with
+        literal().
+
+        Non-standard. For internal use; do not use this in your
+        applications.
+        """
+        functions = {}
+        result = []
+        append = result.append
+        for o in seq:
+            t = type(o)
+            function = functions.get(t)
+            if function is None:
+                function = functions[t] = self._get_literal_function(t)
+            append(function(self, o))
+        return result
+
+    def _get_literal_function(self, t):
+        encoder = self.encoders.get(t)
+        if encoder is Thing2Str and (t is int or t is long):
+            return _int_literal
+        if encoder is Float2Str and t is float:
+            return _float_literal
+        if encoder is None2NULL:
+            return _null_literal
+        if encoder is self.unicode_literal and t is unicode:
+            return _unicode_literal
+        return _literal
+
     def begin(self):
         """Explicitly begin a connection. Non-standard.
         DEPRECATED: Will be removed in 1.3.
@@ -32,6 +32,137 @@ RE_INSERT_VALUES = re.compile(
     re.IGNORECASE | re.DOTALL)
 
 
+#: Regular expression for :meth:`Cursor.executemany`.
+#: Other statements of these kinds are batched into multi-statement
+#: queries, see :attr:`BaseCursor.batch_statements`.
+RE_BATCHABLE = re.compile(r"\s*(?:UPDATE|DELETE|INSERT|REPLACE)\s",
+                          re.IGNORECASE)
+
+#: Regular expressions for :attr:`BaseCursor.update_as_upsert`.
+#: Only ``UPDATE table SET col=%s, ... WHERE key=%s AND ...`` matches.
+RE_KEYED_UPDATE = re.compile(
+    r"\s*UPDATE\s+([\w$.`]+)\s+SET\s+(.+?)\s+WHERE\s+(.+?)[\s;]*\Z",
+    re.IGNORECASE | re.DOTALL)
+RE_ASSIGNMENT = re.compile(r"\s*([\w$`]+)\s*=\s*(%s|%\(\w+\)s)\s*\Z")
+RE_AND = re.compile(r"\s+AND\s+", re.IGNORECASE)
+
+#: Regular expression for :class:`QueryTemplate`, matching ``%s``,
+#: ``%(name)s``, ``%%`` and every other conversion specifier.
+RE_PLACEHOLDER = re.compile(r"%(?:\(([^()]*)\))?(.?)", re.DOTALL)
+
+
+class QueryTemplate(object):
+    """A query whose placeholders have been located in advance.
+
+    execute() decodes the query, interpolates the escaped arguments
+    with ``query % args`` and encodes the result again on every call.
+    A template splits the query once into encoded segments between its
+    placeholders, so rendering only escapes the arguments and joins
+    bytes. executemany() parses one per call and renders every row
+    with it.
+    """
+
+    __slots__ = ('segments', 'names', 'count')
+
+    def __init__(self, segments, names):
+        self.segments = segments
+        self.names = names
+        self.count = len(segments) - 1
+
+    @classmethod
+    def parse(cls, query, encoding):
+        """Parse a query using the ``format`` or ``pyformat`` param
+        style. Returns None if it contains anything but ``%s``,
+        ``%(name)s`` and ``%%``, or mixes both kinds of placeholders;
+        execute() falls back to ``%`` interpolation for those.
+
+        :param query: query as unicode (as bytes on Python 2)
+        :param str encoding: character set of the connection
+        """
+        segments = []
+        names = []
+        literal = []
+        pos = 0
+        for m in RE_PLACEHOLDER.finditer(query):
+            name, conversion = m.groups()
+            literal.append(query[pos:m.start()])
+            pos = m.end()
+            if conversion == '%' and name is None:
+                literal.append(conversion)
+                continue
+            if conversion != 's':
+                return None
+            segments.append(query[:0].join(literal))
+            names.append(name)
+            literal = []
+        literal.append(query[pos:])
+        segments.append(query[:0].join(literal))
+
+        if None in names:
+            if len(set(names)) > 1:
+                return None
+            names = None
+        segments = tuple(s.encode(encoding, 'surrogateescape')
+                         if isinstance(s, unicode) else s for s in segments)
+        return cls(segments, names and tuple(names))
+
+    def accepts(self, args):
+        """Returns True if args are of the kind the placeholders expect
+        (a mapping for ``%(name)s``, a sequence for ``%s``)."""
+        return isinstance(args, dict) == (self.names is not None)
+
+    def render(self, args, db):
+        """Escape the arguments with Connection.literal_many() and
+        interpolate them. Returns the query as bytes.
+
+        Raises TypeError on a wrong number of arguments and KeyError on
+        a missing name, like ``%`` interpolation does."""
+        if self.names is not None:
+            args = [args[name] for name in self.names]
+        elif not isinstance(args, (tuple, list)):
+            args = tuple(args)
+        if len(args) != self.count:
+            if len(args) < self.count:
+                raise TypeError("not enough arguments for format string")
+            raise TypeError("not all arguments converted during string formatting")
+
+        parts = [None] * (2 * self.count + 1)
+        parts[0::2] = self.segments
+        parts[1::2] = db.literal_many(args)
+        return b''.join(parts)
+
+
+def _update_to_upsert(query):
+    """Rewrite ``UPDATE t SET a=%s, ... WHERE k=%s AND ...`` into
+    ``INSERT INTO t (a, ..., k, ...) VALUES (%s, ...) ON DUPLICATE KEY
+    UPDATE a=VALUES(a), ...``, keeping the order of the placeholders.
+    Returns None if the query doesn't have exactly that form."""
+    if isinstance(query, (bytes, bytearray)):
+        return None
+    m = RE_KEYED_UPDATE.match(query)
+    if not m:
+        return None
+    table, assignments, conditions = m.groups()
+
+    updated = []
+    columns = []
+    placeholders = []
+    for part, into in ((assignments.split(','), updated),
+                       (RE_AND.split(conditions), None)):
+        for item in part:
+            m = RE_ASSIGNMENT.match(item)
+            if not m:
+                return None
+            if into is not None:
+                into.append(m.group(1))
+            columns.append(m.group(1))
+            placeholders.append(m.group(2))
+
+    return "INSERT INTO %s (%s) VALUES (%s) ON DUPLICATE KEY UPDATE %s" % (
+        table, ', '.join(columns), ', '.join(placeholders),
+        ', '.join('%s=VALUES(%s)' % (c, c) for c in updated))
+
+
 class BaseCursor(object):
     """A base for Cursor classes. Useful attributes:
 
@@ -55,6 +186,22 @@ class BaseCursor(object):
     #: Default value of max_allowed_packet is 1048576.
     max_stmt_length = 64*1024
 
+    #: If set, :meth:`executemany` packs UPDATE, DELETE and any INSERT
+    #: or REPLACE it can't turn into a multiple-row statement into
+    #: multi-statement queries of up to :attr:`max_stmt_length` bytes,
+    #: instead of sending one query per row. Off by default: if a row
+    #: fails, the rows before it in the same query have already been
+    #: applied, and the error doesn't tell which row it was.
+    batch_statements = False
+
+    #: If set, :meth:`executemany` rewrites keyed updates like
+    #: ``UPDATE t SET a=%s, b=%s WHERE id=%s`` into a multiple-row
+    #: ``INSERT INTO t (a, b, id) VALUES ... ON DUPLICATE KEY UPDATE``.
+    #: Only use this if the WHERE columns form a unique key: rows which
+    #: don't exist yet are inserted instead of being skipped, and the
+    #: rowcount counts 2 per changed row, like MySQL does for upserts.
+    update_as_upsert = False
+
     from _mysql_exceptions import MySQLError, Warning, Error, InterfaceError, \
          DatabaseError, DataError, OperationalError, IntegrityError, \
          InternalError, ProgrammingError, NotSupportedError
@@ -215,6 +362,23 @@ class BaseCursor(object):
         """
         while self.nextset():
             pass
+        query = self._mogrify(query, args)
+
+        res = None
+        try:
+            res = self._query(query)
+        except Exception:
+            exc, value = sys.exc_info()[:2]
+            self.errorhandler(self, exc, value)
+        self._executed = query
+        if not self._defer_warnings:
+            self._warning_check()
+        return res
+
+    def _mogrify(self, query, args=None):
+        """Returns the query with the escaped args interpolated, encoded
+        in the connection's character set. Used by execute() and by the
+        cursors of MySQLdb.aio."""
         db = self._get_db()
 
         # NOTE:
@@ -241,17 +405,7 @@ class BaseCursor(object):
 
         if isinstance(query, unicode):
             query = query.encode(db.unicode_literal.charset, 'surrogateescape')
-
-        res = None
-        try:
-            res = self._query(query)
-        except Exception:
-            exc, value = sys.exc_info()[:2]
-            self.errorhandler(self, exc, value)
-        self._executed = query
-        if not self._defer_warnings:
-            self._warning_check()
-        return res
+        return query
 
     def executemany(self, query, args):
         # type: (str, list) -> int
@@ -262,7 +416,9 @@ class BaseCursor(object):
         :return: Number of rows affected, if any.
 
         This method improves performance on multiple-row INSERT and
-        REPLACE. Otherwise it is equivalent to looping over args with
+        REPLACE. With batch_statements set, other UPDATE, DELETE, INSERT
+        and REPLACE statements are sent in batches of multi-statement
+        queries. Otherwise it is equivalent to looping over args with
         execute().
         """
         del self.messages[:]
@@ -270,20 +426,54 @@ class BaseCursor(object):
         if not args:
             return
 
+        statements = self._get_bulk_statements(query, args)
+        if statements is not None:
+            rows = 0
+            for sql in statements:
+                rows += self.execute(sql)
+            self.rowcount = rows
+            return rows
+
+        if self.batch_statements and RE_BATCHABLE.match(query) and \
+                self._get_db()._multi_statements:
+            rows = 0
+            for sql in self._iter_multi_statements(query, args,
+                                                   self.max_stmt_length):
+                rows += self.execute(sql)
+                while self.nextset():
+                    rows += self.rowcount
+            self.rowcount = rows
+            return rows
+
+        self.rowcount = sum(self.execute(query, arg) for arg in args)
+        return self.rowcount
+
+    def _get_bulk_statements(self, query, args):
+        """Returns an iterator over the multiple-row statements which
+        executemany() sends for a bulk INSERT or REPLACE, or None if the
+        query isn't one."""
+        if self.update_as_upsert:
+            query = _update_to_upsert(query) or query
         m = RE_INSERT_VALUES.match(query)
         if m:
             q_prefix = m.group(1) % ()
             q_values = m.group(2).rstrip()
             q_postfix = m.group(3) or ''
             assert q_values[0] == '(' and q_values[-1] == ')'
-            return self._do_execute_many(q_prefix, q_values, q_postfix, args,
-                                         self.max_stmt_length,
-                                         self._get_db().encoding)
-
-        self.rowcount = sum(self.execute(query, arg) for arg in args)
-        return self.rowcount
+            return self._iter_execute_many(q_prefix, q_values, q_postfix, args,
+                                           self.max_stmt_length,
+                                           self._get_db().encoding)
+        return None
 
     def _do_execute_many(self, prefix, values, postfix, args, max_stmt_length, encoding):
+        rows = 0
+        for sql in self._iter_execute_many(prefix, values, postfix, args,
+                                           max_stmt_length, encoding):
+            rows += self.execute(sql)
+        self.rowcount = rows
+        return rows
+
+    def _iter_execute_many(self, prefix, values, postfix, args, max_stmt_length, encoding):
         conn = self._get_db()
         escape = self._escape_args
         if isinstance(prefix, text_type):
@@ -292,32 +482,56 @@ class BaseCursor(object):
             values = values.encode(encoding)
         if isinstance(postfix, text_type):
             postfix = postfix.encode(encoding)
-        sql = bytearray(prefix)
-        args = iter(args)
-        v = values % escape(next(args), conn)
-        if isinstance(v, text_type):
-            if PY2:
-                v = v.encode(encoding)
-            else:
-                v = v.encode(encoding, 'surrogateescape')
-        sql += v
-        rows = 0
-        for arg in args:
+        template = QueryTemplate.parse(values, encoding)
+
+        def render(arg):
+            if template is not None and template.accepts(arg):
+                return template.render(arg, conn)
             v = values % escape(arg, conn)
             if isinstance(v, text_type):
                 if PY2:
                     v = v.encode(encoding)
                 else:
                     v = v.encode(encoding, 'surrogateescape')
+            return v
+
+        sql = bytearray(prefix)
+        args = iter(args)
+        sql += render(next(args))
+        for arg in args:
+            v = render(arg)
             if len(sql) + len(v) + len(postfix) + 1 > max_stmt_length:
-                rows += self.execute(sql + postfix)
+                yield sql + postfix
                 sql = bytearray(prefix)
             else:
                 sql += b','
             sql += v
-        rows += self.execute(sql + postfix)
-        self.rowcount = rows
-        return rows
+        yield sql + postfix
+
+    def _iter_multi_statements(self, query, args, max_stmt_length):
+        db = self._get_db()
+        query = query.rstrip().rstrip(';').rstrip()
+        text = query
+        if PY2 and isinstance(text, unicode):
+            text = text.encode(db.unicode_literal.charset)
+        template = QueryTemplate.parse(text, db.unicode_literal.charset)
+
+        sql = bytearray()
+        for arg in args:
+            if template is not None and template.accepts(arg):
+                try:
+                    v = template.render(arg, db)
+                except TypeError as m:
+                    self.errorhandler(self, ProgrammingError, str(m))
+            else:
+                v = self._mogrify(query, arg)
+            if sql and len(sql) + len(v) + 1 > max_stmt_length:
+                yield sql
+                sql = bytearray()
+            elif sql:
+                sql += b';'
+            sql += v
+        yield sql
 
     def callproc(self, procname, args=()):
         """Execute stored procedure procname with args
@@ -480,7 +694,19 @@ class CursorUseResultMixIn(object):
 
     _defer_warnings = True
 
-    def _get_result(self): return self._get_db().use_result()
+    #: Number of rows which iterating over the cursor fetches from the
+    #: server at once, see :meth:`iter_chunks`.
+    chunk_size = 1000
+
+    #: If set, iterating over the cursor never holds chunks of more than
+    #: this many bytes, see :meth:`iter_chunks`.
+    chunk_bytes = None
+
+    _iterator = None
+
+    def _get_result(self):
+        self._iterator = None
+        return self._get_db().use_result()
 
     def fetchone(self):
         """Fetches a single row from the cursor."""
@@ -510,8 +736,88 @@ class CursorUseResultMixIn(object):
         self._warning_check()
         return r
 
+    def iter_chunks(self, size=None, max_bytes=None):
+        """Yields the remaining rows as lists of up to size rows
+        (chunk_size if not given).
+
+        Rows are only read from the server when the next chunk is
+        requested, so a slow consumer holds back the server instead of
+        piling up rows in memory.
+
+        If max_bytes is set, every row is measured as it is fetched
+        and a chunk is yielded before it would exceed max_bytes bytes
+        of memory. Only a single row which is larger than max_bytes by
+        itself is yielded as a chunk of its own anyway. The number of
+        rows fetched at once is derived from the average size of the
+        rows so far; rows which don't fit into the current chunk are
+        kept for the next one.
+
+        Besides the chunk it fills, the iterator only holds the rows
+        of the last fetch it hasn't placed yet. The loop variable of
+        ``for chunk in cursor.iter_chunks(...)`` still refers to the
+        previous chunk while the next one is filled, which peaks at
+        about twice max_bytes; ``del chunk`` at the end of the loop
+        body avoids that. Iterating over the cursor does so already."""
+        self._check_executed()
+        limit = size or self.chunk_size
+        if not max_bytes:
+            while True:
+                rows = [list(self.fetchmany(limit))]
+                if not rows[0]:
+                    return
+                yield rows.pop()
+
+        chunk = []
+        used = 0
+        seen_rows = seen_bytes = 0
+        while True:
+            if not seen_rows:
+                n = 1
+            else:
+                # as many rows of the average size as still fit
+                n = max(1, min(limit - len(chunk),
+                               (max_bytes - used) * seen_rows // seen_bytes))
+            rows = list(self.fetchmany(n))
+            if not rows:
+                if chunk:
+                    yield chunk
+                return
+            # rows are popped, so the ones already yielded in a chunk
+            # don't stay alive until the whole fetch has been placed
+            rows.reverse()
+            while rows:
+                row = rows.pop()
+                row_size = _get_row_size(row)
+                seen_rows += 1
+                seen_bytes += row_size
+                if chunk and used + row_size > max_bytes:
+                    # handed out by pop(), so this frame doesn't keep
+                    # the chunk alive while it's suspended
+                    chunk = [chunk]
+                    yield chunk.pop()
+                    used = 0
+                chunk.append(row)
+                used += row_size
+                if len(chunk) >= limit:
+                    chunk = [chunk]
+                    yield chunk.pop()
+                    used = 0
+
     def __iter__(self):
-        return self
+        # rows are read ahead in chunks, so every iterator over the
+        # same result set has to share that buffer. Don't mix
+        # iterating with the fetch methods, they bypass it.
+        if self._iterator is None:
+            self._iterator = self._iter_rows()
+        return self._iterator
+
+    def _iter_rows(self):
+        for rows in self.iter_chunks(self.chunk_size, self.chunk_bytes):
+            # release the rows as they are yielded, so the chunk is
+            # empty when the next one is fetched
+            rows.reverse()
+            while rows:
+                yield rows.pop()
 
     def next(self):
         row = self.fetchone()
@@ -522,6 +828,16 @@ class CursorUseResultMixIn(object):
     __next__ = next
 
 
+def _get_row_size(row):
+    """Returns the memory a row takes, including its values."""
+    total = sys.getsizeof(row)
+    if isinstance(row, dict):
+        row = row.values()
+    for value in row:
+        total += sys.getsizeof(value)
+    return total
+
+
 class CursorTupleRowsMixIn(object):
     """This is a MixIn class that causes all rows to be returned as tuples,
     which is the standard form required by DB API."""
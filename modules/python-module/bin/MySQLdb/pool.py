@@ -0,0 +1,408 @@
+"""MySQLdb Connection Pool
+
+This module implements a thread-safe pool of Connection objects.
+MySQLdb connections must not be shared between threads
+(threadsafety = 1), but they can be handed from one thread to the
+next. The pool keeps a bounded number of open connections and lends
+each of them to one thread at a time, so a request only pays for the
+TCP connect, the authentication and set_character_set() once per
+connection instead of once per request::
+
+    from MySQLdb.pool import Pool
+
+    pool = Pool(host="localhost", user="orange", passwd="...", db="orange",
+                charset="utf8mb4", min_size=1, max_size=8)
+
+    with pool.connection() as conn:
+        cur = conn.cursor()
+        cur.execute("SELECT money FROM players WHERE name = %s", (name,))
+
+Connections are checked before they are lent out (ping, age) and the
+session state (open transaction, autocommit, character set, sql_mode)
+is reset when they are given back. Connections of the pool keep track
+of the statements they run, so the reset only costs a round-trip if a
+transaction may be open or the session was changed with SET.
+"""
+import re
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+from MySQLdb import connections
+from _mysql_exceptions import Error, InterfaceError, OperationalError
+
+try:
+    _monotonic = time.monotonic
+except AttributeError:
+    _monotonic = time.time
+
+
+RE_FIRST_WORD = re.compile(br"\s*([A-Za-z]+)")
+
+
+class PoolError(InterfaceError):
+    """Exception raised if the pool is closed or no connection could be
+    checked out in time."""
+
+
+class PooledConnectionMixIn(object):
+    """This is a MixIn class which keeps track of what Pool has to reset
+    when the connection is given back: whether a transaction may be
+    open and whether the session was changed by a SET statement (e.g.
+    set_sql_mode()). Session changes made in other ways, e.g. in stored
+    procedures or multi-statement queries, aren't noticed."""
+
+    _in_transaction = False
+    _session_changed = False
+
+    def query(self, query):
+        match = RE_FIRST_WORD.match(
+            query[:64] if isinstance(query, (bytes, bytearray))
+            else query[:64].encode('ascii', 'replace'))
+        word = match.group(1).upper() if match else b''
+        if word == b'SET':
+            self._session_changed = True
+        elif word in (b'BEGIN', b'START') or not self.get_autocommit():
+            self._in_transaction = True
+        super(PooledConnectionMixIn, self).query(query)
+
+    def commit(self):
+        super(PooledConnectionMixIn, self).commit()
+        self._in_transaction = False
+
+    def rollback(self):
+        super(PooledConnectionMixIn, self).rollback()
+        self._in_transaction = False
+
+    def autocommit(self, on):
+        super(PooledConnectionMixIn, self).autocommit(on)
+        if on:
+            # switching autocommit on commits an open transaction
+            self._in_transaction = False
+
+
+class PooledConnection(PooledConnectionMixIn, connections.Connection):
+    """Connection class used by Pool."""
+
+
+class Pool(object):
+    """Thread-safe pool of MySQLdb connections.
+
+    Idle connections are kept as a stack, so the most recently used
+    connection is lent out first and rarely used connections sink to
+    the bottom, where they get closed after max_idle seconds.
+    """
+
+    #: Class used to create new connections. Classes without
+    #: PooledConnectionMixIn are fully reset every time.
+    connection_class = PooledConnection
+
+    def __init__(self, min_size=0, max_size=10, timeout=None,
+                 ping_interval=0.0, max_idle=300.0, max_age=3600.0,
+                 reset=True, **kwargs):
+        """
+        Create a connection pool. All keyword arguments which aren't
+        listed here are passed on to connect().
+
+        :param int min_size:        connections which are kept open,
+            even if they are idle
+        :param int max_size:        maximum number of open connections
+        :param float timeout:       seconds to wait for a free
+            connection before PoolError is raised (None waits forever)
+        :param float ping_interval: connections which have been idle
+            for longer than this are pinged before they are lent out
+            (None disables pinging)
+        :param float max_idle:      idle connections above min_size are
+            closed after this many seconds (None keeps them open); if
+            ping_interval is None, the ones kept open are replaced
+            instead of being lent out after that time
+        :param float max_age:       connections are replaced after this
+            many seconds (None keeps them forever)
+        :param bool reset:          if set, open transactions are rolled
+            back and autocommit, charset and sql_mode are restored when a
+            connection is given back (as far as they may have changed)
+        """
+        if max_size < 1 or min_size < 0 or min_size > max_size:
+            raise ValueError("invalid pool size: min_size=%r, max_size=%r"
+                             % (min_size, max_size))
+
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.ping_interval = ping_interval
+        self.max_idle = max_idle
+        self.max_age = max_age
+        self.reset = reset
+        self.kwargs = kwargs
+
+        self._autocommit = kwargs.get('autocommit', False)
+        self._sql_mode = kwargs.get('sql_mode')
+        self._charset = None
+
+        self._lock = threading.Condition(threading.Lock())
+        self._idle = deque()    # (connection, time it was given back)
+        self._created = {}      # connection -> time it was created
+        self._lent = set()      # connections which are checked out
+        self._size = 0          # open connections, including reserved ones
+        self._closed = False
+
+        conns = [self.acquire() for i in range(min_size)]
+        for conn in conns:
+            self.release(conn)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc, value, tb):
+        self.close()
+
+    @property
+    def size(self):
+        """Number of open connections."""
+        return self._size
+
+    @property
+    def idle(self):
+        """Number of open connections which aren't lent out."""
+        return len(self._idle)
+
+    def acquire(self, timeout=None):
+        """
+        Check out a connection. It has to be given back with release(),
+        or use connection() which does that for you.
+
+        :param float timeout: overrides the timeout of the pool
+
+        :raises PoolError: the pool is closed or no connection became
+            free in time
+        """
+        if timeout is None:
+            timeout = self.timeout
+        deadline = None if timeout is None else _monotonic() + timeout
+
+        # a pool which went idle is only cleaned up here
+        with self._lock:
+            evicted = self._evict()
+        for conn in evicted:
+            _close(conn)
+
+        while True:
+            conn, since = self._checkout(deadline, timeout)
+
+            if conn is None:
+                # a free slot was reserved for us
+                try:
+                    return self._connect()
+                except BaseException:
+                    self._forget(None)
+                    raise
+
+            if self._check(conn, since):
+                with self._lock:
+                    self._lent.add(conn)
+                return conn
+
+            self._discard(conn)
+
+    def release(self, conn, discard=False):
+        """
+        Give a connection back to the pool.
+
+        :param conn:            connection returned by acquire()
+        :param bool discard:    if set, the connection is closed instead
+            of being reused, e.g. after it raised an OperationalError
+
+        :raises PoolError: the connection isn't checked out from this
+            pool, e.g. because it was released already
+        """
+        with self._lock:
+            if conn not in self._lent:
+                if conn in self._created:
+                    raise PoolError("connection was released already")
+                raise PoolError("connection doesn't belong to this pool")
+            self._lent.remove(conn)
+
+        if not discard and self._closed:
+            discard = True
+
+        if not discard and self.max_age is not None and \
+                _monotonic() - self._created[conn] > self.max_age:
+            discard = True
+
+        if not discard and self.reset:
+            try:
+                self._reset(conn)
+            except Error:
+                discard = True
+
+        if discard:
+            self._discard(conn)
+            return
+
+        with self._lock:
+            self._idle.append((conn, _monotonic()))
+            evicted = self._evict()
+            self._lock.notify()
+
+        for conn in evicted:
+            _close(conn)
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """
+        Check out a connection for the duration of a with block.
+
+        The connection is closed instead of being reused if the block
+        raises an OperationalError or InterfaceError, since it may be
+        broken. Transactions aren't committed automatically.
+
+        :param float timeout: overrides the timeout of the pool
+        """
+        conn = self.acquire(timeout)
+
+        try:
+            yield conn
+        except (OperationalError, InterfaceError):
+            self.release(conn, discard=True)
+            raise
+        except BaseException:
+            self.release(conn)
+            raise
+        else:
+            self.release(conn)
+
+    def close(self):
+        """
+        Close all idle connections. Connections which are lent out are
+        closed as soon as they are given back.
+        """
+        with self._lock:
+            self._closed = True
+            idle = [conn for conn, since in self._idle]
+            self._idle.clear()
+            self._lock.notify_all()
+
+        for conn in idle:
+            self._discard(conn)
+
+    def _checkout(self, deadline, timeout):
+        with self._lock:
+            while True:
+                if self._closed:
+                    raise PoolError("pool is closed")
+
+                if self._idle:
+                    return self._idle.pop()
+
+                if self._size < self.max_size:
+                    self._size += 1
+                    return None, None
+
+                if deadline is None:
+                    self._lock.wait()
+                else:
+                    remaining = deadline - _monotonic()
+                    if remaining <= 0:
+                        raise PoolError(
+                            "no connection available within %.3f seconds"
+                            % timeout)
+                    self._lock.wait(remaining)
+
+    def _connect(self):
+        conn = self.connection_class(**self.kwargs)
+
+        try:
+            if self._charset is None:
+                self._charset = conn.character_set_name()
+            if self.reset and self._sql_mode is None:
+                # remember the server default, so it can be restored
+                conn.query("SELECT @@SESSION.sql_mode")
+                sql_mode = conn.store_result().fetch_row()[0][0]
+                if isinstance(sql_mode, bytes):
+                    sql_mode = sql_mode.decode('ascii')
+                self._sql_mode = sql_mode
+        except BaseException:
+            _close(conn)
+            raise
+
+        if isinstance(conn, PooledConnectionMixIn):
+            conn._in_transaction = conn._session_changed = False
+
+        with self._lock:
+            self._created[conn] = _monotonic()
+            self._lent.add(conn)
+        return conn
+
+    def _check(self, conn, since):
+        now = _monotonic()
+
+        if self.max_age is not None and now - self._created[conn] > self.max_age:
+            return False
+
+        if self.ping_interval is not None:
+            if now - since >= self.ping_interval:
+                try:
+                    conn.ping()
+                except Error:
+                    return False
+        elif self.max_idle is not None and now - since > self.max_idle:
+            # without pinging, assume the server has timed it out
+            return False
+
+        return True
+
+    def _reset(self, conn):
+        # autocommit and the charset are compared without a round-trip
+        tracked = isinstance(conn, PooledConnectionMixIn)
+        if conn._transactional:
+            if not tracked or conn._in_transaction:
+                conn.rollback()
+            if self._autocommit is not None:
+                conn.autocommit(self._autocommit)
+        if conn.character_set_name() != self._charset:
+            conn.set_character_set(self._charset)
+        if self._sql_mode is not None and \
+                (not tracked or conn._session_changed):
+            conn.set_sql_mode(self._sql_mode)
+        if tracked:
+            conn._in_transaction = conn._session_changed = False
+
+    def _evict(self):
+        # called with the lock held; the oldest idle connections are at the
+        # left. Returns the evicted connections, which have to be closed
+        # after the lock is released.
+        evicted = []
+        if self.max_idle is None:
+            return evicted
+
+        limit = _monotonic() - self.max_idle
+
+        while self._idle and self._size > self.min_size and self._idle[0][1] < limit:
+            conn = self._idle.popleft()[0]
+            self._forget(conn, locked=True)
+            evicted.append(conn)
+
+        return evicted
+
+    def _discard(self, conn):
+        self._forget(conn)
+        _close(conn)
+
+    def _forget(self, conn, locked=False):
+        if not locked:
+            with self._lock:
+                return self._forget(conn, locked=True)
+
+        if conn is not None:
+            self._created.pop(conn, None)
+            self._lent.discard(conn)
+        self._size -= 1
+        self._lock.notify()
+
+
+def _close(conn):
+    try:
+        conn.close()
+    except Error:
+        pass
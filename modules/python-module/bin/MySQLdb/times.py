@@ -16,6 +16,17 @@ Timestamp = datetime
 DateTimeDeltaType = timedelta
 DateTimeType = datetime
 
+try:
+    # Python 3.7+, parses the fixed-width formats MySQL returns in C
+    _datetime_fromisoformat = datetime.fromisoformat
+    _date_fromisoformat = date.fromisoformat
+except AttributeError:
+    _datetime_fromisoformat = _date_fromisoformat = None
+
+#: Maximum number of values :func:`CachedDate_or_None` keeps.
+DATE_CACHE_SIZE = 4096
+_date_cache = {}
+
 def DateFromTicks(ticks):
     """Convert UNIX ticks into a date instance."""
     return date(*localtime(ticks)[:3])
@@ -48,6 +59,20 @@ def format_TIMESTAMP(d):
 
 
 def DateTime_or_None(s):
+    # fast paths for 'YYYY-MM-DD HH:MM:SS' and 'YYYY-MM-DD HH:MM:SS.ffffff'
+    if len(s) in (19, 26):
+        try:
+            if _datetime_fromisoformat is not None and s[10] == ' ':
+                return _datetime_fromisoformat(s)
+            if len(s) == 19:
+                return datetime(int(s[:4]), int(s[5:7]), int(s[8:10]),
+                                int(s[11:13]), int(s[14:16]), int(s[17:19]))
+        except ValueError:
+            return None
+        except TypeError:
+            # bytes, handled below
+            pass
+
     try:
         if len(s) < 11:
             return Date_or_None(s)
@@ -76,6 +101,13 @@ def DateTime_or_None(s):
         return None
 
 def TimeDelta_or_None(s):
+    # fast path for 'HH:MM:SS'
+    if len(s) == 8 and s[2:3] == ':' and s[5:6] == ':' and s[0:1] != '-':
+        try:
+            return timedelta(0, int(s[:2]) * 3600 + int(s[3:5]) * 60 + int(s[6:8]))
+        except ValueError:
+            return None
+
     try:
         h, m, s = s.split(':')
         if '.' in s:
@@ -99,6 +131,13 @@ def TimeDelta_or_None(s):
         return None
 
 def Time_or_None(s):
+    # fast path for 'HH:MM:SS'
+    if len(s) == 8 and s[2:3] == ':' and s[5:6] == ':':
+        try:
+            return time(int(s[:2]), int(s[3:5]), int(s[6:8]))
+        except ValueError:
+            return None
+
     try:
         h, m, s = s.split(':')
         if '.' in s:
@@ -114,6 +153,12 @@ def Time_or_None(s):
 
 def Date_or_None(s):
     try:
+        if _date_fromisoformat is not None and len(s) == 10:
+            try:
+                return _date_fromisoformat(s)
+            except TypeError:
+                # bytes, handled below
+                pass
         return date(
             int(s[:4]),    # year
             int(s[5:7]),   # month
@@ -122,6 +167,19 @@ def Date_or_None(s):
     except ValueError:
         return None
 
+def CachedDate_or_None(s):
+    """Like Date_or_None(), but keeps the converted values, which pays
+    off for DATE columns with few distinct values (e.g. per-day logs).
+    Not used by default, put it into the conversions for FIELD_TYPE.DATE
+    to enable it."""
+    try:
+        return _date_cache[s]
+    except KeyError:
+        if len(_date_cache) >= DATE_CACHE_SIZE:
+            _date_cache.clear()
+        value = _date_cache[s] = Date_or_None(s)
+        return value
+
 def DateTime2literal(d, c):
     """Format a DateTime object as an ISO timestamp."""
     return string_literal(format_TIMESTAMP(d), c)
@@ -135,11 +193,8 @@ def mysql_timestamp_converter(s):
     # MySQL>4.1 returns TIMESTAMP in the same format as DATETIME
     if s[4] == '-': return DateTime_or_None(s)
     s = s + "0"*(14-len(s)) # padding
-    parts = map(int, filter(None, (s[:4],s[4:6],s[6:8],
-                                   s[8:10],s[10:12],s[12:14])))
     try:
-        return Timestamp(*parts)
-    except (SystemExit, KeyboardInterrupt):
-        raise  # pragma: no cover
-    except:
+        return Timestamp(int(s[:4]), int(s[4:6]), int(s[6:8]),
+                         int(s[8:10]), int(s[10:12]), int(s[12:14]))
+    except (ValueError, OverflowError):
         return None
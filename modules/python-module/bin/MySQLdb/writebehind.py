@@ -0,0 +1,362 @@
+"""MySQLdb Write-Behind Queue
+
+This module implements WriteBehind, which takes writes off the thread
+that issues them. Event handlers submit their statements and return at
+once; a background thread collects them for flush_interval seconds and
+sends them with executemany(), so a burst of writes costs a few bulk
+statements instead of one round trip each::
+
+    from MySQLdb.writebehind import WriteBehind
+
+    writer = WriteBehind(host="localhost", user="orange", passwd="...",
+                         db="orange", flush_interval=0.5)
+
+    def onMoneyChange(player, money):
+        writer.submit("UPDATE players SET money = %s WHERE name = %s",
+                      (money, player.getName()), key=player.getName())
+
+    writer.close()  # flushes what is left
+
+Writes which are submitted with the same query and key during one flush
+window are coalesced, only the last args are written. The statements of
+a window are sent grouped by query, in the order each query was first
+submitted, and every group is committed as a transaction of its own.
+Don't rely on writes of different queries being done in the order they
+were submitted.
+
+If a group fails with an OperationalError (lost connection, deadlock,
+lock wait timeout), the transaction is rolled back, the connection is
+replaced and the group is retried with exponential backoff. Groups
+which fail for good, or with any other exception, are handed to
+on_error and counted as failed.
+
+The connection is either the writer's own, created from the keyword
+arguments, or borrowed from a MySQLdb.pool.Pool for each group.
+"""
+import itertools
+import threading
+import time
+import warnings
+from collections import OrderedDict
+
+from MySQLdb import connections
+from _mysql_exceptions import Error, InterfaceError, OperationalError
+
+try:
+    _monotonic = time.monotonic
+except AttributeError:
+    _monotonic = time.time
+
+
+class WriteBehind(object):
+    """Queue of writes which are done in batches by a background thread.
+
+    stats() returns these metrics:
+
+        depth           writes waiting for the next flush
+        submitted       writes submitted
+        coalesced       writes replaced by a later one with the same key
+        written         writes done
+        failed          writes given up on
+        retries         groups retried after an OperationalError
+        flushes         flushes done
+        last_latency    seconds from the submission of the oldest write
+                        of the last flush until it was done
+        max_latency     the maximum of last_latency
+        last_duration   seconds the last flush took
+    """
+
+    #: Class used to create the writer's own connection.
+    connection_class = connections.Connection
+
+    def __init__(self, pool=None, flush_interval=0.5, batch_size=1000,
+                 retries=5, backoff=0.1, max_backoff=5.0, on_error=None,
+                 **kwargs):
+        """
+        Create a writer and start its thread. All keyword arguments
+        which aren't listed here are passed on to connect().
+
+        :param pool:                MySQLdb.pool.Pool to borrow
+            connections from, instead of opening one
+        :param float flush_interval: seconds writes are collected
+            before they are flushed
+        :param int batch_size:      maximum number of rows passed to one
+            executemany() call; reaching it also flushes early
+        :param int retries:         how often a group is retried after an
+            OperationalError
+        :param float backoff:       seconds to wait before the first
+            retry, doubled for every further one
+        :param float max_backoff:   maximum seconds to wait between
+            retries
+        :param on_error:            called as on_error(exc, query, rows)
+            for every group which couldn't be written; defaults to
+            issuing a RuntimeWarning
+        """
+        self.pool = pool
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.on_error = on_error
+        self.kwargs = kwargs
+
+        self.depth = 0
+        self.submitted = 0
+        self.coalesced = 0
+        self.written = 0
+        self.failed = 0
+        self.retries_done = 0
+        self.flushes = 0
+        self.last_latency = 0.0
+        self.max_latency = 0.0
+        self.last_duration = 0.0
+
+        self._lock = threading.Condition(threading.Lock())
+        self._pending = OrderedDict()   # query -> OrderedDict(key -> args)
+        self._first = None              # time the oldest pending write came in
+        self._counter = itertools.count()
+        self._seq = 0                   # number of the last submitted write
+        self._done = 0                  # number of the last flushed write
+        self._flush_requested = False
+        self._closing = False
+        self._conn = None
+
+        self._thread = threading.Thread(target=self._run,
+                                        name="MySQLdb write-behind")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc, value, tb):
+        self.close()
+
+    def submit(self, query, args=None, key=None):
+        """
+        Queue a write.
+
+        :param query:   query to execute, with placeholders like for
+            Cursor.execute()
+        :param args:    sequence or mapping of parameters
+        :param key:     hashable key of the written row; a pending write
+            with the same query and key is replaced by this one
+
+        :raises InterfaceError: the writer is closed or its thread died
+        """
+        with self._lock:
+            if self._closing:
+                raise InterfaceError("write-behind queue is closed")
+            if not self._thread.is_alive():
+                raise InterfaceError("write-behind thread has died")
+
+            group = self._pending.get(query)
+            if group is None:
+                group = self._pending[query] = OrderedDict()
+
+            if key is None:
+                key = next(self._counter)
+            else:
+                # keeps user keys apart from the counter's
+                key = (key,)
+                if key in group:
+                    # move it to the end, so it is written in the right order
+                    del group[key]
+                    self.coalesced += 1
+                    self.depth -= 1
+
+            group[key] = args
+            self.depth += 1
+            self.submitted += 1
+            self._seq += 1
+
+            if self._first is None:
+                self._first = _monotonic()
+                self._lock.notify_all()
+            elif self.depth >= self.batch_size:
+                self._lock.notify_all()
+
+    def flush(self, timeout=None):
+        """
+        Flush the pending writes now and wait until they are done.
+
+        :param float timeout: seconds to wait at most (None waits forever)
+        :returns: True if all writes submitted before the call are done
+        """
+        deadline = None if timeout is None else _monotonic() + timeout
+        with self._lock:
+            target = self._seq
+            self._flush_requested = True
+            self._lock.notify_all()
+            while self._done < target:
+                if not self._thread.is_alive():
+                    return False
+                if deadline is None:
+                    self._lock.wait()
+                else:
+                    remaining = deadline - _monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._lock.wait(remaining)
+            return True
+
+    def close(self, timeout=None):
+        """
+        Flush the pending writes, stop the thread and close the
+        connection. Further calls of submit() raise InterfaceError.
+
+        :param float timeout: seconds to wait for the thread at most
+        :returns: True if the thread has stopped
+        """
+        with self._lock:
+            self._closing = True
+            self._lock.notify_all()
+        self._thread.join(timeout)
+        if self._thread.is_alive():
+            return False
+        if self._conn is not None:
+            _close(self._conn)
+            self._conn = None
+        return True
+
+    def stats(self):
+        """Returns the metrics as a dictionary."""
+        with self._lock:
+            return {
+                'depth': self.depth,
+                'submitted': self.submitted,
+                'coalesced': self.coalesced,
+                'written': self.written,
+                'failed': self.failed,
+                'retries': self.retries_done,
+                'flushes': self.flushes,
+                'last_latency': self.last_latency,
+                'max_latency': self.max_latency,
+                'last_duration': self.last_duration,
+            }
+
+    def _run(self):
+        while True:
+            with self._lock:
+                while True:
+                    if self._first is not None:
+                        wait = self._first + self.flush_interval - _monotonic()
+                        if wait <= 0 or self._flush_requested or self._closing or \
+                                self.depth >= self.batch_size:
+                            break
+                    elif self._closing:
+                        self._done = self._seq
+                        self._lock.notify_all()
+                        return
+                    else:
+                        wait = None
+                        if self._flush_requested:
+                            self._flush_requested = False
+                            self._done = self._seq
+                            self._lock.notify_all()
+                    self._lock.wait(wait)
+
+                pending, self._pending = self._pending, OrderedDict()
+                first, self._first = self._first, None
+                target = self._seq
+                self.depth = 0
+                self._flush_requested = False
+
+            start = _monotonic()
+            written = failed = 0
+            for query, group in pending.items():
+                rows = list(group.values())
+                if self._write(query, rows):
+                    written += len(rows)
+                else:
+                    failed += len(rows)
+            end = _monotonic()
+
+            with self._lock:
+                self.written += written
+                self.failed += failed
+                self.flushes += 1
+                self.last_latency = end - first
+                self.max_latency = max(self.max_latency, self.last_latency)
+                self.last_duration = end - start
+                self._done = target
+                self._lock.notify_all()
+
+    def _write(self, query, rows):
+        delay = self.backoff
+        attempt = 0
+        while True:
+            try:
+                self._execute(query, rows)
+                return True
+            except OperationalError as e:
+                if attempt >= self.retries:
+                    self._report(e, query, rows)
+                    return False
+            except Exception as e:
+                # also errors which aren't the server's, like a missing
+                # placeholder in args, must not kill the thread
+                self._report(e, query, rows)
+                return False
+            attempt += 1
+            with self._lock:
+                self.retries_done += 1
+            time.sleep(delay)
+            delay = min(delay * 2, self.max_backoff)
+
+    def _execute(self, query, rows):
+        conn = self._acquire()
+        try:
+            cursor = conn.cursor()
+            try:
+                for i in range(0, len(rows), self.batch_size):
+                    cursor.executemany(query, rows[i:i + self.batch_size])
+            finally:
+                cursor.close()
+            conn.commit()
+        except OperationalError:
+            # the connection may be broken, don't reuse it
+            self._release(conn, discard=True)
+            raise
+        except BaseException:
+            try:
+                conn.rollback()
+            except Error:
+                self._release(conn, discard=True)
+                raise
+            self._release(conn)
+            raise
+        self._release(conn)
+
+    def _acquire(self):
+        if self.pool is not None:
+            return self.pool.acquire()
+        if self._conn is None:
+            self._conn = self.connection_class(**self.kwargs)
+        return self._conn
+
+    def _release(self, conn, discard=False):
+        if self.pool is not None:
+            self.pool.release(conn, discard)
+        elif discard:
+            _close(conn)
+            self._conn = None
+
+    def _report(self, exc, query, rows):
+        if self.on_error is not None:
+            try:
+                self.on_error(exc, query, rows)
+            except Exception as e:
+                warnings.warn("write-behind on_error failed: %r" % (e,),
+                              RuntimeWarning)
+            return
+        warnings.warn("write-behind dropped %d rows of %r: %r"
+                      % (len(rows), query, exc), RuntimeWarning)
+
+
+def _close(conn):
+    try:
+        conn.close()
+    except Error:
+        pass
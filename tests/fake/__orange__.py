@@ -0,0 +1,58 @@
+"""Recording stand-in for the __orange__ module of the GTA Orange server, for the tests and benchmarks
+
+Every server function exists and records its call in `calls` as a tuple of its name and arguments. Create* functions
+return new ids, GetPlayerName returns the names set with SetPlayerName, getters of positions return (id, 2.0, 3.0) and
+other getters 1.0. Server events registered with AddServerEvent are kept in `events`, so they can be fired.
+
+Set `record` to False to stop recording, e.g. in benchmarks which measure memory.
+"""
+import itertools
+import sys
+
+
+class _Orange():
+
+    def __init__(self):
+        self.calls = []
+        self.record = True
+        self.events = {}
+        self.names = {}
+        self._ids = itertools.count(1)
+
+    def __getattr__(self, name):
+        if name.startswith("__"):
+            raise AttributeError(name)
+
+        def native(*args):
+            if self.record:
+                self.calls.append((name,) + args)
+            return self._result(name, args)
+
+        native.__name__ = name
+        return native
+
+    def reset(self):
+        """Forgets the recorded calls.
+        """
+        del self.calls[:]
+
+    def AddServerEvent(self, cb, name):
+        self.events[name] = cb
+
+    def _result(self, name, args):
+        if name.startswith("Create"):
+            return next(self._ids)
+        if name == "GetPlayerName":
+            return self.names.get(args[0], "player%d" % args[0])
+        if name == "SetPlayerName":
+            self.names[args[0]] = args[1]
+        if name.startswith("Get") and (name.endswith("Position") or name.endswith("Rotation") or
+                                       name == "GetBlipCoords"):
+            return (float(args[0]), 2.0, 3.0)
+        if name.startswith("Get"):
+            return 1.0
+        return True
+
+
+# an instance instead of the module, since module level __getattr__ needs Python 3.7
+sys.modules[__name__] = _Orange()
@@ -0,0 +1,201 @@
+"""Integration tests of MySQLdb.aio, they need a MySQL server
+
+The server is given by the MYSQL_HOST, MYSQL_PORT, MYSQL_USER, MYSQL_PASSWORD and MYSQL_DB environment variables (the
+same as for the benchmarks in bench/), the tests are skipped if none of them is set. Only temporary tables are used.
+"""
+import asyncio
+import os
+import sys
+import time
+import unittest
+from unittest import mock
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_ROOT, "modules", "python-module", "bin")]
+
+_KWARGS = {"charset": "utf8mb4"}
+
+for _key, _name in (("host", "MYSQL_HOST"), ("user", "MYSQL_USER"), ("passwd", "MYSQL_PASSWORD"),
+                    ("db", "MYSQL_DB"), ("port", "MYSQL_PORT")):
+    if _name in os.environ:
+        _KWARGS[_key] = int(os.environ[_name]) if _key == "port" else os.environ[_name]
+
+if len(_KWARGS) == 1:
+    raise unittest.SkipTest("no MySQL server given, set MYSQL_HOST etc.")
+
+try:
+    import MySQLdb
+    from MySQLdb import aio
+except ImportError:
+    # the _mysql extension in bin/ is built for Windows
+    raise unittest.SkipTest("MySQLdb needs the _mysql extension")
+
+SLEEP = 0.5
+
+
+class AsyncTest(unittest.TestCase):
+
+    def setUp(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.connections = []
+
+    def tearDown(self):
+        for conn in self.connections:
+            try:
+                conn.close()
+            except MySQLdb.Error:
+                pass
+
+        self.loop.close()
+        asyncio.set_event_loop(None)
+
+    def wait(self, coro):
+        return self.loop.run_until_complete(coro)
+
+    async def connect(self):
+        conn = await aio.connect(**_KWARGS)
+        self.connections.append(conn)
+        return conn
+
+    async def fetch(self, conn, query, args=None):
+        async with conn.cursor() as cur:
+            await cur.execute(query, args)
+            return await cur.fetchall()
+
+    def test_query_and_fetch(self):
+        async def test():
+            conn = await self.connect()
+            cur = conn.cursor()
+
+            self.assertEqual(await cur.execute("SELECT %s, %s", (1, "it's")), 1)
+            self.assertEqual(await cur.fetchone(), (1, "it's"))
+            self.assertIsNone(await cur.fetchone())
+
+            await cur.execute("SELECT 1 UNION ALL SELECT 2 UNION ALL SELECT 3 UNION ALL SELECT 4")
+            self.assertEqual(cur.rowcount, 4)
+            self.assertEqual(await cur.fetchmany(2), ((1,), (2,)))
+            self.assertEqual([row async for row in cur], [(3,), (4,)])
+            self.assertEqual(await cur.fetchall(), ())
+
+            cur = conn.cursor(aio.AsyncDictCursor)
+            await cur.execute("SELECT %(name)s AS name", {"name": "orange"})
+            self.assertEqual(await cur.fetchall(), ({"name": "orange"},))
+
+        self.wait(test())
+
+    def test_errors(self):
+        async def test():
+            conn = await self.connect()
+
+            with self.assertRaises(MySQLdb.ProgrammingError):
+                await self.fetch(conn, "SELECT * FROM no_such_table_at_all")
+
+            # the connection is still usable
+            self.assertEqual(await self.fetch(conn, "SELECT 1"), ((1,),))
+
+        self.wait(test())
+
+    def test_queries_run_concurrently(self):
+        async def test():
+            conns = [await self.connect() for i in range(4)]
+            start = time.monotonic()
+
+            rows = await asyncio.gather(*[self.fetch(conn, "SELECT SLEEP(%s), %s", (SLEEP, i))
+                                          for i, conn in enumerate(conns)])
+
+            self.assertLess(time.monotonic() - start, 2 * SLEEP)
+            self.assertEqual(rows, [((0, i),) for i in range(4)])
+
+        self.wait(test())
+
+    def test_queries_on_one_connection_are_queued(self):
+        async def test():
+            conn = await self.connect()
+
+            rows = await asyncio.gather(*[self.fetch(conn, "SELECT %s", (i,)) for i in range(10)])
+
+            self.assertEqual(rows, [((i,),) for i in range(10)])
+
+        self.wait(test())
+
+    def test_executemany_and_transactions(self):
+        async def test():
+            conn = await self.connect()
+            cur = conn.cursor()
+            await cur.execute("CREATE TEMPORARY TABLE aio_players (id INT PRIMARY KEY, money INT) ENGINE=InnoDB")
+
+            self.assertEqual(await cur.executemany("INSERT INTO aio_players (id, money) VALUES (%s, %s)",
+                                                   [(i, 0) for i in range(100)]), 100)
+            self.assertEqual(await cur.executemany("UPDATE aio_players SET money = %s WHERE id = %s",
+                                                   [(10, i) for i in range(0, 100, 2)]), 50)
+            await conn.commit()
+
+            await conn.autocommit(False)
+            await cur.execute("DELETE FROM aio_players")
+            await conn.rollback()
+
+            self.assertEqual(await self.fetch(conn, "SELECT COUNT(*), SUM(money) FROM aio_players"), ((100, 500),))
+
+        self.wait(test())
+
+    def test_result_sets_are_read_in_the_executor(self):
+        async def test():
+            conn = await self.connect()
+            cur = conn.cursor()
+
+            with mock.patch.object(self.loop, "run_in_executor", wraps=self.loop.run_in_executor) as run:
+                await cur.execute("DO 1")
+                self.assertEqual(run.call_count, 0)
+
+                await cur.execute("SELECT 1")
+                self.assertEqual(run.call_count, 1)
+
+            self.assertEqual(await cur.fetchall(), ((1,),))
+
+        self.wait(test())
+
+    def test_cancel_closes_the_connection(self):
+        async def test():
+            conn = await self.connect()
+            task = self.loop.create_task(self.fetch(conn, "SELECT SLEEP(10)"))
+            await asyncio.sleep(SLEEP)
+            start = time.monotonic()
+            task.cancel()
+
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+            self.assertLess(time.monotonic() - start, SLEEP)
+
+            # the answer to the cancelled query would be read by the next one
+            with self.assertRaises(MySQLdb.Error):
+                conn.connection.ping()
+
+            # other connections aren't affected
+            self.assertEqual(await self.fetch(await self.connect(), "SELECT 1"), ((1,),))
+
+        self.wait(test())
+
+    def test_executor_fallback(self):
+        # like on loops without add_reader(), e.g. the ProactorEventLoop on Windows
+        async def test():
+            conns = [await self.connect() for i in range(3)]
+            start = time.monotonic()
+
+            with mock.patch.object(self.loop, "add_reader", side_effect=NotImplementedError):
+                rows = await asyncio.gather(*[self.fetch(conn, "SELECT SLEEP(%s), %s", (SLEEP, i))
+                                              for i, conn in enumerate(conns)])
+
+            self.assertLess(time.monotonic() - start, 2 * SLEEP)
+            self.assertEqual(rows, [((0, i),) for i in range(3)])
+            self.assertFalse(any(conn._selectable for conn in conns))
+
+            # stays in the executor
+            self.assertEqual(await self.fetch(conns[0], "SELECT 1"), ((1,),))
+
+        self.wait(test())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,116 @@
+"""Tests of GTAOrange.batch, run against the recording __orange__ stand-in in tests/fake"""
+import os
+import sys
+import unittest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_ROOT, "tests", "fake"), os.path.join(_ROOT, "modules", "python-module")]
+
+import __orange__
+from GTAOrange import batch, event, player, vehicle
+
+
+class BatchTest(unittest.TestCase):
+
+    def setUp(self):
+        self.players = [player.getByID(i) for i in range(1, 4)]
+        self.vehicle = vehicle.create("adder", 0.0, 0.0, 0.0, 0.0)
+        __orange__.reset()
+
+    def tearDown(self):
+        batch.flush()
+
+    def setters(self):
+        return [call for call in __orange__.calls if call[0].startswith("Set")]
+
+    def test_coalesces_per_entity_and_field(self):
+        with batch.collect() as current:
+            for i in range(10):
+                for p in self.players:
+                    p.setPosition(float(i), 0.0, 0.0)
+                    p.setHealth(100 + i)
+            self.vehicle.setColors(1, 2)
+            self.vehicle.setColors(3, 4)
+
+            self.assertEqual(__orange__.calls, [])
+
+        calls = self.setters()
+        keys = [(name, args[0]) for name, *args in calls]
+
+        self.assertEqual(len(keys), len(set(keys)))
+        self.assertEqual(len(calls), 2 * len(self.players) + 1)
+        self.assertEqual(current.coalesced, 9 * 2 * len(self.players) + 1)
+
+        for p in self.players:
+            self.assertIn(("SetPlayerPosition", p.id, 9.0, 0.0, 0.0), calls)
+            self.assertIn(("SetPlayerHealth", p.id, 109), calls)
+
+        self.assertIn(("SetVehicleColours", self.vehicle.id, 3, 4), calls)
+
+    def test_keeps_order_across_fields(self):
+        first, second = self.players[:2]
+
+        with batch.collect():
+            first.setPosition(1.0, 1.0, 1.0)
+            first.setHealth(50)
+            second.setPosition(2.0, 2.0, 2.0)
+            first.setHeading(90.0)
+            # replaces the first write, and moves to the end
+            first.setHealth(75)
+
+        self.assertEqual(self.setters(), [
+            ("SetPlayerPosition", first.id, 1.0, 1.0, 1.0),
+            ("SetPlayerPosition", second.id, 2.0, 2.0, 2.0),
+            ("SetPlayerHeading", first.id, 90.0),
+            ("SetPlayerHealth", first.id, 75),
+        ])
+
+    def test_messages_are_not_coalesced(self):
+        p = self.players[0]
+
+        with batch.collect():
+            p.sendNotification("a")
+            p.setHealth(10)
+            p.sendNotification("a")
+
+        self.assertEqual(__orange__.calls, [
+            ("SendPlayerNotification", p.id, "a"),
+            ("SetPlayerHealth", p.id, 10),
+            ("SendPlayerNotification", p.id, "a"),
+        ])
+
+    def test_nested_blocks_join_the_outer_batch(self):
+        p = self.players[0]
+
+        with batch.collect() as outer:
+            p.setHealth(1)
+
+            with batch.collect() as inner:
+                p.setHealth(2)
+
+            self.assertIs(inner, outer)
+            self.assertEqual(__orange__.calls, [])
+
+        self.assertEqual(__orange__.calls, [("SetPlayerHealth", p.id, 2)])
+
+    def test_outside_of_a_batch_calls_directly(self):
+        p = self.players[0]
+        p.setHealth(1)
+        p.setHealth(2)
+
+        self.assertEqual(__orange__.calls, [("SetPlayerHealth", p.id, 1), ("SetPlayerHealth", p.id, 2)])
+
+    def test_begin_flushes_on_the_next_event(self):
+        p = self.players[0]
+
+        batch.begin()
+        p.setArmour(10)
+        p.setArmour(20)
+        self.assertEqual(__orange__.calls, [])
+
+        event.drain()
+        self.assertEqual(__orange__.calls, [("SetPlayerArmour", p.id, 20)])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,291 @@
+"""Tests of MySQLdb.cache, run against a stub connection which numbers its answers, so cached results can be told
+from fresh ones"""
+import os
+import sys
+import unittest
+from unittest import mock
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_ROOT, "modules", "python-module", "bin")]
+
+try:
+    from MySQLdb import cache, connections
+except ImportError:
+    # the _mysql extension in bin/ is built for Windows
+    raise unittest.SkipTest("MySQLdb needs the _mysql extension")
+
+from _mysql_exceptions import OperationalError
+
+
+class _Clock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Result(object):
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def describe(self):
+        return (("answer", 3, None, None, None, None, 1),)
+
+    def field_flags(self):
+        return (0,)
+
+    def fetch_row(self, maxrows=1, how=0):
+        return self.rows
+
+
+class _Literal(object):
+    charset = "utf8"
+
+
+class _Connection(object):
+    """Stub of connections.Connection, every SELECT is answered with the number of queries so far, a query containing
+    FAIL raises OperationalError"""
+
+    errorhandler = connections.defaulterrorhandler
+    unicode_literal = _Literal()
+
+    def __init__(self):
+        self.messages = []
+        self.queries = []
+
+    def literal(self, o):
+        return "<%r>" % (o,)
+
+    def query(self, query):
+        self.queries.append(query)
+        if b"FAIL" in query:
+            raise OperationalError(1205, "Lock wait timeout exceeded")
+
+    def store_result(self):
+        if self.queries[-1].lstrip(b" (").upper().startswith(b"SELECT"):
+            return _Result(((len(self.queries),),))
+        return None
+
+    def affected_rows(self):
+        return 1
+
+    def insert_id(self):
+        return 0
+
+    def warning_count(self):
+        return 0
+
+    def next_result(self):
+        return -1
+
+
+class QueryCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.clock = _Clock()
+        patcher = mock.patch.object(cache, "_monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.cache = cache.QueryCache(max_entries=3, ttl=60.0)
+
+    def test_get_and_put(self):
+        self.assertIsNone(self.cache.get(b"a"))
+
+        self.cache.put(b"a", "result", frozenset(["players"]))
+
+        self.assertEqual(self.cache.get(b"a"), "result")
+        self.assertEqual(len(self.cache), 1)
+        self.assertEqual(self.cache.stats(), {"size": 1, "hits": 1, "misses": 1, "hit_ratio": 0.5,
+                                              "evictions": 0, "invalidations": 0})
+
+    def test_least_recently_used_is_evicted(self):
+        for key in (b"a", b"b", b"c"):
+            self.cache.put(key, key, frozenset())
+
+        self.cache.get(b"a")
+        self.cache.put(b"d", b"d", frozenset())
+
+        self.assertIsNone(self.cache.get(b"b"))
+        self.assertEqual([self.cache.get(key) for key in (b"a", b"c", b"d")], [b"a", b"c", b"d"])
+        self.assertEqual(self.cache.evictions, 1)
+
+    def test_ttl(self):
+        self.cache.put(b"a", "result", frozenset(["players"]))
+        self.clock.now += 60.0
+        self.assertEqual(self.cache.get(b"a"), "result")
+
+        self.clock.now += 0.1
+        self.assertIsNone(self.cache.get(b"a"))
+        self.assertEqual((len(self.cache), self.cache.evictions), (0, 1))
+        self.assertEqual(self.cache._tables, {})
+
+    def test_without_ttl(self):
+        self.cache.ttl = None
+        self.cache.put(b"a", "result", frozenset())
+        self.clock.now += 1e9
+
+        self.assertEqual(self.cache.get(b"a"), "result")
+
+    def test_disabled(self):
+        self.cache.max_entries = 0
+        self.cache.put(b"a", "result", frozenset())
+
+        self.assertIsNone(self.cache.get(b"a"))
+
+    def test_invalidate_tables(self):
+        self.cache.put(b"a", "a", frozenset(["players"]))
+        self.cache.put(b"b", "b", frozenset(["players", "vehicles"]))
+        self.cache.put(b"c", "c", frozenset(["vehicles"]))
+
+        self.cache.invalidate(["players"])
+
+        self.assertEqual([self.cache.get(key) for key in (b"a", b"b", b"c")], [None, None, "c"])
+        self.assertEqual(self.cache.invalidations, 2)
+        self.assertEqual(self.cache._tables, {"vehicles": set([b"c"])})
+
+    def test_invalidate_everything(self):
+        self.cache.put(b"a", "a", frozenset(["players"]))
+        self.cache.put(b"b", "b", frozenset())
+
+        self.cache.invalidate()
+
+        self.assertEqual(len(self.cache), 0)
+        self.assertEqual(self.cache.invalidations, 2)
+
+    def test_result_raced_by_a_write_is_not_cached(self):
+        tables = frozenset(["players"])
+
+        for invalidate in (["players"], None):
+            generation = self.cache.generation(tables)
+            # a write while the query runs
+            self.cache.invalidate(invalidate)
+            self.cache.put(b"a", "stale", tables, generation)
+
+            self.assertIsNone(self.cache.get(b"a"))
+
+        # writes to other tables don't matter
+        generation = self.cache.generation(tables)
+        self.cache.invalidate(["vehicles"])
+        self.cache.put(b"a", "fresh", tables, generation)
+        self.assertEqual(self.cache.get(b"a"), "fresh")
+
+    def test_clear(self):
+        self.cache.put(b"a", "a", frozenset(["players"]))
+        self.cache.get(b"a")
+
+        self.cache.clear()
+
+        self.assertEqual(self.cache.stats(), {"size": 0, "hits": 0, "misses": 0, "hit_ratio": 0.0,
+                                              "evictions": 0, "invalidations": 0})
+
+
+class TablesTest(unittest.TestCase):
+
+    def test_read_tables(self):
+        for query, tables in (
+                (b"SELECT * FROM players", ["players"]),
+                (b"select a from `db`.`Players` p, vehicles AS v where p.id = v.owner", ["players", "vehicles"]),
+                (b"SELECT * FROM players JOIN vehicles ON vehicles.owner = players.id LEFT JOIN houses USING (id)",
+                 ["players", "vehicles", "houses"]),
+                (b"SELECT * FROM players WHERE id IN (SELECT owner FROM vehicles)", ["players", "vehicles"]),
+                (b"SELECT 1", [])):
+            self.assertEqual(cache._get_read_tables(query), frozenset(tables), query)
+
+    def test_written_tables(self):
+        for query, tables in (
+                (b"INSERT INTO players VALUES (1)", set(["players"])),
+                (b"insert low_priority ignore into `db`.`Players` (id) VALUES (1)", set(["players"])),
+                (b"REPLACE players SET id = 1", set(["players"])),
+                (b"UPDATE IGNORE players SET money = 1", set(["players"])),
+                (b"DELETE QUICK FROM players WHERE id = 1", set(["players"])),
+                (b"UPDATE players, vehicles SET money = 1", None),
+                (b"UPDATE players JOIN vehicles ON owner = id SET money = 1", None),
+                (b"CREATE TABLE players (id INT)", None),
+                (b"CALL reset_players()", None)):
+            self.assertEqual(cache._get_written_tables(query), tables, query)
+
+
+class CachingCursorTest(unittest.TestCase):
+
+    def setUp(self):
+        self.db = _Connection()
+
+        class Cursor(cache.CachingCursor):
+            cache = self.cache = cache.QueryCache()
+
+        self.cursor = Cursor(self.db)
+
+    def select(self, query, args=None):
+        self.cursor.execute(query, args)
+        return self.cursor.fetchall()
+
+    def test_select_is_cached(self):
+        query = "SELECT money FROM players WHERE id = %s"
+        first = self.select(query, (1,))
+
+        self.assertEqual(self.select(query, (1,)), first)
+        self.assertEqual(self.cursor.rowcount, 1)
+        self.assertEqual(self.cursor.description[0][0], "answer")
+        self.assertEqual(len(self.db.queries), 1)
+
+        # other arguments are another query
+        self.assertNotEqual(self.select(query, (2,)), first)
+        self.assertEqual(len(self.db.queries), 2)
+
+    def test_whitespace_and_semicolon_are_ignored(self):
+        first = self.select("SELECT money FROM players")
+
+        self.assertEqual(self.select("  SELECT money FROM players ;"), first)
+
+    def test_write_invalidates_its_tables(self):
+        players = self.select("SELECT money FROM players")
+        vehicles = self.select("SELECT model FROM vehicles")
+
+        self.cursor.execute("UPDATE players SET money = %s WHERE id = %s", (1, 2))
+
+        self.assertNotEqual(self.select("SELECT money FROM players"), players)
+        self.assertEqual(self.select("SELECT model FROM vehicles"), vehicles)
+
+    def test_unknown_statement_invalidates_everything(self):
+        first = self.select("SELECT model FROM vehicles")
+        self.cursor.execute("CREATE TEMPORARY TABLE t (id INT)")
+
+        self.assertNotEqual(self.select("SELECT model FROM vehicles"), first)
+
+    def test_read_only_statements_keep_the_cache(self):
+        first = self.select("SELECT model FROM vehicles")
+        self.cursor.execute("SET @a = 1")
+        self.cursor.execute("SHOW TABLES")
+
+        self.assertEqual(self.select("SELECT model FROM vehicles"), first)
+
+    def test_failed_write_invalidates(self):
+        first = self.select("SELECT money FROM players")
+
+        with self.assertRaises(OperationalError):
+            self.cursor.execute("UPDATE players SET money = 1 WHERE name = 'FAIL'")
+
+        self.assertNotEqual(self.select("SELECT money FROM players"), first)
+
+    def test_uncacheable_selects(self):
+        for query in ("SELECT NOW()", "SELECT RAND() FROM players", "SELECT @a", "SELECT * FROM players FOR UPDATE",
+                      "SELECT * FROM players LOCK IN SHARE MODE", "SELECT SQL_NO_CACHE * FROM players",
+                      "SELECT id INTO @a FROM players", "SELECT UNIX_TIMESTAMP ( )"):
+            first = self.select(query)
+            self.assertNotEqual(self.select(query), first, query)
+
+        self.assertEqual(len(self.cache), 0)
+
+    def test_cached_rows_are_shared(self):
+        first = self.select("SELECT money FROM players")
+
+        self.assertIs(self.select("SELECT money FROM players"), first)
+        self.assertIsInstance(first, tuple)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+"""Tests of MySQLdb.columnar, run on result sets of raw field values like _mysql returns them without conversions"""
+import datetime
+import os
+import sys
+import unittest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_ROOT, "modules", "python-module", "bin")]
+
+try:
+    from MySQLdb import columnar, connections
+    from MySQLdb.constants import FIELD_TYPE, FLAG
+except ImportError:
+    # the _mysql extension in bin/ is built for Windows
+    raise unittest.SkipTest("MySQLdb needs the _mysql extension")
+
+CONVERSIONS = {
+    FIELD_TYPE.LONG: int,
+    FIELD_TYPE.LONGLONG: int,
+    FIELD_TYPE.DOUBLE: float,
+    FIELD_TYPE.DATE: lambda s: datetime.datetime.strptime(s, "%Y-%m-%d").date(),
+    FIELD_TYPE.VAR_STRING: [(FLAG.BINARY, bytes), (None, lambda s: s.decode("utf8"))],
+}
+
+FIELDS = [
+    ("id", FIELD_TYPE.LONG, 0),
+    ("money", FIELD_TYPE.LONGLONG, FLAG.UNSIGNED),
+    ("x", FIELD_TYPE.DOUBLE, 0),
+    ("name", FIELD_TYPE.VAR_STRING, 0),
+    ("joined", FIELD_TYPE.DATE, 0),
+    ("id", FIELD_TYPE.LONG, 0),
+]
+
+ROWS = [
+    ("1", "18446744073709551615", "1.5", b"alice", "2020-01-02", "-1"),
+    ("2", "0", "-2", b"b\xc3\xb6b", "2020-02-29", "-2"),
+    ("3", "7", "1e3", b"carl", "1999-12-31", "-3"),
+]
+
+PYTHON_ROWS = [
+    (1, 18446744073709551615, 1.5, u"alice", datetime.date(2020, 1, 2), -1),
+    (2, 0, -2.0, u"b\xf6b", datetime.date(2020, 2, 29), -2),
+    (3, 7, 1000.0, u"carl", datetime.date(1999, 12, 31), -3),
+]
+
+
+class _Result(object):
+
+    def __init__(self, rows):
+        self.rows = rows
+
+    def fetch_row(self, maxrows=1):
+        return tuple(self.rows)
+
+
+class _Connection(object):
+
+    errorhandler = connections.defaulterrorhandler
+    converter = CONVERSIONS
+
+
+class PythonColumnarTest(unittest.TestCase):
+    """Without NumPy"""
+
+    numpy = None
+
+    def setUp(self):
+        self._np = columnar._np
+        columnar._np = self.numpy
+
+    def tearDown(self):
+        columnar._np = self._np
+
+    def execute(self, rows, fields=FIELDS):
+        cursor = columnar.ColumnarCursor(_Connection())
+        cursor._executed = b"SELECT"
+        cursor.rownumber = 0
+        cursor.description = tuple((name, type_, None, None, None, None, 1) for name, type_, flags in fields)
+        cursor.description_flags = tuple(flags for name, type_, flags in fields)
+        cursor._result = None if rows is None else _Result(rows)
+        cursor._post_get_result()
+        return cursor
+
+    def test_rows_have_python_values(self):
+        cursor = self.execute(ROWS)
+
+        self.assertEqual(cursor.fetchone(), PYTHON_ROWS[0])
+        self.assertEqual(cursor.fetchmany(1), PYTHON_ROWS[1:2])
+        self.assertEqual(list(cursor.fetchall()), PYTHON_ROWS[2:])
+        self.assertIsNone(cursor.fetchone())
+
+        rows = cursor._rows
+        self.assertEqual(list(rows), PYTHON_ROWS)
+        self.assertEqual(rows[-1], PYTHON_ROWS[-1])
+        self.assertEqual(rows[::2], PYTHON_ROWS[::2])
+
+        with self.assertRaises(IndexError):
+            rows[3]
+
+        for row in [rows[0]] + rows[0:3] + list(rows):
+            self.assertEqual([type(value) for value in row], [type(value) for value in PYTHON_ROWS[0]])
+
+    def test_iterates_in_chunks(self):
+        rows = [(str(i), "0", "0", b"", "2020-01-01", "0") for i in range(columnar._ITER_ROWS * 2 + 1)]
+
+        self.assertEqual([row[0] for row in self.execute(rows)._rows], list(range(len(rows))))
+
+    def test_columns(self):
+        columns = self.execute(ROWS).fetchcolumns()
+
+        self.assertEqual(list(columns), ["id", "money", "x", "name", "joined", "id_5"])
+        self.assertEqual(list(columns["id"]), [1, 2, 3])
+        self.assertEqual(list(columns["x"]), [1.5, -2.0, 1000.0])
+        self.assertEqual(columns["name"], [u"alice", u"b\xf6b", u"carl"])
+
+    def test_integer_columns(self):
+        columns = self.execute(ROWS).fetchcolumns()
+
+        if self.numpy is None:
+            self.assertEqual((columns["id"].typecode, columns["money"].typecode), ("q", "Q"))
+        else:
+            self.assertEqual((columns["id"].dtype, columns["money"].dtype), (self.numpy.int64, self.numpy.uint64))
+
+    def test_bytes_values(self):
+        rows = [tuple(value.encode("ascii") if isinstance(value, str) else value for value in row) for row in ROWS]
+
+        self.assertEqual(list(self.execute(rows, FIELDS[:4])._rows), [row[:4] for row in PYTHON_ROWS])
+
+    def test_null_and_bad_values_are_converted_by_cell(self):
+        fields = [("a", FIELD_TYPE.LONG, 0), ("b", FIELD_TYPE.LONGLONG, FLAG.UNSIGNED), ("c", FIELD_TYPE.DOUBLE, 0),
+                  ("d", FIELD_TYPE.VAR_STRING, FLAG.BINARY)]
+        rows = [("1", "-1", None, b"\x00"), (None, "99999999999999999999", "2", b"\xff")]
+        cursor = self.execute(rows, fields)
+
+        self.assertEqual(list(cursor._rows), [(1, -1, None, b"\x00"), (None, 99999999999999999999, 2.0, b"\xff")])
+        self.assertEqual(cursor.fetchcolumns()["a"], [1, None])
+
+    def test_empty_result(self):
+        cursor = self.execute([])
+
+        self.assertEqual(len(cursor._rows), 0)
+        self.assertEqual(list(cursor._rows), [])
+        self.assertEqual([len(column) for column in cursor.fetchcolumns().values()], [0] * len(FIELDS))
+
+    def test_no_result_set(self):
+        cursor = self.execute(None)
+
+        self.assertEqual(cursor.fetchcolumns(), {})
+        self.assertEqual(cursor.fetchall(), ())
+
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "needs NumPy")
+class NumPyColumnarTest(PythonColumnarTest):
+
+    numpy = numpy
+
+    def test_date_columns(self):
+        columns = self.execute(ROWS).fetchcolumns()
+
+        self.assertEqual(columns["joined"].dtype, numpy.dtype("datetime64[D]"))
+        self.assertIsInstance(columns["x"], numpy.ndarray)
+
+    def test_zero_dates_are_converted_by_cell(self):
+        fields = [("joined", FIELD_TYPE.DATE, 0)]
+        converter = CONVERSIONS[FIELD_TYPE.DATE]
+        CONVERSIONS[FIELD_TYPE.DATE] = lambda s: None if s == "0000-00-00" else converter(s)
+
+        try:
+            cursor = self.execute([("2020-01-02",), ("0000-00-00",)], fields)
+        finally:
+            CONVERSIONS[FIELD_TYPE.DATE] = converter
+
+        self.assertEqual(cursor.fetchcolumns()["joined"], [datetime.date(2020, 1, 2), None])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,112 @@
+"""Tests of Connection.literal_many() in MySQLdb.connections, run against a stub connection with the real encoders"""
+import datetime
+import decimal
+import os
+import sys
+import unittest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_ROOT, "modules", "python-module", "bin")]
+
+try:
+    import _mysql
+    from MySQLdb import connections, converters
+except ImportError:
+    # the _mysql extension in bin/ is built for Windows
+    raise unittest.SkipTest("MySQLdb needs the _mysql extension")
+
+
+class _Connection(object):
+    """Stub of connections.Connection with its literal methods and the encoders it sets up, escaping without a
+    server"""
+
+    literal = connections.Connection.literal
+    literal_many = connections.Connection.literal_many
+    _get_literal_function = connections.Connection._get_literal_function
+
+    def __init__(self, charset="utf8"):
+        self.encoding = charset
+        self.encoders = dict((k, v) for k, v in converters.conversions.items() if type(k) is not int)
+
+        def unicode_literal(u, dummy=None):
+            return self.string_literal(str(u).encode(unicode_literal.charset))
+
+        unicode_literal.charset = charset
+        self.unicode_literal = self.encoders[str] = unicode_literal
+        self.encoders[bytes] = lambda o, dummy=None: self.string_literal(o)
+
+    def escape(self, o, encoders):
+        return _mysql.escape(o, encoders)
+
+    def string_literal(self, o):
+        return _mysql.string_literal(o)
+
+
+class Point(object):
+    """Type without an encoder, escaped like a str"""
+
+    def __str__(self):
+        return "(1, 2)"
+
+
+VALUES = [
+    0, -1, 2 ** 63, True, False,
+    1.5, -0.0, 1e100, 1 / 3.0,
+    None,
+    u"", u"it's", u"\xfc€", u"back\\slash", u"\x00",
+    b"", b"\xff'\x00",
+    datetime.datetime(2020, 1, 2, 3, 4, 5, 6), datetime.date(2020, 1, 2), datetime.timedelta(days=1, seconds=5),
+    set([u"a"]), (1, 2.5), decimal.Decimal("1.10"), Point(),
+]
+
+
+class LiteralManyTest(unittest.TestCase):
+
+    def setUp(self):
+        self.db = _Connection()
+
+    def literal(self, o):
+        return self.db.literal(o).encode(self.db.encoding, "surrogateescape")
+
+    def test_same_as_literal(self):
+        result = self.db.literal_many(VALUES)
+
+        self.assertEqual(result, [self.literal(o) for o in VALUES])
+        self.assertTrue(all(isinstance(value, bytes) for value in result))
+
+    def test_common_literals(self):
+        self.assertEqual(self.db.literal_many([1, True, 1.5, None, u"it's"]),
+                         [b"1", b"1", b"1.5", b"NULL", b"'it\\'s'"])
+
+    def test_other_charset(self):
+        self.db = _Connection("latin1")
+
+        self.assertEqual(self.db.literal_many([u"\xfc"]), [b"'\xfc'"])
+        self.assertEqual(self.db.literal_many([u"\xfc"]), [self.literal(u"\xfc")])
+
+    def test_custom_encoders_are_used(self):
+        self.db.encoders[int] = lambda o, d: "INT(%d)" % o
+        self.db.encoders[float] = lambda o, d: "FLOAT"
+        self.db.encoders[str] = lambda o, d: "STR"
+        self.db.encoders[type(None)] = lambda o, d: "NONE"
+
+        self.assertEqual(self.db.literal_many([1, 1.5, u"a", None, True]),
+                         [b"INT(1)", b"FLOAT", b"STR", b"NONE", b"1"])
+
+    def test_subclasses(self):
+        class Text(str):
+            pass
+
+        class Number(int):
+            pass
+
+        values = [Text(u"a"), Number(5)]
+        self.assertEqual(self.db.literal_many(values), [self.literal(o) for o in values])
+
+    def test_empty(self):
+        self.assertEqual(self.db.literal_many([]), [])
+        self.assertEqual(self.db.literal_many(iter([1, 2])), [b"1", b"2"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,421 @@
+"""Tests of the query building in MySQLdb.cursors, run against a stub connection which makes up its own literals and
+records the queries it is sent"""
+import gc
+import os
+import sys
+import unittest
+import weakref
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_ROOT, "modules", "python-module", "bin")]
+
+try:
+    from MySQLdb import connections, cursors
+except ImportError:
+    # the _mysql extension in bin/ is built for Windows
+    raise unittest.SkipTest("MySQLdb needs the _mysql extension")
+
+from _mysql_exceptions import ProgrammingError
+
+
+class _Literal(object):
+    charset = "utf8"
+
+
+class _Connection(object):
+    """Stub of connections.Connection, the literal of an object is its repr in angle brackets.
+
+    Every statement of a query affects one row per row of its VALUES, or none if it contains the literal <0>.
+    """
+
+    errorhandler = connections.defaulterrorhandler
+    unicode_literal = _Literal()
+    encoding = "utf8"
+    _multi_statements = True
+
+    def __init__(self):
+        self.messages = []
+        self.queries = []
+        self.results = []
+
+    def literal(self, o):
+        return "<%r>" % (o,)
+
+    def literal_many(self, seq):
+        return [self.literal(o).encode(self.encoding) for o in seq]
+
+    def query(self, query):
+        self.queries.append(bytes(query))
+        self.results = [0 if b"<0>" in statement else statement.count(b"),(") + 1
+                        for statement in bytes(query).split(b";")]
+
+    def next_result(self):
+        if len(self.results) < 2:
+            return -1
+
+        self.results.pop(0)
+        return 0
+
+    def affected_rows(self):
+        return self.results[0]
+
+    def store_result(self):
+        return None
+
+    def insert_id(self):
+        return 0
+
+    def warning_count(self):
+        return 0
+
+
+class QueryTemplateTest(unittest.TestCase):
+
+    def setUp(self):
+        self.db = _Connection()
+
+    def parse(self, query):
+        return cursors.QueryTemplate.parse(query, "utf8")
+
+    def test_positional_placeholders(self):
+        template = self.parse("SELECT %s, %s FROM players")
+
+        self.assertEqual(template.segments, (b"SELECT ", b", ", b" FROM players"))
+        self.assertIsNone(template.names)
+        self.assertEqual(template.count, 2)
+
+    def test_named_placeholders(self):
+        template = self.parse("SELECT %(id)s, %(name)s, %(id)s")
+
+        self.assertEqual(template.segments, (b"SELECT ", b", ", b", ", b""))
+        self.assertEqual(template.names, ("id", "name", "id"))
+        self.assertEqual(template.render({"id": 1, "name": "a", "other": 2}, self.db), b"SELECT <1>, <'a'>, <1>")
+
+    def test_escaped_percent(self):
+        template = self.parse("SELECT '100%%', %s LIKE '%%a'")
+
+        self.assertEqual(template.segments, (b"SELECT '100%', ", b" LIKE '%a'"))
+        self.assertEqual(self.parse("SELECT '%%'").segments, (b"SELECT '%'",))
+
+    def test_encoded_in_the_charset(self):
+        self.assertEqual(self.parse(u"SELECT '\xfc', %s").segments, (u"SELECT '\xfc', ".encode("utf8"), b""))
+        self.assertEqual(cursors.QueryTemplate.parse(u"SELECT '\xfc'", "latin1").segments, (b"SELECT '\xfc'",))
+
+    def test_unsupported_queries(self):
+        for query in ("SELECT %d", "SELECT %s, %(name)s", "SELECT %(name)d", "SELECT 100%", "SELECT %r"):
+            self.assertIsNone(self.parse(query), query)
+
+    def test_accepts(self):
+        positional = self.parse("SELECT %s")
+        named = self.parse("SELECT %(id)s")
+
+        self.assertTrue(positional.accepts((1,)))
+        self.assertTrue(positional.accepts([1]))
+        self.assertFalse(positional.accepts({"id": 1}))
+        self.assertTrue(named.accepts({"id": 1}))
+        self.assertFalse(named.accepts((1,)))
+
+    def test_wrong_number_of_arguments(self):
+        template = self.parse("SELECT %s, %s")
+
+        for args in ((1,), (1, 2, 3)):
+            with self.assertRaises(TypeError) as context:
+                template.render(args, self.db)
+
+            # the same as for % interpolation
+            with self.assertRaises(TypeError) as expected:
+                "%s, %s" % args
+
+            self.assertEqual(str(context.exception), str(expected.exception))
+
+        with self.assertRaises(KeyError):
+            self.parse("SELECT %(id)s").render({"name": 1}, self.db)
+
+    def test_other_iterables(self):
+        self.assertEqual(self.parse("SELECT %s, %s").render(iter((1, 2)), self.db), b"SELECT <1>, <2>")
+
+
+class MogrifyTest(unittest.TestCase):
+    """QueryTemplate gives the same queries as the % interpolation of execute()"""
+
+    QUERIES = [
+        ("SELECT %s, %s", (1, u"it's")),
+        ("SELECT %s, %s", [None, 1.5]),
+        (u"SELECT '\xfc%%', %s", (u"\xfc",)),
+        ("SELECT %(id)s, %(name)s, %(id)s", {"id": 1, "name": u"a"}),
+        ("SELECT 1", ()),
+    ]
+
+    def setUp(self):
+        self.db = _Connection()
+        self.cursor = cursors.Cursor(self.db)
+
+    def test_same_as_execute(self):
+        for query, args in self.QUERIES:
+            template = cursors.QueryTemplate.parse(query, "utf8")
+            self.assertEqual(template.render(args, self.db), self.cursor._mogrify(query, args), query)
+
+    def test_mogrify(self):
+        self.assertEqual(self.cursor._mogrify("SELECT %s", (u"\xfc",)), u"SELECT <'\xfc'>".encode("utf8"))
+        self.assertEqual(self.cursor._mogrify("SELECT '%'"), b"SELECT '%'")
+
+        with self.assertRaises(ProgrammingError):
+            self.cursor._mogrify("SELECT %s, %s", (1,))
+
+    def test_multi_statements_are_rendered_like_execute(self):
+        query = "UPDATE players SET name = %s WHERE id = %s;"
+        rows = [(u"a", 1), (u"\xfc", 2), (None, 3)]
+        expected = b";".join(self.cursor._mogrify(query[:-1], row) for row in rows)
+
+        self.assertEqual(list(self.cursor._iter_multi_statements(query, rows, 1024)), [expected])
+
+        # rows the template can't take fall back to execute()'s way
+        rows = [{"id": 1}] + rows
+        with self.assertRaises(ProgrammingError):
+            list(self.cursor._iter_multi_statements(query, rows, 1024))
+
+        with self.assertRaises(ProgrammingError):
+            list(self.cursor._iter_multi_statements(query, [(1,)], 1024))
+
+
+class ExecuteManyTest(unittest.TestCase):
+
+    UPDATE = "UPDATE players SET money = %s WHERE id = %s"
+    ROWS = [(10, 1), (0, 2), (30, 3)]
+
+    def setUp(self):
+        self.db = _Connection()
+        self.cursor = cursors.Cursor(self.db)
+
+    def test_one_query_per_row_by_default(self):
+        self.assertFalse(cursors.BaseCursor.batch_statements)
+        self.assertEqual(self.cursor.executemany(self.UPDATE, self.ROWS), 2)
+
+        self.assertEqual(self.db.queries, [b"UPDATE players SET money = <10> WHERE id = <1>",
+                                           b"UPDATE players SET money = <0> WHERE id = <2>",
+                                           b"UPDATE players SET money = <30> WHERE id = <3>"])
+
+    def test_batched_statements(self):
+        self.cursor.batch_statements = True
+
+        self.assertEqual(self.cursor.executemany(self.UPDATE + " ; ", self.ROWS), 2)
+        self.assertEqual(self.cursor.rowcount, 2)
+        self.assertEqual(self.db.queries, [b"UPDATE players SET money = <10> WHERE id = <1>;"
+                                           b"UPDATE players SET money = <0> WHERE id = <2>;"
+                                           b"UPDATE players SET money = <30> WHERE id = <3>"])
+
+    def test_rowcount_over_several_queries(self):
+        self.cursor.batch_statements = True
+        self.cursor.max_stmt_length = 100
+        rows = [(i, i) for i in range(1, 11)]
+
+        self.assertEqual(self.cursor.executemany(self.UPDATE, rows), 10)
+        self.assertEqual(len(self.db.queries), 5)
+
+    def test_only_data_changing_statements_are_batched(self):
+        self.cursor.batch_statements = True
+        self.cursor.executemany("SELECT %s", [(1,), (2,)])
+
+        self.assertEqual(self.db.queries, [b"SELECT <1>", b"SELECT <2>"])
+
+    def test_not_batched_without_multi_statements(self):
+        self.cursor.batch_statements = True
+        self.db._multi_statements = False
+        self.cursor.executemany(self.UPDATE, self.ROWS)
+
+        self.assertEqual(len(self.db.queries), 3)
+
+    def test_split_at_max_stmt_length(self):
+        rows = [(i, i) for i in range(100)]
+        statements = list(self.cursor._iter_multi_statements(self.UPDATE, rows, 200))
+
+        self.assertGreater(len(statements), 1)
+        self.assertTrue(all(len(statement) <= 200 for statement in statements))
+        self.assertEqual(b";".join(statements), b";".join(self.cursor._mogrify(self.UPDATE, row) for row in rows))
+
+    def test_statement_longer_than_max_stmt_length(self):
+        statements = list(self.cursor._iter_multi_statements(self.UPDATE, self.ROWS, 10))
+
+        self.assertEqual(statements, [self.cursor._mogrify(self.UPDATE, row) for row in self.ROWS])
+
+
+class BulkStatementsTest(unittest.TestCase):
+
+    INSERT = "INSERT INTO players (id, money) VALUES (%s, %s)"
+
+    def setUp(self):
+        self.db = _Connection()
+        self.cursor = cursors.Cursor(self.db)
+
+    def test_bulk_insert(self):
+        statements = self.cursor._get_bulk_statements(self.INSERT, [(1, 10), (2, 20)])
+
+        self.assertEqual(list(statements), [b"INSERT INTO players (id, money) VALUES (<1>, <10>),(<2>, <20>)"])
+
+    def test_named_placeholders_and_postfix(self):
+        query = "replace into players (id, money) values (%(id)s, %(money)s) ON DUPLICATE KEY UPDATE money = 1"
+        statements = self.cursor._get_bulk_statements(query, [{"id": 1, "money": 10}])
+
+        self.assertEqual(list(statements), [b"replace into players (id, money) values (<1>, <10>)"
+                                            b" ON DUPLICATE KEY UPDATE money = 1"])
+
+    def test_split_at_max_stmt_length(self):
+        rows = [(i, i) for i in range(100)]
+        statements = list(self.cursor._iter_execute_many("INSERT INTO players (id, money) VALUES ", "(%s, %s)",
+                                                         "", rows, 200, "utf8"))
+
+        self.assertGreater(len(statements), 1)
+        self.assertTrue(all(len(statement) <= 200 for statement in statements))
+        self.assertEqual(sum(statement.count(b"),(") + 1 for statement in statements), 100)
+
+    def test_rowcount(self):
+        self.cursor.max_stmt_length = 100
+
+        self.assertEqual(self.cursor.executemany(self.INSERT, [(i, i) for i in range(1, 51)]), 50)
+        self.assertGreater(len(self.db.queries), 1)
+
+    def test_other_statements(self):
+        for query in ("UPDATE players SET money = %s WHERE id = %s", "INSERT INTO players SELECT %s",
+                      "DELETE FROM players WHERE id = %s"):
+            self.assertIsNone(self.cursor._get_bulk_statements(query, [(1, 2)]), query)
+
+    def test_update_as_upsert(self):
+        query = "UPDATE players SET money = %s WHERE id = %s"
+
+        self.assertIsNone(self.cursor._get_bulk_statements(query, [(10, 1)]))
+
+        self.cursor.update_as_upsert = True
+        self.assertEqual(list(self.cursor._get_bulk_statements(query, [(10, 1), (20, 2)])),
+                         [b"INSERT INTO players (money, id) VALUES (<10>, <1>),(<20>, <2>)"
+                          b" ON DUPLICATE KEY UPDATE money=VALUES(money)"])
+
+
+class UpdateToUpsertTest(unittest.TestCase):
+
+    def test_keyed_update(self):
+        self.assertEqual(cursors._update_to_upsert("UPDATE players SET money=%s, name = %s WHERE id=%s"),
+                         "INSERT INTO players (money, name, id) VALUES (%s, %s, %s)"
+                         " ON DUPLICATE KEY UPDATE money=VALUES(money), name=VALUES(name)")
+
+    def test_compound_key_and_named_placeholders(self):
+        self.assertEqual(cursors._update_to_upsert("update `db`.`items` set `count` = %(count)s\n"
+                                                   " where player = %(player)s and item = %(item)s;"),
+                         "INSERT INTO `db`.`items` (`count`, player, item) VALUES (%(count)s, %(player)s, %(item)s)"
+                         " ON DUPLICATE KEY UPDATE `count`=VALUES(`count`)")
+
+    def test_other_updates(self):
+        for query in ("UPDATE players SET money = %s",
+                      "UPDATE players SET money = money + %s WHERE id = %s",
+                      "UPDATE players SET money = %s WHERE id = %s OR name = %s",
+                      "UPDATE players SET money = %s WHERE id IN (%s, %s)",
+                      "UPDATE players SET money = %s WHERE id > %s",
+                      "UPDATE players SET money = 1 WHERE id = %s",
+                      "DELETE FROM players WHERE id = %s",
+                      b"UPDATE players SET money = %s WHERE id = %s"):
+            self.assertIsNone(cursors._update_to_upsert(query), query)
+
+
+class _Row(list):
+    """Row which can be tracked with a weak reference"""
+
+
+class _StreamedResult(object):
+    """Stub of an unbuffered result set, it keeps no reference to the rows it has returned"""
+
+    has_next = False
+
+    def __init__(self, count, make_row):
+        self.rows = (make_row(i) for i in range(count))
+        self.fetches = []
+
+    def fetch_row(self, maxrows=1, how=0):
+        rows = [row for i, row in zip(range(maxrows) if maxrows else iter(int, 1), self.rows)]
+        self.fetches.append(len(rows))
+        return tuple(rows)
+
+
+class ChunksTest(unittest.TestCase):
+
+    def execute(self, count, make_row=lambda i: (i, u"x" * 10)):
+        cursor = cursors.SSCursor(_Connection())
+        cursor._executed = b"SELECT"
+        cursor.rownumber = 0
+        cursor._result = _StreamedResult(count, make_row)
+        return cursor
+
+    def test_row_size(self):
+        row = (1, u"abc", None)
+
+        self.assertEqual(cursors._get_row_size(row), sum(sys.getsizeof(value) for value in (row,) + row))
+        self.assertEqual(cursors._get_row_size({"a": u"abc"}), sys.getsizeof({"a": u"abc"}) + sys.getsizeof(u"abc"))
+        self.assertGreater(cursors._get_row_size((u"x" * 1000,)), 1000)
+
+    def test_split_at_size(self):
+        cursor = self.execute(25)
+        chunks = list(cursor.iter_chunks(10))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 5])
+        self.assertEqual([row[0] for chunk in chunks for row in chunk], list(range(25)))
+        self.assertTrue(all(isinstance(chunk, list) for chunk in chunks))
+        self.assertEqual(cursor._result.fetches, [10, 10, 5, 0])
+
+    def test_split_at_max_bytes(self):
+        row_size = cursors._get_row_size((0, u"x" * 10))
+        chunks = list(self.execute(100).iter_chunks(1000, int(row_size * 3.5)))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [3] * 33 + [1])
+        self.assertEqual([row[0] for chunk in chunks for row in chunk], list(range(100)))
+
+    def test_max_bytes_with_varying_rows(self):
+        max_bytes = 2000
+        cursor = self.execute(300, lambda i: (i, u"x" * (i * 7 % 500)))
+        chunks = list(cursor.iter_chunks(1000, max_bytes))
+
+        self.assertEqual([row[0] for chunk in chunks for row in chunk], list(range(300)))
+        for chunk in chunks:
+            self.assertLessEqual(sum(cursors._get_row_size(row) for row in chunk), max_bytes)
+
+        # a row larger than max_bytes comes on its own
+        chunks = list(self.execute(3, lambda i: (i, u"x" * (5000 if i == 1 else 10))).iter_chunks(1000, max_bytes))
+        self.assertEqual([[row[0] for row in chunk] for chunk in chunks], [[0], [1], [2]])
+
+    def test_size_limits_chunks_with_max_bytes(self):
+        chunks = list(self.execute(25).iter_chunks(10, 1 << 20))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [10, 10, 5])
+
+    def test_yielded_rows_are_not_held(self):
+        row_size = cursors._get_row_size(_Row([0]))
+        chunks = self.execute(1000, lambda i: _Row([i])).iter_chunks(1000, row_size * 10)
+        # the first fetch is a single row, then as many as fit
+        next(chunks)
+        chunk = next(chunks)
+        refs = [weakref.ref(row) for row in chunk]
+
+        del chunk
+        gc.collect()
+
+        self.assertEqual([ref() for ref in refs], [None] * len(refs))
+
+        next(chunks)
+
+    def test_iterating_the_cursor(self):
+        cursor = self.execute(2500, lambda i: _Row([i]))
+        cursor.chunk_size = 1000
+        rows = iter(cursor)
+        first = next(rows)
+        ref = weakref.ref(first)
+
+        del first
+        gc.collect()
+
+        self.assertIsNone(ref())
+        self.assertEqual([row[0] for row in rows], list(range(1, 2500)))
+
+        cursor = self.execute(100)
+        cursor.chunk_bytes = cursors._get_row_size((0, u"x" * 10)) * 8
+        self.assertEqual([row[0] for row in cursor], list(range(100)))
+
+
+if __name__ == "__main__":
+    unittest.main()
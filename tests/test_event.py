@@ -0,0 +1,193 @@
+"""Tests of GTAOrange.event, run against the recording __orange__ stand-in in tests/fake"""
+import os
+import sys
+import unittest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_ROOT, "tests", "fake"), os.path.join(_ROOT, "modules", "python-module")]
+
+import __orange__
+from GTAOrange import event, marker, player, vehicle
+
+
+class DispatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dispatcher = event.Dispatcher()
+        self.calls = []
+
+    def handler(self, name):
+        return lambda *args: self.calls.append((name,) + args)
+
+    def test_triggers_in_subscription_order(self):
+        self.dispatcher.on("spawn", self.handler("first"))
+        self.dispatcher.on("spawn", self.handler("second"))
+        self.dispatcher.on("death", self.handler("other"))
+
+        self.dispatcher.trigger("spawn", 1, (2.0, 3.0, 4.0))
+
+        self.assertEqual(self.calls, [("first", 1, (2.0, 3.0, 4.0)), ("second", 1, (2.0, 3.0, 4.0))])
+
+    def test_unknown_event_does_nothing(self):
+        self.dispatcher.trigger("spawn", 1)
+
+        self.assertEqual(self.calls, [])
+
+    def test_subscribing_while_triggering_applies_next_time(self):
+        def subscribe(*args):
+            self.calls.append(("subscribe",) + args)
+            self.dispatcher.on("spawn", self.handler("late"))
+
+        self.dispatcher.on("spawn", subscribe)
+
+        self.dispatcher.trigger("spawn", 1)
+        self.assertEqual(self.calls, [("subscribe", 1)])
+
+        del self.calls[:]
+        self.dispatcher.trigger("spawn", 2)
+        self.assertEqual(self.calls, [("subscribe", 2), ("late", 2)])
+
+    def test_event_keeps_its_callback(self):
+        cb = self.handler("first")
+        handler = self.dispatcher.on("spawn", cb)
+
+        self.assertIs(handler.getCallback(), cb)
+        self.assertNotEqual(handler.id, self.dispatcher.on("spawn", cb).id)
+
+
+class CancelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dispatcher = event.Dispatcher()
+        self.calls = []
+
+    def handler(self, name):
+        return lambda *args: self.calls.append((name,) + args)
+
+    def test_cancel_removes_only_that_handler(self):
+        first = self.dispatcher.on("spawn", self.handler("first"))
+        self.dispatcher.on("spawn", self.handler("second"))
+
+        self.assertTrue(first.cancel())
+        self.dispatcher.trigger("spawn", 1)
+
+        self.assertEqual(self.calls, [("second", 1)])
+
+    def test_cancel_twice(self):
+        handler = self.dispatcher.on("spawn", self.handler("first"))
+
+        self.assertTrue(handler.cancel())
+        self.assertFalse(handler.cancel())
+        self.assertFalse(self.dispatcher.off(handler))
+
+    def test_cancelling_the_last_handler_forgets_the_event(self):
+        self.dispatcher.on("spawn", self.handler("first")).cancel()
+
+        self.assertEqual(self.dispatcher._handlers, {})
+        self.assertEqual(self.dispatcher._compiled, {})
+
+    def test_cancelling_while_triggering_applies_next_time(self):
+        handlers = []
+
+        def cancel(*args):
+            self.calls.append(("cancel",) + args)
+            handlers[1].cancel()
+
+        handlers.append(self.dispatcher.on("spawn", cancel))
+        handlers.append(self.dispatcher.on("spawn", self.handler("second")))
+
+        self.dispatcher.trigger("spawn", 1)
+        self.dispatcher.trigger("spawn", 2)
+
+        self.assertEqual(self.calls, [("cancel", 1), ("second", 1), ("cancel", 2)])
+
+    def test_clear(self):
+        handler = self.dispatcher.on("spawn", self.handler("first"))
+        self.dispatcher.on("death", self.handler("second"))
+
+        self.dispatcher.clear()
+        self.dispatcher.trigger("spawn", 1)
+        self.dispatcher.trigger("death", 1)
+
+        self.assertEqual(self.calls, [])
+        self.assertFalse(handler.cancel())
+
+    def test_disconnect_drops_player_handlers(self):
+        __orange__.events["PlayerConnect"](900, "127.0.0.1")
+        p = player.getByID(900)
+        handler = p.on("spawn", self.handler("spawn"))
+
+        __orange__.events["PlayerDisconnect"](900, 0)
+
+        self.assertNotIn(900, player.getAll())
+        self.assertEqual(p._ehandlers._handlers, {})
+        self.assertFalse(handler.cancel())
+
+    def test_delete_drops_vehicle_handlers(self):
+        veh = vehicle.create("adder", 0.0, 0.0, 0.0, 0.0)
+        handler = veh.on("playerentered", self.handler("entered"))
+
+        vehicle.deleteByID(veh.id)
+
+        self.assertEqual(veh._ehandlers._handlers, {})
+        self.assertFalse(handler.cancel())
+
+
+class EntityHandlerTest(unittest.TestCase):
+
+    def setUp(self):
+        for id in (901, 902):
+            __orange__.events["PlayerConnect"](id, "127.0.0.1")
+
+        self.first = player.getByID(901)
+        self.second = player.getByID(902)
+        self.calls = []
+
+    def tearDown(self):
+        for id in (901, 902):
+            __orange__.events["PlayerDisconnect"](id, 0)
+
+    def handler(self, name):
+        return lambda *args: self.calls.append((name,) + args)
+
+    def test_player_trigger_only_runs_its_own_handlers(self):
+        self.first.on("death", self.handler("first"))
+        self.second.on("death", self.handler("second"))
+
+        __orange__.events["PlayerDead"](901, 902, 0x1234)
+
+        self.assertEqual(self.calls, [("first", self.first, self.second, 0x1234)])
+        self.assertIsNot(self.first._ehandlers, self.second._ehandlers)
+
+    def test_global_and_player_handlers(self):
+        handler = player.on("spawn", self.handler("global"))
+        self.first.on("spawn", self.handler("first"))
+
+        try:
+            __orange__.events["PlayerSpawn"](901, 1.0, 2.0, 3.0)
+        finally:
+            handler.cancel()
+
+        self.assertEqual(self.calls, [("global", self.first, (1.0, 2.0, 3.0)),
+                                      ("first", self.first, (1.0, 2.0, 3.0))])
+
+    def test_marker_players_are_per_marker(self):
+        first = marker.create(0.0, 0.0, 0.0)
+        second = marker.create(10.0, 0.0, 0.0)
+
+        try:
+            __orange__.events["EnterMarker"](901, first.id)
+
+            self.assertEqual(first.getPlayers(), [self.first])
+            self.assertEqual(second.getPlayers(), [])
+
+            __orange__.events["LeftMarker"](901, first.id)
+
+            self.assertEqual(first.getPlayers(), [])
+        finally:
+            first.delete()
+            second.delete()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+"""Tests of the group messaging functions of GTAOrange.player, run against the recording __orange__ stand-in in
+tests/fake"""
+import os
+import sys
+import unittest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_ROOT, "tests", "fake"), os.path.join(_ROOT, "modules", "python-module")]
+
+import __orange__
+from GTAOrange import batch, player, snapshot
+
+# the stand-in puts every player at (id, 2.0, 3.0)
+IDS = (921, 922, 923, 925)
+
+
+class FanOutTest(unittest.TestCase):
+
+    def setUp(self):
+        for id in IDS:
+            __orange__.events["PlayerConnect"](id, "127.0.0.1")
+
+        self.players = [player.getByID(id) for id in IDS]
+        self.everyone = list(player.getAll().values())
+        __orange__.reset()
+
+    def tearDown(self):
+        for id in IDS:
+            __orange__.events["PlayerDisconnect"](id, 0)
+
+    def test_chat_msg_to_everyone_is_a_broadcast(self):
+        player.chatMsg("hi")
+
+        self.assertEqual(__orange__.calls, [("BroadcastClientMessage", "{FFFFFF}hi", 255),
+                                            ("TriggerClientEvent", -1, "chat:msg", [False, "hi"])])
+
+    def test_chat_msg_to_a_group(self):
+        player.chatMsgTo(self.players[:2], "hi")
+
+        self.assertEqual(__orange__.calls, [("SendClientMessage", 921, "{FFFFFF}hi", 255),
+                                            ("TriggerClientEvent", 921, "chat:msg", [False, "hi"]),
+                                            ("SendClientMessage", 922, "{FFFFFF}hi", 255),
+                                            ("TriggerClientEvent", 922, "chat:msg", [False, "hi"])])
+        # the argument list is shared by every recipient
+        self.assertIs(__orange__.calls[1][3], __orange__.calls[3][3])
+
+    def test_chat_msg_to_a_predicate(self):
+        player.chatMsgTo(lambda p: p.id == 923, "hi")
+
+        self.assertEqual([call[:2] for call in __orange__.calls], [("SendClientMessage", 923),
+                                                                  ("TriggerClientEvent", 923)])
+
+    def test_group_of_everyone_is_a_broadcast(self):
+        for players in (self.everyone, list(reversed(self.everyone)), lambda p: True):
+            __orange__.reset()
+            player.chatMsgTo(players, "hi")
+
+            self.assertEqual([call[0] for call in __orange__.calls], ["BroadcastClientMessage", "TriggerClientEvent"])
+
+    def test_duplicates_are_not_everyone(self):
+        players = self.everyone[1:] + self.everyone[1:2]
+        player.triggerClientTo(players, "ping")
+
+        self.assertEqual([call[1] for call in __orange__.calls], [p.id for p in players])
+
+    def test_disconnected_players_are_not_everyone(self):
+        disconnected = player.Player(999)
+        player.triggerClientTo(self.everyone[1:] + [disconnected], "ping")
+
+        self.assertEqual(len(__orange__.calls), len(self.everyone))
+
+    def test_empty_group(self):
+        player.chatMsgTo([], "hi")
+        player.triggerClientTo(lambda p: False, "ping")
+
+        self.assertEqual(__orange__.calls, [])
+
+    def test_trigger_client_to(self):
+        player.triggerClientTo(self.players[:2], "ping", 1, "a")
+
+        self.assertEqual(__orange__.calls, [("TriggerClientEvent", 921, "ping", [1, "a"]),
+                                            ("TriggerClientEvent", 922, "ping", [1, "a"])])
+
+        __orange__.reset()
+        player.triggerClientTo(self.everyone, "ping", 1)
+
+        self.assertEqual(__orange__.calls, [("TriggerClientEvent", -1, "ping", [1])])
+
+    def test_in_radius(self):
+        self.assertEqual(player.getInRadius(921.5, 2.0, 3.0, 1.0), self.players[:2])
+        self.assertEqual(player.getInRadius(925.0, 2.0, 3.0, 0.5), self.players[3:])
+        self.assertEqual(player.getInRadius(0.0, 0.0, 0.0, 1.0), [])
+
+    def test_in_radius_from_the_snapshot(self):
+        snapshot.enable(60.0)
+
+        try:
+            self.assertEqual(player.getInRadius(921.5, 2.0, 3.0, 1.0), self.players[:2])
+            reads = len(__orange__.calls)
+            self.assertEqual(player.getInRadius(923.0, 2.0, 3.0, 0.5), self.players[2:3])
+            self.assertEqual(len(__orange__.calls), reads)
+        finally:
+            snapshot.disable()
+            snapshot.setMaxAge(0.05)
+
+    def test_near(self):
+        player.chatMsgNear(925.0, 2.0, 3.0, 0.5, "hi")
+        player.triggerClientNear(921.5, 2.0, 3.0, 1.0, "ping")
+
+        calls = [call[:3] for call in __orange__.calls if call[0] in ("SendClientMessage", "TriggerClientEvent")]
+
+        self.assertEqual(calls, [("SendClientMessage", 925, "{FFFFFF}hi"), ("TriggerClientEvent", 925, "chat:msg"),
+                                 ("TriggerClientEvent", 921, "ping"), ("TriggerClientEvent", 922, "ping")])
+
+    def test_batched(self):
+        with batch.collect():
+            player.chatMsgTo(self.players[:1], "hi")
+            player.triggerClientTo(self.players[:1], "ping")
+
+            self.assertEqual(__orange__.calls, [])
+
+        self.assertEqual([call[0] for call in __orange__.calls], ["SendClientMessage", "TriggerClientEvent",
+                                                                  "TriggerClientEvent"])
+
+
+if __name__ == "__main__":
+    unittest.main()
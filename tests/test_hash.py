@@ -0,0 +1,135 @@
+"""Tests of GTAOrange.hash"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_ROOT, "tests", "fake"), os.path.join(_ROOT, "modules", "python-module")]
+
+from GTAOrange import hash
+
+DATABASE = {
+    "weapons": {
+        "WEAPON_PISTOL": 453432689,
+        "WEAPON_KNIFE": -1716189206,
+        "WEAPON_ALIAS": 453432689,
+        "WEAPON_BAT": -1786099057,
+    },
+}
+
+
+class ReverseIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.dir, "weapons.json")
+
+        with open(self.file_name, "w") as file:
+            json.dump(DATABASE, file)
+
+        class Container(hash.HashContainer):
+            pass
+
+        Container.load(self.file_name, "weapons")
+        self.container = Container
+
+    def tearDown(self):
+        hash._documents.pop(self.file_name, None)
+        shutil.rmtree(self.dir)
+
+    def test_string_by_hash(self):
+        self.assertEqual(self.container.getStringByHash(-1716189206), "WEAPON_KNIFE")
+        self.assertIsNone(self.container.getStringByHash(1))
+
+    def test_signed_and_unsigned_hashes_are_the_same(self):
+        self.assertEqual(self.container.getStringByHash(-1716189206 & 0xFFFFFFFF), "WEAPON_KNIFE")
+
+    def test_collisions(self):
+        # the first name in the file wins
+        self.assertEqual(self.container.getStringByHash(453432689), "WEAPON_PISTOL")
+        self.assertEqual(self.container.getStringsByHash(453432689), ["WEAPON_PISTOL", "WEAPON_ALIAS"])
+        self.assertEqual(self.container.getStringsByHash(-1786099057), ["WEAPON_BAT"])
+        self.assertEqual(self.container.getStringsByHash(1), [])
+
+    def test_hash_by_string(self):
+        self.assertEqual(self.container.getHashByString("weapon_knife"), -1716189206)
+        self.assertEqual(self.container.WEAPON_BAT, -1786099057)
+
+    def test_bulk(self):
+        self.assertEqual(self.container.getStringsByHashes([-1786099057, 1, 453432689]),
+                         ["WEAPON_BAT", None, "WEAPON_PISTOL"])
+        self.assertEqual(self.container.getHashesByStrings(["weapon_bat", "nothing"]), [-1786099057, None])
+
+    def test_weapon_groups(self):
+        self.assertEqual(hash.getWeaponStringByHash(hash.Weapon.WEAPON_PISTOL), "WEAPON_PISTOL")
+        self.assertIsNone(hash.getWeaponStringByHash(1))
+
+
+class LazyLoadingTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.file_name = os.path.join(self.dir, "weapons.json")
+
+        with open(self.file_name, "w") as file:
+            json.dump(DATABASE, file)
+
+        class Container(hash.HashContainer):
+            # an absolute path stays as it is
+            _source = (self.file_name, "weapons")
+
+        self.container = Container
+
+    def tearDown(self):
+        hash._documents.pop(self.file_name, None)
+        shutil.rmtree(self.dir)
+
+    def test_loaded_on_first_use(self):
+        self.assertFalse(self.container.loaded)
+        self.assertNotIn(self.file_name, hash._documents)
+
+        self.assertEqual(self.container.WEAPON_KNIFE, -1716189206)
+        self.assertTrue(self.container.loaded)
+
+    def test_loaded_by_the_class_methods(self):
+        self.assertEqual(self.container.getStringByHash(-1716189206), "WEAPON_KNIFE")
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            self.container.WEAPON_NOTHING
+
+        self.assertFalse(hasattr(self.container, "__wrapped__"))
+
+    def test_file_is_parsed_once(self):
+        class Other(hash.HashContainer):
+            _source = (self.file_name, "weapons")
+
+        self.container.WEAPON_BAT
+        os.remove(self.file_name)
+
+        self.assertEqual(Other.WEAPON_BAT, -1786099057)
+        self.assertIs(Other.objects, self.container.objects)
+
+    def test_independent_of_the_working_directory(self):
+        class Colors(hash.HashContainer):
+            _source = ("colors.json", "vehicle_colors")
+
+        cwd = os.getcwd()
+        os.chdir(self.dir)
+        hash._documents.pop(os.path.join(hash._PATH, "colors.json"), None)
+
+        try:
+            self.assertIsNotNone(Colors.getHashByString("metallic black"))
+        finally:
+            os.chdir(cwd)
+
+    def test_load_hash_container(self):
+        self.assertIs(hash.loadHashContainer("Object"), hash.Object)
+        self.assertIsNone(hash.loadHashContainer("Nothing"))
+
+
+if __name__ == "__main__":
+    unittest.main()
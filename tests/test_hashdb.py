@@ -0,0 +1,137 @@
+"""Tests of GTAOrange.hashdb and the containers of GTAOrange.hash reading it"""
+import json
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+from unittest import mock
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_ROOT, "tests", "fake"), os.path.join(_ROOT, "modules", "python-module")]
+
+from GTAOrange import hash, hashdb
+
+# names sharing a hash aren't in alphabetical order on purpose
+OBJECTS = {
+    "prop_zebra": 1234,
+    "prop_bin_01a": -1096777189,
+    "prop_alias": 1234,
+    "prop_zulu": -1096777189 & 0xFFFFFFFF,
+    "prop_über": 99,
+}
+
+
+class HashDatabaseTest(unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.source = os.path.join(self.dir, "objects.json")
+
+        with open(self.source, "w") as file:
+            json.dump(OBJECTS, file)
+
+        self.db = hashdb.openDatabase(self.source)
+
+    def tearDown(self):
+        self.db.close()
+        shutil.rmtree(self.dir)
+
+    def test_compiled_next_to_the_source(self):
+        self.assertTrue(os.path.exists(os.path.join(self.dir, "objects.hashdb")))
+        self.assertEqual(len(self.db), len(OBJECTS))
+
+    def test_values(self):
+        for name, value in OBJECTS.items():
+            self.assertEqual(self.db.getValue(name), value)
+
+        self.assertIsNone(self.db.getValue("prop_nothing"))
+        self.assertEqual(sorted(self.db.items()), sorted(OBJECTS.items()))
+
+    def test_names_keep_the_order_of_the_source(self):
+        self.assertEqual(self.db.getNames(1234), ["prop_zebra", "prop_alias"])
+        self.assertEqual(self.db.getNames(-1096777189 & 0xFFFFFFFF), ["prop_bin_01a", "prop_zulu"])
+        self.assertEqual(self.db.getName(1234), "prop_zebra")
+        self.assertEqual(self.db.getNames(1), [])
+        self.assertIsNone(self.db.getName(1))
+
+    def test_hash_items(self):
+        hashes = [hash_ for hash_, name in self.db.hashItems()]
+
+        self.assertEqual(hashes, sorted(value & 0xFFFFFFFF for value in OBJECTS.values()))
+
+    def test_binary_and_json_containers_are_the_same(self):
+        class Binary(hash.HashContainer):
+            _source = (self.source, None)
+            _binary = True
+            _as_attr = False
+
+        class Json(hash.HashContainer):
+            _source = (self.source, None)
+            _as_attr = False
+
+        try:
+            for value in OBJECTS.values():
+                self.assertEqual(Binary.getStringByHash(value), Json.getStringByHash(value))
+                self.assertEqual(Binary.getStringsByHash(value), Json.getStringsByHash(value))
+
+            self.assertEqual(dict(Binary.collisions), dict(Json.collisions))
+            self.assertEqual(Binary.getHashByString("PROP_ZEBRA"), Json.getHashByString("PROP_ZEBRA"))
+        finally:
+            hash._documents.pop(self.source, None)
+            Binary.objects._db.close()
+
+    def test_outdated_version_is_recompiled(self):
+        self.db.close()
+        target = hashdb.getTarget(self.source)
+
+        with open(target, "r+b") as file:
+            file.seek(8)
+            file.write(b"\x01\x00\x00\x00")
+
+        self.db = hashdb.openDatabase(self.source)
+        self.assertEqual(self.db.getNames(1234), ["prop_zebra", "prop_alias"])
+
+    def test_truncated_file_is_recompiled(self):
+        self.db.close()
+        target = hashdb.getTarget(self.source)
+
+        for size in (4, 40):
+            with open(target, "r+b") as file:
+                file.truncate(size)
+
+            with self.assertRaises((ValueError, hashdb.struct.error)):
+                hashdb.Database(target)
+
+            self.db = hashdb.openDatabase(self.source)
+            self.assertEqual(len(self.db), len(OBJECTS))
+            self.db.close()
+
+        self.db = hashdb.openDatabase(self.source)
+
+    def test_failed_write_leaves_no_temporary_file(self):
+        target = os.path.join(self.dir, "other.hashdb")
+
+        with mock.patch("os.replace", side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                hashdb.compileDatabase(self.source, target)
+
+        self.assertEqual(sorted(os.listdir(self.dir)), ["objects.hashdb", "objects.json"])
+
+    def test_dict_key(self):
+        source = os.path.join(self.dir, "weapons.json")
+
+        with open(source, "w") as file:
+            json.dump({"weapons": OBJECTS}, file)
+
+        db = hashdb.openDatabase(source, "weapons")
+
+        try:
+            self.assertTrue(os.path.exists(os.path.join(self.dir, "weapons.weapons.hashdb")))
+            self.assertEqual(db.getValue("prop_zebra"), 1234)
+        finally:
+            db.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,120 @@
+"""Tests of the spatial grid of GTAOrange.world and the marker lookups using it, run against the recording
+__orange__ stand-in in tests/fake"""
+import os
+import sys
+import unittest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_ROOT, "tests", "fake"), os.path.join(_ROOT, "modules", "python-module")]
+
+import __orange__
+from GTAOrange import marker, player, world
+
+
+class GridTest(unittest.TestCase):
+
+    def setUp(self):
+        self.grid = world.Grid(10.0)
+
+    def test_point_is_stored_in_one_cell(self):
+        self.grid.insert("a", 5.0, 5.0)
+
+        self.assertEqual(self.grid.getAt(1.0, 9.0), {"a"})
+        self.assertEqual(self.grid.getAt(11.0, 5.0), set())
+        self.assertEqual(self.grid.getAt(-1.0, 5.0), set())
+
+    def test_area_is_stored_in_every_overlapped_cell(self):
+        self.grid.insert("a", 10.0, 10.0, 1.0)
+
+        for x, y in ((9.0, 9.0), (11.0, 9.0), (9.0, 11.0), (11.0, 11.0)):
+            self.assertEqual(self.grid.getAt(x, y), {"a"})
+
+        self.assertEqual(self.grid.getAt(25.0, 25.0), set())
+
+    def test_negative_coordinates(self):
+        self.grid.insert("a", -15.0, -15.0)
+
+        self.assertEqual(self.grid.getAt(-19.0, -11.0), {"a"})
+        self.assertEqual(self.grid.getAt(-9.0, -11.0), set())
+
+    def test_insert_moves_and_remove(self):
+        self.grid.insert("a", 5.0, 5.0)
+        self.grid.insert("a", 55.0, 5.0)
+
+        self.assertEqual(self.grid.getAt(5.0, 5.0), set())
+        self.assertEqual(self.grid.getAt(55.0, 5.0), {"a"})
+        self.assertEqual(len(self.grid), 1)
+
+        self.assertTrue(self.grid.remove("a"))
+        self.assertFalse(self.grid.remove("a"))
+        self.assertNotIn("a", self.grid)
+        self.assertEqual(self.grid._cells, {})
+
+    def test_get_near(self):
+        self.grid.insert("a", 5.0, 5.0)
+        self.grid.insert("b", 25.0, 5.0)
+        self.grid.insert("c", 85.0, 5.0)
+
+        self.assertEqual(self.grid.getNear(12.0, 5.0, 10.0), {"a", "b"})
+        self.assertEqual(self.grid.getNear(12.0, 5.0), set())
+
+
+class MarkerLookupTest(unittest.TestCase):
+
+    def setUp(self):
+        self.markers = [marker.create(0.0, 0.0, 0.0, 1.0, 2.0), marker.create(100.0, 0.0, 0.0, 1.0, 2.0)]
+        self.calls = []
+
+    def tearDown(self):
+        for m in self.markers:
+            m.delete()
+
+        for id in (901, 950):
+            if id in player.getAll():
+                __orange__.events["PlayerDisconnect"](id, 0)
+
+    def test_markers_near(self):
+        first = self.markers[0]
+
+        self.assertEqual(marker.markersNear(1.0, 1.0, 0.5), [first])
+        self.assertEqual(marker.markersNear(3.0, 0.0, 0.0), [])
+        self.assertEqual(marker.markersNear(3.0, 0.0, 0.0, 1.5), [first])
+        # too high
+        self.assertEqual(marker.markersNear(0.0, 0.0, 2.0), [])
+
+    def test_deleted_markers_are_not_found(self):
+        first = self.markers.pop(0)
+        first.delete()
+
+        self.assertEqual(marker.markersNear(0.0, 0.0, 0.0), [])
+
+    def test_players_in_markers(self):
+        # the stand-in reports a player at (id, 2.0, 3.0)
+        inside = marker.create(901.0, 2.0, 3.0, 1.0, 1.0)
+        self.markers.append(inside)
+        players = [player.getByID(901), player.getByID(950)]
+
+        self.assertEqual(marker.getPlayersInMarkers(players), {inside: [players[0]]})
+
+    def test_update_players_triggers_enter_and_leave(self):
+        inside = marker.create(901.0, 2.0, 3.0, 1.0, 1.0)
+        self.markers.append(inside)
+        p = player.getByID(901)
+        handlers = [marker.on("playerentered", lambda m, p: self.calls.append(("entered", m, p))),
+                    marker.on("playerleft", lambda m, p: self.calls.append(("left", m, p)))]
+
+        try:
+            marker.updatePlayers([p])
+            marker.updatePlayers([p])
+            self.assertEqual(self.calls, [("entered", inside, p)])
+
+            inside.x = inside.y = 500.0
+            marker.updatePlayers([p])
+            self.assertEqual(self.calls, [("entered", inside, p), ("left", inside, p)])
+        finally:
+            for handler in handlers:
+                handler.cancel()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,282 @@
+"""Tests of GTAOrange.payload, the frames are decoded with its reference decoder, run against the recording __orange__
+stand-in in tests/fake"""
+import base64
+import os
+import random
+import sys
+import unittest
+from unittest import mock
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_ROOT, "tests", "fake"), os.path.join(_ROOT, "modules", "python-module")]
+
+import __orange__
+from GTAOrange import payload, player
+
+# value, tag
+VALUES = [
+    (None, 0), (True, 1), (False, 2),
+    (0, 3), (-128, 3), (127, 3),
+    (128, 4), (-129, 4), (-0x8000, 4), (0x7FFF, 4),
+    (0x8000, 5), (-0x80000000, 5), (0x7FFFFFFF, 5),
+    (0x80000000, 6), (-2 ** 63, 6), (2 ** 63 - 1, 6),
+    (1.5, 7), (-0.0, 7), (1e300, 7),
+    (u"", 8), (u"h\xe9llo €", 8), (u"x" * 200, 8),
+    (b"", 9), (b"\x00\xff" * 100, 9),
+    ([], 10), ([1, u"a", None, [2.5, [b"b"]]], 10),
+    ({}, 11), ({u"a": 1, 2: [u"b"], None: {u"c": False}}, 11),
+]
+
+
+def frame(flags, body):
+    return base64.b64encode(bytes((flags,)) + body).decode("ascii")
+
+
+class EncodingTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        for value, tag in VALUES:
+            data = payload.encode(value)
+
+            self.assertEqual(data[0], tag, value)
+            self.assertEqual(payload.decode(frame(0, data)), value)
+
+    def test_tuples_are_decoded_as_lists(self):
+        self.assertEqual(payload.decode(payload.pack((1, (2, 3)))), [1, [2, 3]])
+
+    def test_bytearray(self):
+        self.assertEqual(payload.decode(payload.pack([bytearray(b"ab")])), [b"ab"])
+
+    def test_long_lengths(self):
+        for n in (127, 128, 16383, 16384, 100000):
+            self.assertEqual(payload.decode(payload.pack([u"x" * n])), [u"x" * n])
+
+    def test_unencodable_values(self):
+        for value in (2 ** 63, -2 ** 63 - 1, object(), set([1]), [1, object()]):
+            with self.assertRaises(TypeError):
+                payload.encode(value)
+
+
+class CompressionTest(unittest.TestCase):
+
+    def setUp(self):
+        patcher = mock.patch.object(payload, "compress_threshold", 100)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def flags(self, frame):
+        return base64.b64decode(frame)[0]
+
+    def test_large_frames_are_compressed(self):
+        args = [u"a" * 200]
+        packed = payload.pack(args)
+
+        self.assertEqual(self.flags(packed), 1)
+        self.assertLess(len(base64.b64decode(packed)), 100)
+        self.assertEqual(payload.decode(packed), args)
+
+    def test_threshold(self):
+        # the encoding is 4 + n bytes
+        self.assertEqual(self.flags(payload.pack([u"a" * 96])), 0)
+        self.assertEqual(self.flags(payload.pack([u"a" * 97])), 1)
+
+    def test_incompressible_frames_are_sent_as_they_are(self):
+        rng = random.Random(1)
+        data = bytes(rng.getrandbits(8) for i in range(500))
+        packed = payload.pack([data])
+
+        self.assertEqual(self.flags(packed), 0)
+        self.assertEqual(payload.decode(packed), [data])
+
+    def test_compressed_patches(self):
+        previous = [{u"rows": [u"a"]}]
+        args = [{u"rows": [u"a", u"b" * 200]}]
+        packed = payload.pack(args, previous)
+
+        self.assertEqual(self.flags(packed), 3)
+        self.assertEqual(payload.decode(packed, previous), args)
+
+
+class PatchTest(unittest.TestCase):
+
+    def check(self, previous, args):
+        packed = payload.pack(args, previous)
+
+        self.assertEqual(base64.b64decode(packed)[0], 2)
+        self.assertEqual(payload.decode(packed, previous), args)
+        return packed
+
+    def test_unchanged(self):
+        for args in ([], [1, u"a"], [{u"a": [1, {u"b": None}]}]):
+            self.assertIsNone(payload.pack(args, payload._copy(args)))
+
+    def test_dict_patches(self):
+        previous = [{u"a": 1, u"b": u"x", u"c": [1, 2], u"d": {u"e": 1, u"f": 2}}]
+
+        self.check(previous, [{u"a": 2, u"b": u"x", u"c": [1, 2], u"d": {u"e": 1, u"f": 2}}])
+        self.check(previous, [{u"a": 1, u"b": u"x", u"c": [1, 2], u"d": {u"e": 1, u"f": 2}, u"g": None}])
+        self.check(previous, [{u"a": 1, u"c": [1, 2], u"d": {u"e": 1}}])
+        self.check(previous, [{u"a": 1, u"b": u"x", u"c": [1, 3], u"d": {u"e": 1, u"f": [2]}}])
+        self.check(previous, [{}])
+
+    def test_list_patches(self):
+        previous = [[1, 2, 3, {u"a": 1}, [4, 5]]]
+
+        self.check(previous, [[1, 2, 3, {u"a": 1}, [4, 5], 6, 7]])
+        self.check(previous, [[1, 2]])
+        self.check(previous, [[1, 9, 3, {u"a": 2}, [4, 6]]])
+        self.check(previous, [[1, 2, 3, {u"a": 1}, {u"a": 1}]])
+
+    def test_scalar_types_are_compared(self):
+        self.check([1, 0, 1.0], [True, False, 1])
+        self.check([1, u"a"], [1, b"a"])
+
+    def test_patches_are_smaller(self):
+        previous = [[{u"name": u"player%d" % i, u"score": i} for i in range(100)]]
+        args = payload._copy(previous)
+        args[0][50][u"score"] = 1000
+
+        self.assertLess(len(self.check(previous, args)), len(payload.pack(args)) / 10)
+
+    def test_previous_is_not_changed(self):
+        previous = [{u"a": [1, 2]}]
+        payload.decode(payload.pack([{u"a": [1, 3]}], previous), previous)
+
+        self.assertEqual(previous, [{u"a": [1, 2]}])
+
+
+class CorruptFrameTest(unittest.TestCase):
+
+    def assertCorrupt(self, packed, previous=None):
+        with self.assertRaises(ValueError):
+            payload.decode(packed, previous)
+
+    def test_truncated_frames(self):
+        for value, tag in VALUES:
+            data = payload.encode([value, u"end"])
+
+            for n in range(len(data)):
+                self.assertCorrupt(frame(0, data[:n]))
+
+    def test_truncated_patches(self):
+        previous = [{u"a": [1, 2, 3], u"b": 1.5}]
+        data = base64.b64decode(payload.pack([{u"a": [1, 5, 3, 4], u"b": 2.5}], previous))
+
+        for n in range(1, len(data)):
+            self.assertCorrupt(base64.b64encode(data[:n]).decode("ascii"), previous)
+
+    def test_truncated_varint(self):
+        self.assertCorrupt(frame(0, b"\x08\x80\x80"))
+
+    def test_bad_frames(self):
+        self.assertCorrupt("")
+        self.assertCorrupt("not base64!")
+        self.assertCorrupt(frame(0, b"\x0e"))
+        self.assertCorrupt(frame(0, b"\x00\x00"))
+        self.assertCorrupt(frame(0, b"\x08\x02\xff\xfe"))
+        self.assertCorrupt(frame(1, b"\x00\x01\x02"))
+        self.assertCorrupt(frame(0, b"\x0b\x01\x0a\x00\x00"))
+
+    def test_patches_need_their_previous_arguments(self):
+        previous = [{u"a": [1, 2]}]
+        packed = payload.pack([{u"a": [1, 3]}], previous)
+
+        self.assertCorrupt(packed)
+        self.assertCorrupt(packed, [[1, 2]])
+        self.assertCorrupt(payload.pack([{u"b": 1}], [{u"a": 1, u"b": 2}]), [{u"b": 1}])
+
+
+class TriggerClientTest(unittest.TestCase):
+
+    def setUp(self):
+        for id in (931, 932):
+            __orange__.events["PlayerConnect"](id, "127.0.0.1")
+
+        self.first = player.getByID(931)
+        self.second = player.getByID(932)
+        __orange__.reset()
+
+    def tearDown(self):
+        for id in (931, 932):
+            __orange__.events["PlayerDisconnect"](id, 0)
+
+        payload.reset()
+
+    def frames(self):
+        return [(call[1], call[2], call[3][0]) for call in __orange__.calls if call[0] == "TriggerClientEvent"]
+
+    def test_full_then_patch_then_nothing(self):
+        scoreboard = {u"alice": 1, u"bob": 2}
+
+        self.assertTrue(payload.triggerClient(self.first, "ui:scores", scoreboard))
+        scoreboard[u"bob"] = 3
+        self.assertTrue(payload.triggerClient(self.first, "ui:scores", scoreboard))
+        self.assertFalse(payload.triggerClient(self.first, "ui:scores", scoreboard))
+
+        (id, event, full), (_, _, patch) = self.frames()
+        self.assertEqual((id, event), (931, "ui:scores"))
+
+        previous = payload.decode(full)
+        self.assertEqual(previous, [{u"alice": 1, u"bob": 2}])
+        self.assertEqual(base64.b64decode(patch)[0], 2)
+        self.assertLess(len(patch), len(full))
+        self.assertEqual(payload.decode(patch, previous), [{u"alice": 1, u"bob": 3}])
+
+    def test_arguments_are_remembered_per_player_and_event(self):
+        payload.triggerClient(self.first, "ui:scores", 1)
+        payload.triggerClient(self.first, "ui:money", 1)
+
+        self.assertTrue(payload.triggerClient(self.second, "ui:scores", 1))
+        self.assertFalse(payload.triggerClient(self.first, "ui:money", 1))
+        self.assertEqual(set(payload._sent), set([(931, "ui:scores"), (931, "ui:money"), (932, "ui:scores")]))
+
+    def test_disconnect_forgets_the_player(self):
+        payload.triggerClient(self.first, "ui:scores", 1)
+        payload.triggerClient(self.first, "ui:money", 1)
+        payload.triggerClient(self.second, "ui:scores", 1)
+
+        __orange__.events["PlayerDisconnect"](931, 0)
+
+        self.assertEqual(list(payload._sent), [(932, "ui:scores")])
+
+        # a new player with the same id gets everything in full
+        __orange__.events["PlayerConnect"](931, "127.0.0.1")
+        __orange__.reset()
+        self.assertTrue(payload.triggerClient(player.getByID(931), "ui:scores", 1))
+        self.assertEqual(payload.decode(self.frames()[0][2]), [1])
+
+    def test_reset(self):
+        for p in (self.first, self.second):
+            for event in ("ui:scores", "ui:money"):
+                payload.triggerClient(p, event, 1)
+
+        payload.reset(self.first, "ui:scores")
+        self.assertNotIn((931, "ui:scores"), payload._sent)
+        self.assertEqual(len(payload._sent), 3)
+
+        payload.reset(event="ui:money")
+        self.assertEqual(list(payload._sent), [(932, "ui:scores")])
+
+        payload.reset()
+        self.assertEqual(payload._sent, {})
+
+    def test_caller_changes_after_sending_are_detected(self):
+        rows = [[1, 2]]
+        payload.triggerClient(self.first, "ui:rows", rows)
+        rows[0].append(3)
+
+        self.assertTrue(payload.triggerClient(self.first, "ui:rows", rows))
+
+    def test_trigger_client_all(self):
+        payload.triggerClient(self.first, "ui:scores", 1)
+        payload.triggerClientAll("ui:scores", 2)
+
+        self.assertEqual(self.frames()[-1][:2], (-1, "ui:scores"))
+        self.assertEqual(payload.decode(self.frames()[-1][2]), [2])
+
+        # patches go against what everyone got
+        self.assertFalse(payload.triggerClient(self.first, "ui:scores", 2))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,117 @@
+"""Tests of the player name index of GTAOrange.player, run against the recording __orange__ stand-in in tests/fake"""
+import os
+import sys
+import unittest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_ROOT, "tests", "fake"), os.path.join(_ROOT, "modules", "python-module")]
+
+import __orange__
+from GTAOrange import player
+
+NAMES = {
+    1001: "Alice",
+    1002: "alice",
+    1003: "Alfred",
+    1004: "Bob",
+    1005: "Bobby",
+}
+
+
+class NameIndexTest(unittest.TestCase):
+
+    def setUp(self):
+        for id, name in NAMES.items():
+            __orange__.names[id] = name
+            __orange__.events["PlayerConnect"](id, "127.0.0.1")
+
+        self.players = dict((id, player.getByID(id)) for id in NAMES)
+
+    def tearDown(self):
+        player.verify_names = False
+
+        for id in NAMES:
+            __orange__.events["PlayerDisconnect"](id, 0)
+            __orange__.names.pop(id, None)
+
+    def rename(self, id, name):
+        # a name changed by another resource, the index doesn't notice
+        __orange__.names[id] = name
+
+    def test_get_by_name(self):
+        self.assertIs(player.getByName("Bob"), self.players[1004])
+        self.assertIs(player.getByName("BOBBY"), self.players[1005])
+        self.assertIs(player.getByName("Carl"), False)
+        self.assertIs(player.getByName("Bo"), False)
+
+    def test_get_by_name_prefers_the_same_case(self):
+        self.assertIs(player.getByName("Alice"), self.players[1001])
+        self.assertIs(player.getByName("alice"), self.players[1002])
+        self.assertIn(player.getByName("ALICE"), (self.players[1001], self.players[1002]))
+
+    def test_set_name_updates_the_index(self):
+        self.players[1004].setName("Carl")
+
+        self.assertIs(player.getByName("Carl"), self.players[1004])
+        self.assertIs(player.getByName("Bob"), False)
+        self.assertEqual(player.findByPrefix("bo"), [self.players[1005]])
+
+    def test_disconnect_removes_the_name(self):
+        __orange__.events["PlayerDisconnect"](1004, 0)
+
+        self.assertIs(player.getByName("Bob"), False)
+        self.assertEqual(player.findByPrefix("bob"), [self.players[1005]])
+
+    def test_find_by_prefix(self):
+        self.assertEqual(player.findByPrefix("AL"), [self.players[1003], self.players[1001], self.players[1002]])
+        self.assertEqual(player.findByPrefix("bob"), [self.players[1004], self.players[1005]])
+        self.assertEqual(player.findByPrefix("bob", limit=1), [self.players[1004]])
+        self.assertEqual(player.findByPrefix("x"), [])
+        self.assertEqual(len(player.findByPrefix("")), len(player.getAll()))
+
+    def test_find_by_name(self):
+        self.assertEqual(player.findByName("alfrde"), [self.players[1003]])
+        self.assertEqual(player.findByName("Bobb", limit=1), [self.players[1005]])
+        self.assertEqual(set(player.findByName("alise", limit=1)), set([self.players[1001], self.players[1002]]))
+        self.assertEqual(player.findByName("zzzzzz"), [])
+
+    def test_stale_names_are_found_without_verification(self):
+        self.rename(1004, "Carl")
+
+        self.assertIs(player.getByName("Bob"), self.players[1004])
+        self.assertIs(player.getByName("Carl"), False)
+
+    def test_verify_names(self):
+        self.rename(1004, "Carl")
+        self.rename(1005, "Bobby")
+
+        self.assertEqual(player.verifyNames(), [self.players[1004]])
+        self.assertEqual(player.verifyNames(), [])
+        self.assertIs(player.getByName("Carl"), self.players[1004])
+        self.assertIs(player.getByName("Bob"), False)
+
+    def test_lookups_verify_names_if_enabled(self):
+        player.verify_names = True
+        self.rename(1004, "Carl")
+        self.rename(1003, "Bobcat")
+
+        # a name the index doesn't know yet is found by verifying every player
+        self.assertIs(player.getByName("Bobcat"), self.players[1003])
+
+        # a stale name isn't found
+        self.rename(1005, "Dave")
+        self.assertIs(player.getByName("Bobby"), False)
+        self.assertIs(player.getByName("Carl"), self.players[1004])
+        self.assertIs(player.getByName("Dave"), self.players[1005])
+
+    def test_prefix_and_fuzzy_lookups_verify_names_if_enabled(self):
+        player.verify_names = True
+        self.rename(1004, "Carl")
+
+        self.assertEqual(player.findByName("bob", limit=1), [])
+        self.assertEqual(player.findByPrefix("bob"), [self.players[1005]])
+        self.assertEqual(player.findByPrefix("car"), [self.players[1004]])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,333 @@
+"""Tests of MySQLdb.pool, run against stub connections which record their round-trips to the server"""
+import os
+import sys
+import unittest
+from unittest import mock
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_ROOT, "modules", "python-module", "bin")]
+
+try:
+    from MySQLdb import pool
+except ImportError:
+    # the _mysql extension in bin/ is built for Windows
+    raise unittest.SkipTest("MySQLdb needs the _mysql extension")
+
+from _mysql_exceptions import OperationalError
+
+
+class _Result(object):
+
+    def fetch_row(self):
+        return ((b"STRICT_TRANS_TABLES",),)
+
+
+class _Connection(object):
+    """Stub of connections.Connection, every method which would talk to the server is logged"""
+
+    _transactional = True
+
+    def __init__(self, **kwargs):
+        self.kwargs = kwargs
+        self.log = []
+        self.broken = False
+        self.closed = False
+        self._autocommit = kwargs.get("autocommit", False)
+        self._charset = "utf8mb4"
+
+    def query(self, query):
+        self.log.append(query)
+
+    def store_result(self):
+        return _Result()
+
+    def commit(self):
+        self.log.append("COMMIT")
+
+    def rollback(self):
+        self.log.append("ROLLBACK")
+
+    def autocommit(self, on):
+        if on != self._autocommit:
+            self.log.append("AUTOCOMMIT %d" % on)
+            self._autocommit = on
+
+    def get_autocommit(self):
+        return self._autocommit
+
+    def character_set_name(self):
+        return self._charset
+
+    def set_character_set(self, charset):
+        self.log.append("CHARSET %s" % charset)
+        self._charset = charset
+
+    def set_sql_mode(self, sql_mode):
+        self.query("SET SESSION sql_mode='%s'" % sql_mode)
+
+    def ping(self):
+        self.log.append("PING")
+        if self.broken:
+            raise OperationalError(2006, "MySQL server has gone away")
+
+    def close(self):
+        self.closed = True
+
+
+class _PooledConnection(pool.PooledConnectionMixIn, _Connection):
+    pass
+
+
+class _Clock(object):
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class PoolTestCase(unittest.TestCase):
+
+    connection_class = _PooledConnection
+
+    def setUp(self):
+        self.clock = _Clock()
+        patcher = mock.patch.object(pool, "_monotonic", self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def createPool(self, **kwargs):
+        class Pool(pool.Pool):
+            connection_class = self.connection_class
+
+        kwargs.setdefault("ping_interval", None)
+        return Pool(**kwargs)
+
+    def checkout(self, p, *queries):
+        conn = p.acquire()
+        del conn.log[:]
+
+        for query in queries:
+            conn.query(query)
+
+        return conn
+
+
+class ResetTest(PoolTestCase):
+
+    def test_unused_connection_costs_nothing(self):
+        p = self.createPool()
+        conn = self.checkout(p)
+        p.release(conn)
+
+        self.assertEqual(conn.log, [])
+
+    def test_open_transaction_is_rolled_back(self):
+        p = self.createPool()
+        conn = self.checkout(p, b"UPDATE players SET money = 1")
+        p.release(conn)
+
+        self.assertEqual(conn.log, [b"UPDATE players SET money = 1", "ROLLBACK"])
+
+        # the next borrower starts clean
+        conn = self.checkout(p)
+        p.release(conn)
+        self.assertEqual(conn.log, [])
+
+    def test_committed_transaction_is_not_rolled_back(self):
+        p = self.createPool()
+        conn = self.checkout(p, b"UPDATE players SET money = 1")
+        conn.commit()
+        p.release(conn)
+
+        self.assertEqual(conn.log, [b"UPDATE players SET money = 1", "COMMIT"])
+
+    def test_autocommit_is_restored(self):
+        p = self.createPool()
+        conn = self.checkout(p)
+        conn.autocommit(True)
+        p.release(conn)
+
+        self.assertEqual(conn.log, ["AUTOCOMMIT 1", "AUTOCOMMIT 0"])
+
+    def test_with_autocommit_only_begin_opens_a_transaction(self):
+        p = self.createPool(autocommit=True)
+        conn = self.checkout(p, b"SELECT 1")
+        p.release(conn)
+        self.assertEqual(conn.log, [b"SELECT 1"])
+
+        conn = self.checkout(p, b"  begin", b"UPDATE players SET money = 1")
+        p.release(conn)
+        self.assertEqual(conn.log, [b"  begin", b"UPDATE players SET money = 1", "ROLLBACK"])
+
+    def test_sql_mode_is_restored_after_set(self):
+        p = self.createPool(autocommit=True)
+        conn = self.checkout(p, "set session sql_mode = ''")
+        p.release(conn)
+
+        self.assertEqual(conn.log, ["set session sql_mode = ''", "SET SESSION sql_mode='STRICT_TRANS_TABLES'"])
+
+        conn = self.checkout(p)
+        p.release(conn)
+        self.assertEqual(conn.log, [])
+
+    def test_charset_is_restored(self):
+        p = self.createPool()
+        conn = self.checkout(p)
+        conn.set_character_set("latin1")
+        p.release(conn)
+
+        self.assertEqual(conn.log, ["CHARSET latin1", "CHARSET utf8mb4"])
+
+    def test_no_reset(self):
+        p = self.createPool(reset=False)
+        conn = self.checkout(p, b"UPDATE players SET money = 1", "SET sql_mode = ''")
+        p.release(conn)
+
+        self.assertEqual(conn.log, [b"UPDATE players SET money = 1", "SET sql_mode = ''"])
+
+
+class UntrackedResetTest(PoolTestCase):
+    """Connection classes without PooledConnectionMixIn are reset every time"""
+
+    connection_class = _Connection
+
+    def test_full_reset(self):
+        p = self.createPool()
+        conn = self.checkout(p)
+        p.release(conn)
+
+        self.assertEqual(conn.log, ["ROLLBACK", "SET SESSION sql_mode='STRICT_TRANS_TABLES'"])
+
+
+class CheckoutTest(PoolTestCase):
+
+    def test_reuses_the_most_recent_connection(self):
+        p = self.createPool(max_size=2)
+        first, second = p.acquire(), p.acquire()
+        p.release(first)
+        p.release(second)
+
+        self.assertIs(p.acquire(), second)
+        self.assertEqual(p.size, 2)
+
+    def test_timeout(self):
+        p = self.createPool(max_size=1)
+        p.acquire()
+
+        with self.assertRaises(pool.PoolError) as context:
+            p.acquire(timeout=0.0)
+
+        self.assertIn("0.000 seconds", str(context.exception))
+
+    def test_release_twice(self):
+        p = self.createPool()
+        conn = p.acquire()
+        p.release(conn)
+
+        with self.assertRaises(pool.PoolError):
+            p.release(conn)
+
+        with self.assertRaises(pool.PoolError):
+            p.release(_PooledConnection())
+
+    def test_broken_connection_is_replaced(self):
+        p = self.createPool(ping_interval=0.0)
+        conn = p.acquire()
+        p.release(conn)
+        conn.broken = True
+
+        other = p.acquire()
+
+        self.assertIsNot(other, conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(p.size, 1)
+
+    def test_ping_interval(self):
+        p = self.createPool(ping_interval=10.0)
+        conn = p.acquire()
+        p.release(conn)
+        del conn.log[:]
+
+        p.release(p.acquire())
+        self.assertEqual(conn.log, [])
+
+        self.clock.now += 11.0
+        p.release(p.acquire())
+        self.assertEqual(conn.log, ["PING"])
+
+    def test_connection_block_discards_on_operational_error(self):
+        p = self.createPool()
+
+        with self.assertRaises(OperationalError):
+            with p.connection() as conn:
+                raise OperationalError(2013, "Lost connection")
+
+        self.assertTrue(conn.closed)
+        self.assertEqual(p.size, 0)
+
+    def test_closed_pool(self):
+        p = self.createPool(min_size=1)
+        conn = p.acquire()
+        p.close()
+
+        with self.assertRaises(pool.PoolError):
+            p.acquire()
+
+        p.release(conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(p.size, 0)
+
+
+class EvictionTest(PoolTestCase):
+
+    def test_max_age(self):
+        p = self.createPool(max_age=60.0)
+        conn = p.acquire()
+        p.release(conn)
+
+        self.clock.now += 61.0
+        other = p.acquire()
+
+        self.assertIsNot(other, conn)
+        self.assertTrue(conn.closed)
+
+    def test_max_age_on_release(self):
+        p = self.createPool(max_age=60.0)
+        conn = p.acquire()
+        self.clock.now += 61.0
+        p.release(conn)
+
+        self.assertTrue(conn.closed)
+        self.assertEqual((p.size, p.idle), (0, 0))
+
+    def test_max_idle_keeps_min_size(self):
+        p = self.createPool(min_size=1, max_size=3, max_idle=30.0, ping_interval=0.0)
+        conns = [p.acquire() for i in range(3)]
+        for conn in conns:
+            p.release(conn)
+
+        self.clock.now += 31.0
+        # evicted when the pool is used again
+        kept = p.acquire()
+
+        self.assertEqual([conn.closed for conn in conns], [True, True, False])
+        self.assertIs(kept, conns[2])
+        self.assertEqual(p.size, 1)
+
+    def test_max_idle_without_ping_replaces_the_connection(self):
+        p = self.createPool(min_size=1, max_idle=30.0)
+        conn = p.acquire()
+        p.release(conn)
+
+        self.clock.now += 31.0
+        other = p.acquire()
+
+        self.assertIsNot(other, conn)
+        self.assertTrue(conn.closed)
+        self.assertEqual(p.size, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
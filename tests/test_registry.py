@@ -0,0 +1,178 @@
+"""Tests of GTAOrange.registry, and of the libraries looking their entity objects up in it"""
+import os
+import sys
+import unittest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_ROOT, "tests", "fake"), os.path.join(_ROOT, "modules", "python-module")]
+
+import __orange__
+from GTAOrange import blip, object as object_, registry, text, vehicle
+
+
+class Entity():
+
+    def __init__(self, id, model=None):
+        self.id = id
+        self.model = model
+
+
+class EntityRegistryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.registry = registry.EntityRegistry("Entity", Entity, {"model": lambda entity: entity.model})
+
+    def test_add_and_get(self):
+        entity = self.registry.add(Entity(1))
+
+        self.assertIs(self.registry.get(1), entity)
+        self.assertIsNone(self.registry.get(2))
+        self.assertIsNone(self.registry.get("1"))
+        self.assertIn(1, self.registry)
+        self.assertEqual(len(self.registry), 1)
+
+    def test_add_replaces(self):
+        self.registry.add(Entity(1, "a"))
+        entity = self.registry.add(Entity(1, "b"))
+
+        self.assertIs(self.registry.get(1), entity)
+        self.assertEqual(self.registry.find("model", "a"), [])
+        self.assertEqual(self.registry.find("model", "b"), [entity])
+
+    def test_get_or_create(self):
+        entity = self.registry.getOrCreate(1)
+
+        self.assertIsInstance(entity, Entity)
+        self.assertIs(self.registry.getOrCreate(1), entity)
+        self.assertIs(self.registry.get(1), entity)
+
+        with self.assertRaises(TypeError):
+            self.registry.getOrCreate("2")
+        self.assertEqual(len(self.registry), 1)
+
+    def test_without_factory(self):
+        self.registry = registry.EntityRegistry("Entity")
+
+        self.assertIsNone(self.registry.getOrCreate(1))
+        self.assertIsNone(self.registry.create(1))
+        self.assertEqual(len(self.registry), 0)
+
+    def test_remove(self):
+        entity = self.registry.add(Entity(1, "a"))
+
+        self.assertIs(self.registry.remove(1), entity)
+        self.assertIsNone(self.registry.remove(1))
+        self.assertEqual(self.registry.find("model", "a"), [])
+
+        with self.assertRaises(TypeError):
+            self.registry.remove("1")
+        with self.assertRaises(TypeError):
+            self.registry.getChecked("1")
+
+    def test_index_is_built_on_first_find(self):
+        first = self.registry.add(Entity(1, "a"))
+        self.registry.add(Entity(2, "b"))
+        self.registry.add(Entity(3))
+
+        self.assertEqual(self.registry._indexes, {})
+        self.assertEqual(self.registry.find("model", "a"), [first])
+
+        # kept up to date afterwards
+        third = self.registry.add(Entity(4, "a"))
+        self.registry.remove(2)
+        self.assertEqual(self.registry.find("model", "a"), [first, third])
+        self.assertEqual(self.registry.find("model", "b"), [])
+        self.assertEqual(self.registry.find("model", None), [])
+
+        with self.assertRaises(KeyError):
+            self.registry.find("colour", "red")
+
+    def test_reindex(self):
+        entity = self.registry.add(Entity(1, "a"))
+        self.registry.find("model", "a")
+
+        entity.model = "b"
+        self.registry.reindex(entity)
+
+        self.assertEqual(self.registry.find("model", "a"), [])
+        self.assertEqual(self.registry.find("model", "b"), [entity])
+
+        # objects which aren't in the registry are ignored
+        self.registry.reindex(Entity(1, "c"))
+        self.assertEqual(self.registry.find("model", "c"), [])
+
+    def test_views(self):
+        entity = self.registry.add(Entity(1))
+        view = self.registry.getAll()
+
+        self.assertEqual(dict(view), {1: entity})
+        self.assertEqual(list(self.registry.ids()), [1])
+        self.assertEqual(list(self.registry.values()), [entity])
+
+        with self.assertRaises(TypeError):
+            view[2] = entity
+
+        self.registry.add(Entity(2))
+        self.assertEqual(len(view), 2)
+
+
+class LibraryTest(unittest.TestCase):
+
+    def setUp(self):
+        self.created = []
+
+        for library in (object_, vehicle, blip):
+            self.addCleanup(library.on("creation", self.created.append).cancel)
+
+    def test_get_by_id_creates_unknown_entities_once(self):
+        for library in (object_, vehicle, blip):
+            del self.created[:]
+
+            entity = library.getByID(1000)
+
+            self.assertIs(library.getByID(1000), entity)
+            self.assertEqual(self.created, [entity])
+            library._pool.remove(1000)
+
+    def test_get_by_id_of_created_entities(self):
+        obj = object_.create(0x1234, 1.0, 2.0, 3.0)
+        txt = text.create("text", 1.0, 2.0, 3.0)
+
+        self.assertIs(object_.getByID(obj.id), obj)
+        self.assertIs(text.getByID(txt.id), txt)
+        self.assertIs(text.getByID(-1), False)
+        self.assertIs(text.getByID("1"), False)
+
+        object_.deleteByID(obj.id)
+        text.deleteByID(txt.id)
+        self.assertIs(text.getByID(txt.id), False)
+
+    def test_get_by_id_raises_for_ids_which_are_not_int(self):
+        for library in (object_, vehicle, blip):
+            with self.assertRaises(TypeError):
+                library.getByID("1")
+
+        for library in (object_, vehicle, blip, text):
+            with self.assertRaises(TypeError):
+                library.deleteByID("1")
+
+    def test_get_by_model(self):
+        first = object_.create(0x1234, 1.0, 2.0, 3.0)
+        second = object_.create(0x1234, 1.0, 2.0, 3.0)
+        other = object_.create(0x4321, 1.0, 2.0, 3.0)
+
+        try:
+            self.assertEqual(object_.getByModel(0x1234), [first, second])
+            self.assertEqual(object_.getByModel(0x4321), [other])
+
+            object_.deleteByID(first.id)
+            self.assertEqual(object_.getByModel(0x1234), [second])
+        finally:
+            for obj in (first, second, other):
+                object_.deleteByID(obj.id)
+
+        self.assertEqual(object_.getByModel(0x1234), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
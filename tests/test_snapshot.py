@@ -0,0 +1,128 @@
+"""Tests of GTAOrange.snapshot, run against the recording __orange__ stand-in in tests/fake"""
+import os
+import sys
+import unittest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_ROOT, "tests", "fake"), os.path.join(_ROOT, "modules", "python-module")]
+
+import __orange__
+from GTAOrange import player, snapshot
+
+
+class StoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.ids = [1, 2, 3]
+        self.reads = []
+        self.store = snapshot.Store(("x", "y", "z"), self.read, lambda: self.ids)
+        self._max_age = snapshot.max_age
+        snapshot.setMaxAge(60.0)
+
+    def tearDown(self):
+        snapshot.setMaxAge(self._max_age)
+
+    def read(self, id):
+        self.reads.append(id)
+        return None if id == 2 else (float(id), 2.0, 3.0)
+
+    def test_first_get_reads_everything_once(self):
+        self.assertEqual(self.store.get(1), (1.0, 2.0, 3.0))
+        self.assertEqual(self.store.get(3, 1), (2.0, 3.0))
+        self.assertEqual(self.store.get(3, 0, 1), (3.0,))
+        self.assertEqual(self.reads, [1, 2, 3])
+
+    def test_unreadable_and_unknown_entities(self):
+        self.assertIsNone(self.store.get(2))
+        self.assertIsNone(self.store.get(4))
+
+    def test_invalidate_one_entity(self):
+        self.store.get(1)
+        self.store.invalidate(1)
+
+        self.assertIsNone(self.store.get(1))
+        self.assertEqual(self.store.get(3), (3.0, 2.0, 3.0))
+        self.assertEqual(self.reads, [1, 2, 3])
+
+    def test_invalidate_everything(self):
+        self.store.get(1)
+        self.ids.append(4)
+        self.store.invalidate()
+
+        self.assertEqual(self.store.get(4), (4.0, 2.0, 3.0))
+        self.assertEqual(self.reads, [1, 2, 3, 1, 2, 3, 4])
+
+    def test_outdated_values_are_read_again(self):
+        snapshot.setMaxAge(0.0)
+        self.store.get(1)
+        self.store.time -= 1.0
+        self.store.get(1)
+
+        self.assertEqual(self.reads, [1, 2, 3, 1, 2, 3])
+
+    def test_rows(self):
+        ids, rows = self.store.getRows()
+
+        self.assertEqual(ids, [1, 3])
+        self.assertEqual([tuple(row) for row in rows], [(1.0, 2.0, 3.0), (3.0, 2.0, 3.0)])
+
+    def test_rows_without_numpy(self):
+        numpy = snapshot._np
+        snapshot._np = None
+
+        try:
+            self.assertEqual(self.store.getRows(), ([1, 3], [(1.0, 2.0, 3.0), (3.0, 2.0, 3.0)]))
+        finally:
+            snapshot._np = numpy
+
+
+class PlayerSnapshotTest(unittest.TestCase):
+
+    def setUp(self):
+        self.players = [player.getByID(id) for id in (911, 912)]
+        snapshot.enable(60.0)
+        __orange__.reset()
+
+    def tearDown(self):
+        snapshot.disable()
+        snapshot.setMaxAge(0.05)
+
+        for p in self.players:
+            __orange__.events["PlayerDisconnect"](p.id, 0)
+
+    def getters(self):
+        return [call for call in __orange__.calls if call[0].startswith("Get")]
+
+    def test_getters_are_served_from_the_snapshot(self):
+        first, second = self.players
+
+        self.assertEqual(first.getPosition(), (911.0, 2.0, 3.0))
+        calls = len(self.getters())
+
+        self.assertEqual(second.getPosition(), (912.0, 2.0, 3.0))
+        self.assertEqual(first.getHeading(), 1.0)
+        self.assertEqual(first.getHealth(), 1.0)
+        self.assertEqual(len(self.getters()), calls)
+
+    def test_setters_invalidate_their_player(self):
+        first, second = self.players
+        first.getPosition()
+        first.setPosition(5.0, 6.0, 7.0)
+        __orange__.reset()
+
+        first.getPosition()
+        second.getPosition()
+
+        self.assertEqual(self.getters(), [("GetPlayerPosition", first.id)])
+
+    def test_disabled(self):
+        snapshot.disable()
+
+        self.players[0].getPosition()
+        self.players[0].getPosition()
+
+        self.assertEqual(self.getters(), [("GetPlayerPosition", 911)] * 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,146 @@
+"""Tests of the DATE/DATETIME/TIME converters in MySQLdb.times, on the values MySQL returns and on odd ones"""
+import os
+import sys
+import unittest
+from datetime import date, datetime, time, timedelta
+from unittest import mock
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_ROOT, "modules", "python-module", "bin")]
+
+try:
+    from MySQLdb import times
+except ImportError:
+    # the _mysql extension in bin/ is built for Windows
+    raise unittest.SkipTest("MySQLdb needs the _mysql extension")
+
+DATETIMES = [
+    ("2020-01-02 10:11:12", datetime(2020, 1, 2, 10, 11, 12)),
+    ("2020-01-02 10:11:12.123456", datetime(2020, 1, 2, 10, 11, 12, 123456)),
+    ("2020-01-02 10:11:12.5", datetime(2020, 1, 2, 10, 11, 12, 500000)),
+    ("9999-12-31 23:59:59.999999", datetime(9999, 12, 31, 23, 59, 59, 999999)),
+    ("2020-01-02T10:11:12", datetime(2020, 1, 2, 10, 11, 12)),
+    ("2020-01-02 10:11", datetime(2020, 1, 2, 10, 11)),
+    ("2020-01-02", date(2020, 1, 2)),
+    (b"2020-01-02 10:11:12", datetime(2020, 1, 2, 10, 11, 12)),
+    (b"2020-01-02", date(2020, 1, 2)),
+    ("0000-00-00 00:00:00", None),
+    ("0000-00-00", None),
+    ("2020-13-01 00:00:00", None),
+    ("2020-02-30 00:00:00", None),
+    ("2020-01-02 10:11:12.1234567", None),
+    ("10:11:12", None),
+    ("", None),
+]
+
+DATES = [
+    ("2020-01-02", date(2020, 1, 2)),
+    ("2020-02-29", date(2020, 2, 29)),
+    (b"2020-01-02", date(2020, 1, 2)),
+    ("2020-01-02 10:11:12", date(2020, 1, 2)),
+    ("0000-00-00", None),
+    ("2020-02-30", None),
+    ("2020-1-2", None),
+    ("x", None),
+    ("", None),
+]
+
+TIMEDELTAS = [
+    ("10:11:12", timedelta(hours=10, minutes=11, seconds=12)),
+    ("00:00:00", timedelta(0)),
+    ("24:00:00", timedelta(days=1)),
+    ("838:59:59", timedelta(hours=838, minutes=59, seconds=59)),
+    ("-838:59:59", -timedelta(hours=838, minutes=59, seconds=59)),
+    ("-10:11:12", -timedelta(hours=10, minutes=11, seconds=12)),
+    ("-00:00:01", -timedelta(seconds=1)),
+    ("10:11:12.5", timedelta(hours=10, minutes=11, seconds=12, microseconds=500000)),
+    ("1:2:3", timedelta(hours=1, minutes=2, seconds=3)),
+    ("10:11", None),
+    ("1x:11:12", None),
+    ("", None),
+]
+
+TIMES = [
+    ("10:11:12", time(10, 11, 12)),
+    ("00:00:00", time(0)),
+    ("10:11:12.5", time(10, 11, 12, 500000)),
+    ("1:2:3", time(1, 2, 3)),
+    ("24:00:00", None),
+    ("-10:11:12", None),
+    ("10:11", None),
+    ("", None),
+]
+
+TIMESTAMPS = [
+    ("2020-01-02 10:11:12", datetime(2020, 1, 2, 10, 11, 12)),
+    ("2020-01-02 10:11:12.5", datetime(2020, 1, 2, 10, 11, 12, 500000)),
+    ("0000-00-00 00:00:00", None),
+    # the formats of MySQL 4.0 and older
+    ("20200102101112", datetime(2020, 1, 2, 10, 11, 12)),
+    ("202001021011", datetime(2020, 1, 2, 10, 11)),
+    ("00000000000000", None),
+    ("99999999999999", None),
+]
+
+
+class ConverterTest(unittest.TestCase):
+
+    def check(self, converter, cases):
+        for value, expected in cases:
+            result = converter(value)
+            self.assertEqual(result, expected, value)
+            self.assertIs(type(result), type(expected), value)
+
+    def test_datetime(self):
+        self.check(times.DateTime_or_None, DATETIMES)
+
+    def test_date(self):
+        self.check(times.Date_or_None, DATES)
+
+    def test_timedelta(self):
+        self.check(times.TimeDelta_or_None, TIMEDELTAS)
+
+    def test_time(self):
+        self.check(times.Time_or_None, TIMES)
+
+    def test_timestamp(self):
+        self.check(times.mysql_timestamp_converter, TIMESTAMPS)
+
+    def test_cached_date(self):
+        self.check(times.CachedDate_or_None, DATES)
+        self.assertIs(times.CachedDate_or_None("2020-01-02"), times.CachedDate_or_None("2020-01-02"))
+
+    def test_date_cache_size(self):
+        with mock.patch.object(times, "DATE_CACHE_SIZE", 2), mock.patch.object(times, "_date_cache", {}):
+            first = times.CachedDate_or_None("2020-01-01")
+            times.CachedDate_or_None("2020-01-02")
+            self.assertIs(times.CachedDate_or_None("2020-01-01"), first)
+
+            # the cache is emptied when full
+            times.CachedDate_or_None("2020-01-03")
+            self.assertEqual(times._date_cache, {"2020-01-03": date(2020, 1, 3)})
+
+
+class WithoutFromIsoFormatTest(ConverterTest):
+    """The converters on Python 3.6, which doesn't have datetime.fromisoformat()"""
+
+    def setUp(self):
+        for name in ("_datetime_fromisoformat", "_date_fromisoformat"):
+            patcher = mock.patch.object(times, name, None)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+
+class FormatTest(unittest.TestCase):
+
+    def test_timestamp(self):
+        self.assertEqual(times.format_TIMESTAMP(datetime(2020, 1, 2, 3, 4, 5)), "2020-01-02 03:04:05")
+        self.assertEqual(times.format_TIMESTAMP(datetime(2020, 1, 2, 3, 4, 5, 60)), "2020-01-02 03:04:05.000060")
+
+    def test_round_trip(self):
+        for value in (datetime(2020, 1, 2, 3, 4, 5), datetime(9999, 12, 31, 23, 59, 59, 999999)):
+            self.assertEqual(times.DateTime_or_None(times.format_TIMESTAMP(value)), value)
+
+
+if __name__ == "__main__":
+    unittest.main()
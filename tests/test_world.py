@@ -0,0 +1,105 @@
+"""Tests of GTAOrange.world, the batched functions are run with NumPy (if installed) and with the pure Python fallback"""
+import math
+import os
+import sys
+import unittest
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_ROOT, "tests", "fake"), os.path.join(_ROOT, "modules", "python-module")]
+
+from GTAOrange import world
+
+POSITIONS = [(0.0, 0.0, 0.0), (3.0, 4.0, 0.0), (1.0, 1.0, 10.0), (-6.0, 8.0, 0.0)]
+
+
+class DistanceTest(unittest.TestCase):
+
+    def test_3d(self):
+        self.assertEqual(world.getDistance(1.0, 2.0, 3.0, 4.0, 6.0, 15.0), 13.0)
+
+    def test_2d(self):
+        self.assertEqual(world.getDistance(1.0, 2.0, 4.0, 6.0), 5.0)
+        self.assertEqual(world.getDistance(4.0, 6.0, 1.0, 2.0), 5.0)
+
+    def test_heading(self):
+        # 0 = north, counter-clockwise
+        self.assertAlmostEqual(world.getHeading(0.0, 0.0, 0.0, 1.0), 0.0)
+        self.assertAlmostEqual(world.getHeading(0.0, 0.0, -1.0, 0.0), 90.0)
+        self.assertAlmostEqual(world.getHeading(0.0, 0.0, 0.0, -1.0), 180.0)
+        self.assertAlmostEqual(world.getHeading(0.0, 0.0, 1.0, 0.0), 270.0)
+
+
+class BatchedPythonTest(unittest.TestCase):
+    """Batched functions with the pure Python fallback"""
+
+    numpy = None
+
+    def setUp(self):
+        self._np = world._np
+        world._np = self.numpy
+
+    def tearDown(self):
+        world._np = self._np
+
+    def assertValues(self, values, expected):
+        values = list(values)
+        self.assertEqual(len(values), len(expected))
+
+        for value, other in zip(values, expected):
+            self.assertAlmostEqual(value, other)
+
+    def test_distances(self):
+        self.assertValues(world.getDistances(POSITIONS, 0.0, 0.0, 0.0),
+                          [0.0, 5.0, math.sqrt(102.0), 10.0])
+        self.assertValues(world.getDistances(POSITIONS, 0.0, 0.0), [0.0, 5.0, math.sqrt(2.0), 10.0])
+
+    def test_distances_match_the_scalar_function(self):
+        for (x, y, z), distance in zip(POSITIONS, world.getDistances(POSITIONS, 1.5, -2.0, 4.0)):
+            self.assertAlmostEqual(distance, world.getDistance(x, y, z, 1.5, -2.0, 4.0))
+
+    def test_pairwise_distances(self):
+        matrix = world.getPairwiseDistances(POSITIONS[:2], POSITIONS[1:])
+        self.assertValues(matrix[0], [5.0, math.sqrt(102.0), 10.0])
+        self.assertValues(matrix[1], [0.0, math.sqrt(113.0), math.sqrt(97.0)])
+
+        matrix = world.getPairwiseDistances(POSITIONS[:1], POSITIONS[2:3], 2)
+        self.assertValues(matrix[0], [math.sqrt(2.0)])
+
+    def test_nearest(self):
+        self.assertEqual(world.getNearest(POSITIONS, 2.0, 2.0, 0.0), [1])
+        self.assertEqual(world.getNearest(POSITIONS, 2.0, 2.0, 0.0, 3), [1, 0, 3])
+        self.assertEqual(world.getNearest(POSITIONS, 2.0, 2.0, k=2), [2, 1])
+        self.assertEqual(world.getNearest(POSITIONS, 2.0, 2.0, 0.0, 10), [1, 0, 3, 2])
+        self.assertEqual(world.getNearest(POSITIONS, 2.0, 2.0, 0.0, 0), [])
+        self.assertEqual(world.getNearest([], 2.0, 2.0, 0.0), [])
+
+    def test_within_radius(self):
+        self.assertEqual(list(world.getWithinRadius(POSITIONS, 0.0, 0.0, 0.0, 5.0)), [True, True, False, False])
+        self.assertEqual(list(world.getWithinRadius(POSITIONS, 0.0, 0.0, radius=5.0)), [True, True, True, False])
+
+    def test_headings(self):
+        headings = world.getHeadings(POSITIONS[1:], 0.0, 0.0)
+
+        for (x, y, z), heading in zip(POSITIONS[1:], headings):
+            self.assertAlmostEqual(heading, world.getHeading(x, y, 0.0, 0.0))
+
+
+@unittest.skipIf(world._np is None, "NumPy isn't installed")
+class BatchedNumPyTest(BatchedPythonTest):
+    """Batched functions with NumPy"""
+
+    numpy = world._np
+
+    def test_accepts_arrays(self):
+        positions = self.numpy.array(POSITIONS)
+
+        self.assertValues(world.getDistances(positions, 0.0, 0.0, 0.0), [0.0, 5.0, math.sqrt(102.0), 10.0])
+        self.assertEqual(world.getNearest(positions, 2.0, 2.0, 0.0, 2), [1, 0])
+
+    def test_empty(self):
+        self.assertEqual(len(world.getDistances([], 0.0, 0.0, 0.0)), 0)
+        self.assertEqual(len(world.getWithinRadius([], 0.0, 0.0)), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,264 @@
+"""Tests of MySQLdb.writebehind, run against stub connections which log the statements the writer thread sends"""
+import os
+import sys
+import unittest
+import warnings
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(_ROOT, "modules", "python-module", "bin")]
+
+try:
+    from MySQLdb import writebehind
+except ImportError:
+    # the _mysql extension in bin/ is built for Windows
+    raise unittest.SkipTest("MySQLdb needs the _mysql extension")
+
+from _mysql_exceptions import InterfaceError, OperationalError, ProgrammingError
+
+
+class _Cursor(object):
+
+    def __init__(self, conn):
+        self.conn = conn
+
+    def executemany(self, query, rows):
+        if self.conn.failures:
+            raise self.conn.failures.pop(0)
+        self.conn.log.append((query, list(rows)))
+
+    def close(self):
+        pass
+
+
+class _Connection(object):
+    """Stub of connections.Connection, executemany() raises the exceptions in failures first and logs afterwards"""
+
+    def __init__(self, log, failures):
+        self.log = log
+        self.failures = failures
+        self.closed = False
+
+    def cursor(self):
+        return _Cursor(self)
+
+    def commit(self):
+        self.log.append("COMMIT")
+
+    def rollback(self):
+        self.log.append("ROLLBACK")
+
+    def close(self):
+        self.closed = True
+
+
+class _Pool(object):
+
+    def __init__(self, log, failures):
+        self.log = log
+        self.failures = failures
+        self.released = []
+
+    def acquire(self):
+        return _Connection(self.log, self.failures)
+
+    def release(self, conn, discard=False):
+        self.released.append(discard)
+
+
+class WriteBehindTest(unittest.TestCase):
+
+    def setUp(self):
+        self.log = []
+        self.failures = []
+        self.connections = []
+        self.errors = []
+
+        def connect(**kwargs):
+            conn = _Connection(self.log, self.failures)
+            conn.kwargs = kwargs
+            self.connections.append(conn)
+            return conn
+
+        class WriteBehind(writebehind.WriteBehind):
+            connection_class = staticmethod(connect)
+
+        self.writer_class = WriteBehind
+
+    def writer(self, **kwargs):
+        kwargs.setdefault("flush_interval", 60.0)
+        kwargs.setdefault("backoff", 0.0)
+        kwargs.setdefault("on_error", lambda exc, query, rows: self.errors.append((exc, query, rows)))
+        writer = self.writer_class(**kwargs)
+        self.addCleanup(writer.close, 5.0)
+        return writer
+
+    def test_writes_are_grouped_by_query(self):
+        writer = self.writer(db="orange")
+        writer.submit("INSERT a", (1,))
+        writer.submit("INSERT b", (2,))
+        writer.submit("INSERT a", (3,))
+
+        self.assertEqual(self.log, [])
+        self.assertTrue(writer.flush(5.0))
+
+        self.assertEqual(self.log, [("INSERT a", [(1,), (3,)]), "COMMIT", ("INSERT b", [(2,)]), "COMMIT"])
+        self.assertEqual(self.connections[0].kwargs, {"db": "orange"})
+        self.assertEqual(len(self.connections), 1)
+
+        stats = writer.stats()
+        self.assertEqual((stats["depth"], stats["submitted"], stats["written"], stats["flushes"]), (0, 3, 3, 1))
+
+    def test_writes_with_the_same_key_are_coalesced(self):
+        writer = self.writer()
+        for money in (1, 2, 3):
+            writer.submit("UPDATE money", (money, "alice"), key="alice")
+        writer.submit("UPDATE money", (5, "bob"), key="bob")
+        writer.submit("UPDATE money", (4, "alice"), key="alice")
+        # the same key of another query is another row
+        writer.submit("UPDATE name", ("alice",), key="alice")
+
+        self.assertEqual(writer.stats()["depth"], 3)
+        writer.flush(5.0)
+
+        self.assertEqual(self.log, [("UPDATE money", [(5, "bob"), (4, "alice")]), "COMMIT",
+                                    ("UPDATE name", [("alice",)]), "COMMIT"])
+        stats = writer.stats()
+        self.assertEqual((stats["submitted"], stats["coalesced"], stats["written"]), (6, 3, 3))
+
+    def test_batch_size(self):
+        writer = self.writer(batch_size=2)
+        writer.submit("INSERT a", (1,))
+        writer.submit("INSERT a", (2,))
+        # reaching batch_size flushes without waiting for flush_interval
+        self.assertTrue(writer.flush(5.0))
+
+        for i in range(3, 8):
+            writer.submit("INSERT a", (i,))
+        writer.flush(5.0)
+
+        self.assertEqual([entry for entry in self.log if entry != "COMMIT"][0], ("INSERT a", [(1,), (2,)]))
+        self.assertEqual(sum(len(entry[1]) for entry in self.log if entry != "COMMIT"), 7)
+        self.assertTrue(all(len(entry[1]) <= 2 for entry in self.log if entry != "COMMIT"))
+
+    def test_flush_interval(self):
+        writer = self.writer(flush_interval=0.01)
+        writer.submit("INSERT a", (1,))
+
+        for i in range(500):
+            if writer.stats()["flushes"]:
+                break
+            writer._thread.join(0.01)
+
+        self.assertEqual(self.log, [("INSERT a", [(1,)]), "COMMIT"])
+        self.assertGreater(writer.stats()["last_latency"], 0.0)
+
+    def test_flush_without_writes(self):
+        writer = self.writer()
+
+        self.assertTrue(writer.flush(5.0))
+        self.assertEqual(writer.stats()["flushes"], 0)
+
+    def test_operational_error_is_retried(self):
+        self.failures.extend([OperationalError(1213, "Deadlock found"), OperationalError(2006, "gone away")])
+        writer = self.writer()
+        writer.submit("INSERT a", (1,))
+        writer.flush(5.0)
+
+        self.assertEqual(self.log, [("INSERT a", [(1,)]), "COMMIT"])
+        # a broken connection is closed and replaced
+        self.assertEqual([conn.closed for conn in self.connections], [True, True, False])
+        stats = writer.stats()
+        self.assertEqual((stats["retries"], stats["written"], stats["failed"]), (2, 1, 0))
+        self.assertEqual(self.errors, [])
+
+    def test_retries_are_limited(self):
+        error = OperationalError(1205, "Lock wait timeout exceeded")
+        self.failures.extend([error] * 3)
+        writer = self.writer(retries=2)
+        writer.submit("INSERT a", (1,))
+        writer.submit("INSERT b", (2,))
+        writer.flush(5.0)
+
+        self.assertEqual(self.errors, [(error, "INSERT a", [(1,)])])
+        self.assertEqual(self.log, [("INSERT b", [(2,)]), "COMMIT"])
+        stats = writer.stats()
+        self.assertEqual((stats["retries"], stats["written"], stats["failed"]), (2, 1, 1))
+
+    def test_other_errors_are_rolled_back_and_not_retried(self):
+        error = ProgrammingError(1064, "You have an error in your SQL syntax")
+        self.failures.extend([error, TypeError("not all arguments converted")])
+        writer = self.writer()
+        writer.submit("INSERT a", (1,))
+        writer.submit("INSERT b", (2,))
+        writer.submit("INSERT c", (3,))
+        writer.flush(5.0)
+
+        self.assertEqual(self.log, ["ROLLBACK", "ROLLBACK", ("INSERT c", [(3,)]), "COMMIT"])
+        self.assertEqual([(type(exc), query) for exc, query, rows in self.errors],
+                         [(ProgrammingError, "INSERT a"), (TypeError, "INSERT b")])
+        self.assertEqual(len(self.connections), 1)
+        self.assertEqual(writer.stats()["retries"], 0)
+
+        # the thread is still alive
+        writer.submit("INSERT d", (4,))
+        self.assertTrue(writer.flush(5.0))
+
+    def test_errors_are_warned_about_without_on_error(self):
+        self.failures.append(ProgrammingError(1064, "You have an error in your SQL syntax"))
+        writer = self.writer(on_error=None)
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            writer.submit("INSERT a", (1,))
+            writer.flush(5.0)
+
+        self.assertEqual([warning.category for warning in caught], [RuntimeWarning])
+        self.assertIn("dropped 1 rows", str(caught[0].message))
+
+    def test_failing_on_error_is_warned_about(self):
+        def on_error(exc, query, rows):
+            raise ValueError("oops")
+
+        self.failures.append(ProgrammingError(1064, "You have an error in your SQL syntax"))
+        writer = self.writer(on_error=on_error)
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            writer.submit("INSERT a", (1,))
+            writer.flush(5.0)
+
+        self.assertEqual([warning.category for warning in caught], [RuntimeWarning])
+        self.assertIn("on_error failed", str(caught[0].message))
+
+    def test_pool(self):
+        pool = _Pool(self.log, self.failures)
+        self.failures.append(OperationalError(2013, "Lost connection"))
+        writer = self.writer(pool=pool)
+        writer.submit("INSERT a", (1,))
+        writer.flush(5.0)
+
+        self.assertEqual(self.log, [("INSERT a", [(1,)]), "COMMIT"])
+        self.assertEqual(pool.released, [True, False])
+        self.assertEqual(self.connections, [])
+
+    def test_close_flushes(self):
+        writer = self.writer()
+        writer.submit("INSERT a", (1,))
+
+        self.assertTrue(writer.close(5.0))
+
+        self.assertEqual(self.log, [("INSERT a", [(1,)]), "COMMIT"])
+        self.assertTrue(self.connections[0].closed)
+        with self.assertRaises(InterfaceError):
+            writer.submit("INSERT a", (2,))
+
+    def test_context_manager(self):
+        with self.writer() as writer:
+            writer.submit("INSERT a", (1,))
+
+        self.assertFalse(writer._thread.is_alive())
+        self.assertEqual(self.log, [("INSERT a", [(1,)]), "COMMIT"])
+
+
+if __name__ == "__main__":
+    unittest.main()